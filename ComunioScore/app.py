@@ -7,9 +7,12 @@ from ComunioScore.routes import Router
 from ComunioScore import APIHandler, ComunioDB, SofascoreDB
 from ComunioScore.livedata import LiveData
 from ComunioScore.matchscheduler import MatchScheduler
+from ComunioScore.matchdaypoller import MatchdayPoller
+from ComunioScore.asynclivedata import AsyncLiveData
 from ComunioScore.score import SofaScore, BundesligaScore
 from ComunioScore.messenger import ComunioScoreTelegram
 from ComunioScore.utils import Logger
+from ComunioScore.exceptions import ScoringRulesError
 from ComunioScore import __version__
 
 
@@ -22,7 +25,9 @@ class ComunioScore:
             cs.run(host=host, port=port)
 
     """
-    def __init__(self, name, comunio_user, comunio_pass, token, chatid, season_date, api_key, **dbparams):
+    def __init__(self, name, comunio_user, comunio_pass, token, chatid, season_date, api_key, club_aliases=None,
+                 polling_intervals=None, scoring_rules=None, livedata_mode='poller', scoreboard=False, response_cache=None,
+                 quota=None, request_policy=None, **dbparams):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class ComunioScore')
 
@@ -37,8 +42,14 @@ class ComunioScore:
         # create the APIHandler instance
         self.api = APIHandler()
 
-        # init SofaScore scraper client and Bundesliga season data
+        # init SofaScore scraper client, response cache, quota, request policy and Bundesliga season data
         SofaScore.init_scraper(api_key=self.api_key)
+        if response_cache is not None:
+            SofaScore.init_cache(options=response_cache)
+        if quota is not None:
+            SofaScore.init_quota(options=quota)
+        if request_policy is not None:
+            SofaScore.init_policy(options=request_policy)
         BundesligaScore().init_season_data(season_date=self.season_date)
 
         # router instance for specific endpoints
@@ -46,7 +57,7 @@ class ComunioScore:
         self.router.add_endpoint('/', 'index', method="GET", handler=self.api.index)
 
         # create ComunioScoreTelegram instance
-        self.telegram = ComunioScoreTelegram(token=self.token, chat_id=self.chatid)
+        self.telegram = ComunioScoreTelegram(token=self.token, chat_id=self.chatid, scoreboard=scoreboard)
 
         # create ComunioDB instance
         self.comuniodb = ComunioDB(comunio_user=self.comunio_user, comunio_pass=self.comunio_pass, **dbparams)
@@ -55,6 +66,14 @@ class ComunioScore:
         self.livedata = LiveData(**dbparams)
         self.livedata.register_update_squad_event_handler(func=self.comuniodb.update_linedup_squad)
         self.livedata.register_telegram_send_event_handler(func=self.telegram.new_msg)
+        self.comuniodb.register_squad_updated_event_handler(func=self.livedata.invalidate_linedup_squads)
+        BundesligaScore.register_lineup_event_handler(func=self.livedata.store_lineup_snapshot)
+        if club_aliases:
+            self.livedata.set_club_aliases(aliases=club_aliases)
+        if polling_intervals:
+            self.livedata.set_polling_intervals(intervals=polling_intervals)
+        if scoring_rules:
+            self.livedata.set_scoring_rules(sections=scoring_rules)
 
         # register summery points, rate and notify event handler
         self.telegram.register_points_summery_event_handler(func=self.livedata.points_summery)
@@ -63,12 +82,28 @@ class ComunioScore:
 
         # create MatchScheduler instance
         self.matchscheduler = MatchScheduler()
-        self.matchscheduler.register_livedata_event_handler(func=self.livedata.fetch)
+
+        # livedata of the running matches: one poller thread, coroutines on one event loop or one thread per match
+        self.livedata_mode = livedata_mode
+        if self.livedata_mode == 'asyncio':
+            self.livedata_runner = AsyncLiveData(livedata=self.livedata)
+            self.matchscheduler.register_livedata_event_handler(func=self.livedata_runner.add_match)
+        elif self.livedata_mode == 'thread':
+            self.livedata_runner = None
+            self.matchscheduler.register_livedata_event_handler(func=self.livedata.fetch)
+        else:
+            if self.livedata_mode != 'poller':
+                self.logger.error("Invalid livedata mode {}, use the poller".format(self.livedata_mode))
+            self.livedata_runner = MatchdayPoller(livedata=self.livedata)
+            self.livedata_runner.register_poll_start_event_handler(func=self.telegram.hold_messages)
+            self.livedata_runner.register_poll_end_event_handler(func=self.telegram.release_messages)
+            self.matchscheduler.register_livedata_event_handler(func=self.livedata_runner.add_match)
 
         # create SofascoreDB instance
         self.sofascoredb = SofascoreDB(**dbparams)
         self.sofascoredb.register_matchscheduler_event_handler(func=self.matchscheduler.new_event)
         self.sofascoredb.register_comunio_user_data(func=self.comuniodb.get_comunio_user_data)
+        self.sofascoredb.register_quota_alert_event_handler(func=self.telegram.new_msg)
 
     def run(self, host='0.0.0.0', port=None, debug=None):
         """ runs the ComunioScore application on given port
@@ -83,6 +118,10 @@ class ComunioScore:
         # start sofascoredb run thread
         self.sofascoredb.start()
 
+        # start matchdaypoller or asynclivedata run thread
+        if self.livedata_runner is not None:
+            self.livedata_runner.start()
+
         # start telegram polling
         self.telegram.run()
 
@@ -131,11 +170,17 @@ def main():
     # arguments for telegram
     args_parser.add_argument('--token',        type=str, help='Telegram token')
     args_parser.add_argument('--chatid',       type=int,  help='Telegram chat id')
+    args_parser.add_argument('--scoreboard',   action='store_true', help='Edit one pinned scoreboard message per match day')
     args_parser.add_argument('--season',       type=str,  help='Season start date', default='2019-08-20')
 
     # argument for scraper api key
     args_parser.add_argument('--scraperapikey', type=str, help='API Key from ScraperAPI')
 
+    # argument for the livedata mode
+    args_parser.add_argument('--livedata_mode', type=str, help='Fetch the livedata with one poller thread, asyncio or '
+                                                               'one thread per match', default='poller',
+                             choices=['poller', 'asyncio', 'thread'])
+
     # argument for the logging folder
     parser.add_argument('-L', '--log_dir',   type=str, help='Logging directory for the application', default='/var/log/')
 
@@ -167,6 +212,7 @@ def main():
             # telegram section
             token = config.get('telegram', 'token')
             chatid = config.getint('telegram', 'chatid')
+            scoreboard = config.getboolean('telegram', 'scoreboard', fallback=False)
 
             # season section
             season_date = config.get('season', 'startdate')
@@ -192,6 +238,43 @@ def main():
             print("Sqlite database will be used!")
             dbhost = dbport = dbusername = dbpassword = dbname = None
 
+        # clubs section with aliases for comunio club names
+        if config.has_section('clubs'):
+            club_aliases = dict(config.items('clubs'))
+        else:
+            club_aliases = None
+
+        # polling section with intervals in seconds for the match phases
+        if config.has_section('polling'):
+            polling_intervals = dict(config.items('polling'))
+        else:
+            polling_intervals = None
+
+        # cache section with the cache directory, size and time to live in seconds for the sofascore endpoints
+        if config.has_section('cache'):
+            response_cache = dict(config.items('cache'))
+        else:
+            response_cache = None
+
+        # quota section with the estimated ScraperAPI requests for the projection until the end of the billing period
+        if config.has_section('quota'):
+            quota = dict(config.items('quota'))
+        else:
+            quota = None
+
+        # request section with the retries, backoff and timeout in seconds and the circuit breaker of sofascore requests
+        if config.has_section('request'):
+            request_policy = dict(config.items('request'))
+        else:
+            request_policy = None
+
+        # livedata section with the mode to fetch the running matches
+        livedata_mode = config.get('livedata', 'mode', fallback='poller')
+
+        # scoring sections with the rule sets and the rule set of each community
+        scoring_rules = {section: dict(config.items(section)) for section in config.sections()
+                         if section.split(' ')[0] == 'scoring'}
+
     else:
         # parse command line arguments
 
@@ -209,6 +292,7 @@ def main():
         # telegram args
         token = args.token
         chatid = args.chatid
+        scoreboard = args.scoreboard
 
         # sofascore args
         season_date = args.season
@@ -219,6 +303,16 @@ def main():
         # scraper api key
         api_key = args.scraperapikey
 
+        club_aliases = None
+        polling_intervals = None
+        scoring_rules = None
+        response_cache = None
+        quota = None
+        request_policy = None
+
+        # livedata mode
+        livedata_mode = args.livedata_mode
+
     dbparams.update({'host': dbhost, 'port': dbport, 'username': dbusername, 'password': dbpassword,
                      'dbname': dbname})
 
@@ -227,8 +321,15 @@ def main():
     logger.info("Start Application ComunioScore with version {}".format(__version__))
 
     # create application instance
-    cs = ComunioScore(name="ComunioScore", comunio_user=comunio_user, comunio_pass=comunio_pass, token=token,
-                      chatid=chatid, season_date=season_date, api_key=api_key, **dbparams)
+    try:
+        cs = ComunioScore(name="ComunioScore", comunio_user=comunio_user, comunio_pass=comunio_pass, token=token,
+                          chatid=chatid, season_date=season_date, api_key=api_key, club_aliases=club_aliases,
+                          polling_intervals=polling_intervals, scoring_rules=scoring_rules,
+                          livedata_mode=livedata_mode, scoreboard=scoreboard, response_cache=response_cache,
+                          quota=quota, request_policy=request_policy, **dbparams)
+    except ScoringRulesError as ex:
+        logger.error(ex)
+        exit(1)
 
     # run the application
     cs.run(host=host, port=port)
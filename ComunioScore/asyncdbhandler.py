@@ -0,0 +1,39 @@
+import logging
+import asyncio
+from functools import partial, wraps
+
+
+class AsyncDBHandler:
+    """ class AsyncDBHandler to call the methods of a DBHandler instance as coroutines
+
+    the blocking database methods run in the executor of the event loop, the psycopg2 connection pool and the sqlite
+    connection are shared by the executor threads
+
+    USAGE:
+            db = AsyncDBHandler(dbhandler=livedata)
+            await db.query_points_ranking(match_day=3)
+
+    """
+    def __init__(self, dbhandler, executor=None):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class AsyncDBHandler')
+
+        self.dbhandler = dbhandler
+        self.executor = executor
+
+    def __getattr__(self, name):
+        """ get the attribute of the DBHandler instance, methods are wrapped as coroutine functions
+
+        :param name: attribute name
+
+        :return: attribute or coroutine function
+        """
+        attr = getattr(self.dbhandler, name)
+        if not callable(attr):
+            return attr
+
+        @wraps(attr)
+        async def coroutine(*args, **kwargs):
+            return await asyncio.get_event_loop().run_in_executor(self.executor, partial(attr, *args, **kwargs))
+
+        return coroutine
@@ -0,0 +1,182 @@
+import logging
+import asyncio
+from time import time
+from functools import partial
+from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+
+from ComunioScore.asyncdbhandler import AsyncDBHandler
+from ComunioScore.score import SofaScore
+from ComunioScore.score.asyncsofascore import AsyncBundesligaScore
+
+
+class AsyncLiveData(Thread):
+    """ class AsyncLiveData to fetch the livedata of all running matches as coroutines on one event loop
+
+    USAGE:
+            asynclivedata = AsyncLiveData(livedata=livedata)
+            asynclivedata.start()
+            asynclivedata.add_match(match_day=3, match_id=8272345, home_team='Hertha BSC', away_team='Fortuna Düsseldorf')
+
+    """
+    def __init__(self, livedata, max_workers=4):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class AsyncLiveData')
+
+        # init base class
+        Thread.__init__(self, name='AsyncLiveData')
+
+        # executor for the blocking database, matching and telegram calls
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        self.livedata = livedata
+        self.db = AsyncDBHandler(dbhandler=livedata, executor=self.executor)
+        self.bundesliga = AsyncBundesligaScore(executor=self.executor)
+
+        # polling intervals depending on the match phase
+        self.policy = livedata.pollingpolicy
+
+        self.loop = asyncio.new_event_loop()
+
+        # futures of the running matches with match id as key
+        self.matches = dict()
+
+    def run(self) -> None:
+        """ run thread for class AsyncLiveData
+
+        """
+        self.logger.info("Start AsyncLiveData run thread!")
+
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.bundesliga.close())
+            self.loop.close()
+            self.executor.shutdown(wait=False)
+
+    def stop(self):
+        """ cancels all running matches and stops the event loop
+
+        """
+        for future in list(self.matches.values()):
+            future.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def add_match(self, match_day, match_id, home_team, away_team):
+        """ adds a new match to the event loop, signature of the livedata event handler
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+
+        :return: concurrent future of the match
+        """
+        self.logger.info("AsyncLiveData adds match {}: {} vs. {}".format(match_id, home_team, away_team))
+        return self.schedule(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team)
+
+    def schedule(self, match_day, match_id, home_team, away_team, started=False):
+        """ schedules the fetch coroutine of a match on the event loop
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        :param started: the match was already started and is restarted after an error
+
+        :return: concurrent future of the match
+        """
+        future = asyncio.run_coroutine_threadsafe(self.fetch(match_day=match_day, match_id=match_id, home_team=home_team,
+                                                             away_team=away_team, started=started), self.loop)
+        self.matches[match_id] = future
+        future.add_done_callback(partial(self.match_done, match_day, match_id, home_team, away_team))
+        return future
+
+    def match_done(self, match_day, match_id, home_team, away_team, future):
+        """ removes a done match, a match which failed with an error is restarted after the interval of the unknown
+            phase
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        :param future: concurrent future of the match
+        """
+        self.matches.pop(match_id, None)
+        if future.cancelled() or (future.exception() is None):
+            return
+
+        delay = self.policy.interval(phase='unknown')
+        self.logger.error("AsyncLiveData match {} failed: {}, restart it in {} seconds".format(match_id, future.exception(),
+                                                                                             delay))
+        self.loop.call_soon_threadsafe(self.loop.call_later, delay, partial(self.schedule, match_day=match_day,
+                                                                             match_id=match_id, home_team=home_team,
+                                                                             away_team=away_team, started=True))
+
+    def get_matches(self):
+        """ get the match ids of the running matches
+
+        :return: list with match ids
+        """
+        return list(self.matches.keys())
+
+    async def fetch(self, match_day, match_id, home_team, away_team, started=False):
+        """ fetches live data from given match id for comunio players of interest
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        :param started: the match was already started and is restarted after an error
+        """
+        if not started:
+            await self.db.start_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team)
+
+        # collect livedata as long as match is not finished
+        last_msg_ts = time()
+        status = await self.bundesliga.match_status(matchid=match_id)
+        while status.get('type') != 'finished':
+            send = (time() - last_msg_ts) > self.livedata.msg_rate
+            await self.update(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team, send=send)
+            if send:
+                last_msg_ts = time()
+
+            await asyncio.sleep(self.policy.interval(status=status))  # update data depending on the match phase
+            await asyncio.get_event_loop().run_in_executor(self.executor, self.policy.refresh_quota,
+                                                           SofaScore.get_scraper_requests)
+            status = await self.bundesliga.match_status(matchid=match_id)
+
+        await self.db.finish_match(match_id=match_id, home_team=home_team, away_team=away_team)
+
+        # update livedata for the last time after the ratings are settled
+        await asyncio.sleep(self.policy.interval(phase='settlement'))
+        self.logger.info("Match {} vs {} finished, updating live data the last time".format(home_team, away_team))
+        await self.update(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team, send=True)
+
+        await self.db.close_match(match_id=match_id)
+
+    async def update(self, match_day, match_id, home_team, away_team, send):
+        """ requests the lineup without blocking and updates the livedata of one match
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        :param send: send the livedata as telegram message
+        """
+        try:
+            try:
+                match_lineup = await self.bundesliga.lineup_from_match_id(match_id=match_id)
+            except KeyError as ex:
+                self.logger.error("Could not request the lineup of match {}: {}".format(match_id, ex))
+                match_lineup = None
+            if match_lineup is None:
+                match_lineup = await self.db.last_lineup(match_id=match_id)
+            if match_lineup is None:
+                self.logger.error("No lineup for match {}, skip the update".format(match_id))
+                return
+            await self.db.update_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team,
+                                       send=send, match_lineup=match_lineup)
+        except Exception as ex:
+            self.logger.error("AsyncLiveData could not update match {}: {}".format(match_id, ex))
@@ -0,0 +1,128 @@
+import logging
+from threading import Lock
+from difflib import SequenceMatcher
+
+
+class ClubRegistry:
+    """ class ClubRegistry to resolve comunio club names to the canonical sofascore team names
+
+    USAGE:
+            registry = ClubRegistry(ratio=0.6)
+            registry.build(teams=['1. FC Köln', 'Bayern München'], clubs=['1. FC Köln', 'FC Bayern München'])
+            registry.resolve(club='FC Bayern München')
+
+    """
+    def __init__(self, ratio=0.6, aliases=None):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class ClubRegistry')
+
+        self.ratio = ratio
+
+        # aliases with lowercase club name as key and the canonical team name as value
+        self.aliases = dict()
+        if aliases is not None:
+            for alias, team in aliases.items():
+                self.add_alias(alias=alias, team=team)
+
+        self.teams = set()
+        self.clubs = dict()
+        self.unresolved = set()
+        # resolve is called from the fetch threads while build swaps the registry
+        self.registry_lock = Lock()
+
+    def add_alias(self, alias, team):
+        """ adds an alias for a canonical team name
+
+        :param alias: club name
+        :param team: canonical team name
+        """
+        self.aliases[alias.strip().lower()] = team.strip()
+
+    def build(self, teams, clubs):
+        """ builds the registry from the sofascore team names and the comunio club names
+
+        :param teams: list with sofascore team names from the season table
+        :param clubs: list with comunio club names from the squad table
+        """
+        teams = set(teams)
+        resolved, unresolved = dict(), set()
+
+        if teams:
+            for club in clubs:
+                team = self.__resolve_team(club=club, teams=teams)
+                resolved[club] = team
+                if team is None:
+                    unresolved.add(club)
+        else:
+            self.logger.error("No season teams to build the club registry, clubs are resolved by exact name")
+
+        with self.registry_lock:
+            self.teams = teams
+            self.clubs = resolved
+            self.unresolved = unresolved
+
+        if unresolved:
+            self.logger.error("Could not resolve the clubs {} to a team, add them to the [clubs] config section"
+                              .format(sorted(unresolved)))
+
+    def resolve(self, club):
+        """ resolves the comunio club name to the canonical team name
+
+        :param club: comunio club name
+
+        :return: canonical team name, None if the club could not be resolved
+        """
+        with self.registry_lock:
+            if club in self.clubs:
+                return self.clubs[club]
+            teams = self.teams
+
+        # without season teams the club name is compared exactly with the lineup team name
+        if not teams:
+            alias = None if club is None else self.aliases.get(club.strip().lower())
+            return club if alias is None else alias
+
+        team = self.__resolve_team(club=club, teams=teams)
+
+        with self.registry_lock:
+            # the registry could have been rebuilt in the meantime
+            if teams is self.teams:
+                self.clubs[club] = team
+                if team is None:
+                    self.unresolved.add(club)
+
+        return team
+
+    def __resolve_team(self, club, teams):
+        """ resolves the team with exact, alias and SequenceMatcher comparison
+
+        :param club: comunio club name
+        :param teams: set with sofascore team names
+
+        :return: team name, None if no team was found
+        """
+        if club is None:
+            return None
+
+        if club in teams:
+            return club
+
+        alias = self.aliases.get(club.strip().lower())
+        if alias is not None:
+            return alias
+
+        best_team, best_ratio = None, self.ratio
+        for team in sorted(teams):
+            ratio = SequenceMatcher(None, club, team).ratio()
+            if ratio > best_ratio:
+                best_team, best_ratio = team, ratio
+
+        return best_team
+
+    def get_unresolved(self):
+        """ get the club names which could not be resolved
+
+        :return: sorted list with club names
+        """
+        with self.registry_lock:
+            return sorted(self.unresolved)
@@ -35,6 +35,9 @@ class ComunioDB(DBHandler, Thread):
 
         self.user_data = None
 
+        # event handler
+        self.squad_updated_event_handler = None
+
     def run(self) -> None:
         """ run thread for class ComunioDB
 
@@ -62,6 +65,20 @@ class ComunioDB(DBHandler, Thread):
             self.update_comunio_user()
             self.update_squad()
 
+    def register_squad_updated_event_handler(self, func):
+        """ register the squad updated event handler
+
+        :param func: event handler
+        """
+        self.squad_updated_event_handler = func
+
+    def notify_squad_updated(self):
+        """ notifies the squad updated event handler
+
+        """
+        if self.squad_updated_event_handler:
+            self.squad_updated_event_handler()
+
     def insert_comunio_user(self):
         """ insert comunio user into database
 
@@ -135,6 +152,8 @@ class ComunioDB(DBHandler, Thread):
         except DBInserterError as ex:
             self.logger.error(ex)
 
+        self.notify_squad_updated()
+
     def update_squad(self):
         """ updates the squad data from comunio user
 
@@ -155,6 +174,8 @@ class ComunioDB(DBHandler, Thread):
         except Exception as ex:
             self.logger.error(ex)
 
+        self.notify_squad_updated()
+
     def delete_squad(self):
         """ deletes squad data from database
 
@@ -204,6 +225,8 @@ class ComunioDB(DBHandler, Thread):
                 except DBInserterError as ex:
                     self.logger.error(ex)
 
+        self.notify_squad_updated()
+
     def insert_auth(self):
         """ insert comunio auth data into database
 
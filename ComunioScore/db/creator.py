@@ -67,6 +67,8 @@ class Table:
             Table("page", Column('id', 'int', False, False), schema="web")
             Table("page")
 
+    several columns with prim_key build a composite primary key of these columns
+
     """
     def __init__(self, name, *columns, schema=None):
         self.logger = logging.getLogger('ComunioScore')
@@ -80,7 +82,14 @@ class Table:
         else:
             self.sql_table = "create table if not exists  {}.{} ".format(self.schema, self.name)
 
-        if len(columns) == 0:
+        prim_key_columns = [column for column in columns
+                            if isinstance(column, Column) and column.prim_key and not column.exist_table]
+        if len(prim_key_columns) > 1:
+            column_strs = ["{} {} ".format(column.name, column.type) if column in prim_key_columns else str(column)
+                           for column in columns]
+            column_strs.append("primary key ({})".format(", ".join(column.name for column in prim_key_columns)))
+            self.sql_table = self.sql_table + "(" + ", ".join(column_strs) + ")"
+        elif len(columns) == 0:
             self.sql_table = self.sql_table + "()"
         elif len(columns) == 1:
             self.sql_table = self.sql_table + str(columns).replace(',', '')
@@ -1,6 +1,13 @@
+import sqlite3
 import logging
+from threading import Lock
 from ComunioScore.db import DBConnector, Error
 from ComunioScore.exceptions import DBInserterError, DBIntegrityError
+try:
+    from psycopg2.extras import execute_values
+    is_execute_values_importable = True
+except ImportError:
+    is_execute_values_importable = False
 
 
 class DBInserter(DBConnector):
@@ -12,6 +19,9 @@ class DBInserter(DBConnector):
             inserter.row(sql=sql, data=(3, "test", 5))
 
     """
+    # the sqlite connection is shared by all threads, explicit transactions must not interleave
+    sqlite_lock = Lock()
+
     def __init__(self):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class DBInserter')
@@ -55,6 +65,8 @@ class DBInserter(DBConnector):
                 if e.pgcode == '23505':
 
                     raise DBIntegrityError(e)
+            except sqlite3.IntegrityError as e:
+                raise DBIntegrityError(e)
 
     def many_rows(self, sql, datas, autocommit=False):
         """ insert many rows into database table
@@ -69,15 +81,112 @@ class DBInserter(DBConnector):
         :param autocommit: bool to enable autocomm
         """
         if isinstance(datas, list):
-            with self.get_cursor(autocommit=autocommit) as cursor:
-                if self.is_sqlite:
-                    sql = sql.replace('%s', '?')
-                try:
-                    cursor.executemany(sql, datas)
-                except Error as e:
-                    if e.pgcode == '23505':
-                        raise DBIntegrityError(e)
+            self.__execute_rows(sql=sql, datas=datas, autocommit=autocommit)
         else:
             raise DBInserterError("'datas' must be type of list")
 
+    def many_rows_counted(self, sql, datas, autocommit=False):
+        """ executes a sql statement for many rows in one transaction and counts the affected rows of each row
+
+                sql= UPDATE comunio SET wealth = %s WHERE id = %s
+                datas = [(353.24, 13), (400.02, 14)]
+
+                many_rows_counted(sql=sql, datas=datas)
+
+        :param sql: sql statement
+        :param datas: data as a list
+        :param autocommit: bool to enable autocommit
+
+        :return: list with the number of affected rows for each row of datas
+        """
+        if not isinstance(datas, list):
+            raise DBInserterError("'datas' must be type of list")
 
+        return self.__execute_rows(sql=sql, datas=datas, autocommit=autocommit, counted=True)
+
+    def __execute_rows(self, sql, datas, autocommit=False, counted=False):
+        """ executes a sql statement for many rows in one transaction, a failed row rolls back all rows
+
+        :param sql: sql statement
+        :param datas: data as a list
+        :param autocommit: bool to enable autocommit
+        :param counted: execute the rows one by one to count the affected rows of each row
+
+        :return: list with the number of affected rows for each row if counted, else None
+        """
+        if self.is_sqlite:
+            sql = sql.replace('%s', '?')
+            # the sqlite connection runs in autocommit mode, so the transaction is started explicitly
+            with self.sqlite_lock, self.get_cursor(autocommit=autocommit) as cursor:
+                cursor.execute("begin")
+                try:
+                    counts = self.__execute(cursor=cursor, sql=sql, datas=datas, counted=counted)
+                except (DBInserterError, DBIntegrityError):
+                    cursor.execute("rollback")
+                    raise
+                cursor.execute("commit")
+                return counts
+
+        with self.get_cursor(autocommit=autocommit) as cursor:
+            return self.__execute(cursor=cursor, sql=sql, datas=datas, counted=counted)
+
+    @staticmethod
+    def __execute(cursor, sql, datas, counted=False):
+        """ executes a sql statement for many rows with the cursor
+
+        :param cursor: cursor object
+        :param sql: sql statement
+        :param datas: data as a list
+        :param counted: execute the rows one by one to count the affected rows of each row
+
+        :return: list with the number of affected rows for each row if counted, else None
+        """
+        try:
+            if not counted:
+                cursor.executemany(sql, datas)
+                return None
+
+            counts = list()
+            for data in datas:
+                cursor.execute(sql, data)
+                counts.append(cursor.rowcount)
+            return counts
+        except Error as e:
+            if e.pgcode == '23505':
+                raise DBIntegrityError(e)
+            raise DBInserterError(e)
+        except sqlite3.IntegrityError as e:
+            raise DBIntegrityError(e)
+        except sqlite3.Error as e:
+            raise DBInserterError(e)
+
+    def many_values(self, sql, datas, template=None, page_size=100, fetch=False, autocommit=False):
+        """ executes a sql statement with a VALUES list for many rows in one statement (postgres only)
+
+                sql= UPDATE comunio AS c SET wealth = v.wealth FROM (VALUES %s) AS v(id, wealth) WHERE c.id = v.id
+                datas = [(13, 353.24), (14, 400.02)]
+
+                many_values(sql=sql, datas=datas)
+
+        :param sql: sql statement with one %s placeholder for the values
+        :param datas: data as a list
+        :param template: template for one row of the values
+        :param page_size: maximum number of rows per statement
+        :param fetch: fetch the rows of a RETURNING clause
+        :param autocommit: bool to enable autocommit
+
+        :return: list with the returned rows if fetch, else None
+        """
+        if not isinstance(datas, list):
+            raise DBInserterError("'datas' must be type of list")
+
+        if self.is_sqlite or not is_execute_values_importable:
+            raise DBInserterError("many_values is only supported for postgres databases")
+
+        with self.get_cursor(autocommit=autocommit) as cursor:
+            try:
+                return execute_values(cursor, sql, datas, template=template, page_size=page_size, fetch=fetch)
+            except Error as e:
+                if e.pgcode == '23505':
+                    raise DBIntegrityError(e)
+                raise DBInserterError(e)
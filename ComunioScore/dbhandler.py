@@ -1,8 +1,12 @@
+import json
+import zlib
+import hashlib
 import logging
+from time import time
 
 from ComunioScore.db import DBConnector, DBInserter, DBFetcher
 from ComunioScore.db import DBCreator, Schema, Table, Column
-from ComunioScore.exceptions import DBConnectorError, DBInserterError
+from ComunioScore.exceptions import DBConnectorError, DBInserterError, DBIntegrityError
 
 
 class DBHandler:
@@ -39,7 +43,14 @@ class DBHandler:
                 self.comunioscore_table_squad  = "squad"
                 self.comunioscore_table_season = "season"
                 self.comunioscore_table_points = "points"
+                self.comunioscore_table_playermapping = "playermapping"
+                self.comunioscore_table_lineupsnapshot = "lineupsnapshot"
+                self.comunioscore_table_squadsnapshot = "squadsnapshot"
+                self.binary_type = "bytea"
                 self.postgres = True
+                self.points_written = dict()
+                self.lineup_snapshot_hashes = dict()
+                self.squad_snapshot_hashes = dict()
 
                 # at start create all necessary tables for comunioscore
                 self.__create_tables_for_communioscore()
@@ -48,7 +59,7 @@ class DBHandler:
                 self.logger.error("DBHandler could not connect to the postgres database")
                 raise DBConnectorError("DBHandler could not connect to the postgres database")
         else:
-            path = '/var/log/ComunioScore/comunioscore.db'
+            path = dbparams.get('path') or '/var/log/ComunioScore/comunioscore.db'
 
             if DBConnector.connect_sqlite(path=path):
 
@@ -62,7 +73,14 @@ class DBHandler:
                 self.comunioscore_table_squad  = "squad"
                 self.comunioscore_table_season = "season"
                 self.comunioscore_table_points = "points"
+                self.comunioscore_table_playermapping = "playermapping"
+                self.comunioscore_table_lineupsnapshot = "lineupsnapshot"
+                self.comunioscore_table_squadsnapshot = "squadsnapshot"
+                self.binary_type = "blob"
                 self.postgres = False
+                self.points_written = dict()
+                self.lineup_snapshot_hashes = dict()
+                self.squad_snapshot_hashes = dict()
 
                 # at start create all necessary tables for comunioscore
                 self.__create_tables_for_communioscore()
@@ -115,6 +133,33 @@ class DBHandler:
                                      Column(name="linedup", type="text"),
                                      schema=self.comunioscore_schema))
 
+        # create table if not exists playermapping
+        self.logger.info("Create Table {}".format(self.comunioscore_table_playermapping))
+        self.dbcreator.build(obj=Table(self.comunioscore_table_playermapping,
+                                       Column(name="playername", type="text", prim_key=True),
+                                       Column(name="club", type="text", prim_key=True),
+                                       Column(name="sofascore_playerid", type="bigint"),
+                                       Column(name="sofascore_playername", type="text"),
+                                       schema=self.comunioscore_schema))
+
+        # create table if not exists lineupsnapshot
+        self.logger.info("Create Table {}".format(self.comunioscore_table_lineupsnapshot))
+        self.dbcreator.build(obj=Table(self.comunioscore_table_lineupsnapshot,
+                                       Column(name="match_id", type="bigint"),
+                                       Column(name="timestamp", type="bigint"),
+                                       Column(name="hash", type="text"),
+                                       Column(name="data", type=self.binary_type),
+                                       schema=self.comunioscore_schema))
+
+        # create table if not exists squadsnapshot
+        self.logger.info("Create Table {}".format(self.comunioscore_table_squadsnapshot))
+        self.dbcreator.build(obj=Table(self.comunioscore_table_squadsnapshot,
+                                       Column(name="match_id", type="bigint"),
+                                       Column(name="timestamp", type="bigint"),
+                                       Column(name="hash", type="text"),
+                                       Column(name="data", type=self.binary_type),
+                                       schema=self.comunioscore_schema))
+
         # create table if not exists season
         self.logger.info("Create Table {}".format(self.comunioscore_table_season))
         self.dbcreator.build(obj=Table(self.comunioscore_table_season,
@@ -145,6 +190,198 @@ class DBHandler:
                                        Column(name="points_off", type="Integer"),
                                        schema=self.comunioscore_schema))
 
+    def query_player_mapping(self):
+        """ queries the mapping of comunio players to sofascore players
+
+        :return: dict with (playername, club) as key and (sofascore_playerid, sofascore_playername) as value
+        """
+        mapping_sql = "select playername, club, sofascore_playerid, sofascore_playername from {}.{}"\
+                      .format(self.comunioscore_schema, self.comunioscore_table_playermapping)
+
+        try:
+            data = self.dbfetcher.all(sql=mapping_sql)
+        except DBInserterError as ex:
+            self.logger.error(ex)
+            data = list()
+
+        return {(playername, club): (playerid, sofascore_playername) for (playername, club, playerid, sofascore_playername) in data}
+
+    def insert_player_mapping(self, playername, club, sofascore_playerid, sofascore_playername):
+        """ inserts a new mapping of a comunio player to a sofascore player
+
+        """
+        mapping_sql = "insert into {}.{} (playername, club, sofascore_playerid, sofascore_playername) values (%s, %s, %s, %s)"\
+                      .format(self.comunioscore_schema, self.comunioscore_table_playermapping)
+
+        try:
+            self.dbinserter.row(sql=mapping_sql, data=(playername, club, sofascore_playerid, sofascore_playername))
+        except DBIntegrityError:
+            # another thread or a previous run has already mapped the player
+            self.logger.info("Player {} of {} is already mapped".format(playername, club))
+        except DBInserterError as ex:
+            self.logger.error(ex)
+
+    def store_lineup_snapshot(self, match_id, lineup):
+        """ stores the raw sofascore lineup json of a match compressed, unchanged lineups are skipped by their hash
+
+        :param match_id: match id
+        :param lineup: raw json dict of get_lineups_match
+
+        :return: True if the snapshot was stored, False if it was unchanged
+        """
+        return self.__store_snapshot(table=self.comunioscore_table_lineupsnapshot, hashes=self.lineup_snapshot_hashes,
+                                     match_id=match_id, data=lineup)
+
+    def query_last_lineup_snapshot(self, match_id, hash_only=False):
+        """ queries the last stored lineup snapshot of a match
+
+        :param match_id: match id
+        :param hash_only: return the hash instead of the decompressed lineup
+
+        :return: tuple (timestamp in milliseconds, lineup json dict or hash), None if no snapshot is stored
+        """
+        return self.__query_last_snapshot(table=self.comunioscore_table_lineupsnapshot, match_id=match_id,
+                                          hash_only=hash_only)
+
+    def store_squad_snapshot(self, match_id, squads):
+        """ stores the linedup squads of all users for a match compressed, unchanged squads are skipped by their hash
+
+        :param match_id: match id
+        :param squads: dict with userid as key and {'user': username, 'community': community, 'squad': [[playername,
+                       playerposition, club], ...]} as value
+
+        :return: True if the snapshot was stored, False if it was unchanged
+        """
+        return self.__store_snapshot(table=self.comunioscore_table_squadsnapshot, hashes=self.squad_snapshot_hashes,
+                                     match_id=match_id, data=squads)
+
+    def query_last_squad_snapshot(self, match_id, hash_only=False):
+        """ queries the last stored squad snapshot of a match
+
+        :param match_id: match id
+        :param hash_only: return the hash instead of the decompressed squads
+
+        :return: tuple (timestamp in milliseconds, squads json dict or hash), None if no snapshot is stored
+        """
+        return self.__query_last_snapshot(table=self.comunioscore_table_squadsnapshot, match_id=match_id,
+                                          hash_only=hash_only)
+
+    def __store_snapshot(self, table, hashes, match_id, data):
+        """ stores a json snapshot of a match compressed, unchanged snapshots are skipped by their hash
+
+        :param table: snapshot table
+        :param hashes: dict with match id as key and (timestamp, hash) of the last snapshot as value
+        :param match_id: match id
+        :param data: json dict
+
+        :return: True if the snapshot was stored, False if it was unchanged
+        """
+        payload = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        snapshot_hash = hashlib.sha1(payload).hexdigest()
+
+        if match_id not in hashes:
+            hashes[match_id] = self.__query_last_snapshot(table=table, match_id=match_id, hash_only=True)
+
+        last_snapshot = hashes[match_id]
+        if last_snapshot and (last_snapshot[1] == snapshot_hash):
+            return False
+
+        # strictly increasing timestamps to keep the order of snapshots within the same millisecond
+        timestamp = int(time() * 1000)
+        if last_snapshot and (timestamp <= last_snapshot[0]):
+            timestamp = last_snapshot[0] + 1
+
+        snapshot_sql = "insert into {}.{} (match_id, timestamp, hash, data) values (%s, %s, %s, %s)"\
+                       .format(self.comunioscore_schema, table)
+        try:
+            self.dbinserter.row(sql=snapshot_sql, data=(match_id, timestamp, snapshot_hash, zlib.compress(payload)))
+        except DBInserterError as ex:
+            self.logger.error(ex)
+            return False
+
+        hashes[match_id] = (timestamp, snapshot_hash)
+        return True
+
+    def __query_last_snapshot(self, table, match_id, hash_only=False):
+        """ queries the last stored snapshot of a match
+
+        :param table: snapshot table
+        :param match_id: match id
+        :param hash_only: return the hash instead of the decompressed json
+
+        :return: tuple (timestamp in milliseconds, json dict or hash), None if no snapshot is stored
+        """
+        snapshot_sql = "select timestamp, {} from {}.{} where match_id = %s order by timestamp desc limit 1"\
+                       .format('hash' if hash_only else 'data', self.comunioscore_schema, table)
+        try:
+            snapshot = self.dbfetcher.one(sql=snapshot_sql, data=(match_id,))
+        except DBInserterError as ex:
+            self.logger.error(ex)
+            return None
+
+        if snapshot is None:
+            return None
+        if hash_only:
+            return snapshot[0], snapshot[1]
+        return snapshot[0], json.loads(zlib.decompress(bytes(snapshot[1])).decode('utf-8'))
+
+    def query_lineup_snapshot_records(self):
+        """ queries the last lineup snapshot of every match with the match data of the season table
+
+        :return: list with (match_day, match_id, homeTeam, awayTeam, lineup json dict)
+        """
+        snapshots_sql = "select se.match_day, sn.match_id, se.homeTeam, se.awayTeam, sn.data from {schema}.{snapshot} as sn " \
+                        "join (select match_id, max(timestamp) as timestamp from {schema}.{snapshot} group by match_id) as l " \
+                        "on sn.match_id = l.match_id and sn.timestamp = l.timestamp " \
+                        "join {schema}.{season} as se on se.match_id = sn.match_id " \
+                        "order by se.match_day, sn.match_id".format(schema=self.comunioscore_schema,
+                                                                   snapshot=self.comunioscore_table_lineupsnapshot,
+                                                                   season=self.comunioscore_table_season)
+        records = list()
+        try:
+            for (match_day, match_id, home_team, away_team, data) in self.dbfetcher.all(sql=snapshots_sql):
+                records.append((match_day, match_id, home_team, away_team,
+                                json.loads(zlib.decompress(bytes(data)).decode('utf-8'))))
+        except DBInserterError as ex:
+            self.logger.error(ex)
+
+        return records
+
+    def query_linedup_squads(self):
+        """ queries the linedup squads of all comunio users with one query
+
+        :return: dict with userid as key and list of (playername, playerposition, club) as value
+        """
+        squads_sql = "select userid, playername, playerposition, club from {}.{} where linedup = 'true'"\
+                     .format(self.comunioscore_schema, self.comunioscore_table_squad)
+
+        squads = dict()
+        try:
+            for (userid, playername, playerposition, club) in self.dbfetcher.all(sql=squads_sql):
+                squads.setdefault(userid, list()).append((playername, playerposition, club))
+        except DBInserterError as ex:
+            self.logger.error(ex)
+
+        return squads
+
+    def query_club_names(self):
+        """ queries the team names from the season table and the club names from the squad table
+
+        :return: list with team names, list with club names
+        """
+        teams_sql = "select homeTeam from {schema}.{table} union select awayTeam from {schema}.{table}"\
+                    .format(schema=self.comunioscore_schema, table=self.comunioscore_table_season)
+        clubs_sql = "select distinct club from {}.{}".format(self.comunioscore_schema, self.comunioscore_table_squad)
+
+        try:
+            teams = [team[0] for team in self.dbfetcher.all(sql=teams_sql)]
+            clubs = [club[0] for club in self.dbfetcher.all(sql=clubs_sql)]
+        except DBInserterError as ex:
+            self.logger.error(ex)
+            teams, clubs = list(), list()
+
+        return teams, clubs
+
     def update_points_in_database(self, userid, match_id, match_day, points_rating, points_goal, points_off):
         """ updates the points_rating, points_offs and points_goals per match in the database
 
@@ -157,6 +394,57 @@ class DBHandler:
         except DBInserterError as ex:
             self.logger.error(ex)
 
+    def update_points_in_database_batch(self, match_id, match_day, points):
+        """ updates the points of many users for one match in one transaction, unchanged points are skipped
+
+        :param match_id: match id
+        :param match_day: match day
+        :param points: list with (userid, points_rating, points_goal, points_off)
+
+        :return: True if the points of all users are written, False if the write failed or a points row is missing
+        """
+        points_written = self.points_written.get(match_id, dict())
+        changed_points = [(userid, points_rating, points_goal, points_off)
+                          for (userid, points_rating, points_goal, points_off) in points
+                          if points_written.get((userid, match_day)) != (points_rating, points_goal, points_off)]
+
+        if not changed_points:
+            return True
+
+        try:
+            if self.postgres:
+                points_sql = "update {}.{} as p set points_rating = v.points_rating, points_goal = v.points_goal, " \
+                             "points_off = v.points_off from (values %s) as v(userid, match_day, match_id, points_rating, " \
+                             "points_goal, points_off) where p.userid = v.userid and p.match_day = v.match_day " \
+                             "and p.match_id = v.match_id returning p.userid".format(self.comunioscore_schema,
+                                                                                      self.comunioscore_table_points)
+                rows = self.dbinserter.many_values(sql=points_sql, fetch=True,
+                                                   datas=[(userid, match_day, match_id, points_rating, points_goal, points_off)
+                                                          for (userid, points_rating, points_goal, points_off) in changed_points])
+                updated_userids = {row[0] for row in rows}
+            else:
+                points_sql = "update {}.{} set points_rating = %s, points_goal = %s, points_off = %s where userid = %s " \
+                             "and match_day = %s and match_id = %s".format(self.comunioscore_schema, self.comunioscore_table_points)
+                counts = self.dbinserter.many_rows_counted(sql=points_sql,
+                                                           datas=[(points_rating, points_goal, points_off, userid, match_day, match_id)
+                                                                  for (userid, points_rating, points_goal, points_off) in changed_points])
+                updated_userids = {points[0] for (points, count) in zip(changed_points, counts) if count > 0}
+        except (DBInserterError, DBIntegrityError) as ex:
+            self.logger.error("Could not write the points of match {}: {}".format(match_id, ex))
+            return False
+
+        # only updated rows are cached, points without a row in the points table are written again
+        points_written = self.points_written.setdefault(match_id, dict())
+        for (userid, points_rating, points_goal, points_off) in changed_points:
+            if userid in updated_userids:
+                points_written[(userid, match_day)] = (points_rating, points_goal, points_off)
+
+        missing_userids = {points[0] for points in changed_points} - updated_userids
+        if missing_userids:
+            self.logger.error("No points row of match {} for the users {}".format(match_id, sorted(missing_userids)))
+            return False
+        return True
+
     def query_rating_goal_off_points(self, userid, match_day, match_id=None):
         """ queries points for rating, goal and offs from the points table in the database
 
@@ -179,3 +467,43 @@ class DBHandler:
             data = list()
 
         return data
+
+    def query_match_points(self, match_id):
+        """ queries the points of all users for one match
+
+        :param match_id: match id
+
+        :return: dict with userid as key and (points_rating, points_goal, points_off) as value
+        """
+        points_sql = "select userid, points_rating, points_goal, points_off from {}.{} where match_id = %s"\
+                     .format(self.comunioscore_schema, self.comunioscore_table_points)
+
+        points = dict()
+        try:
+            for (userid, points_rating, points_goal, points_off) in self.dbfetcher.all(sql=points_sql, data=(match_id,)):
+                points[userid] = (points_rating, points_goal, points_off)
+        except DBInserterError as ex:
+            self.logger.error(ex)
+
+        return points
+
+    def query_points_ranking(self, match_day):
+        """ queries the sum of points for each user on the match day, sorted by points
+
+        :param match_day: match day
+
+        :return: list with (username, points)
+        """
+        ranking_sql = "select u.username, coalesce(sum(p.points_rating + p.points_goal + p.points_off), 0) as points " \
+                      "from {schema}.{user} as u left join {schema}.{points} as p on p.userid = u.userid and p.match_day = %s " \
+                      "group by u.userid, u.username order by points desc".format(schema=self.comunioscore_schema,
+                                                                                  user=self.comunioscore_table_user,
+                                                                                  points=self.comunioscore_table_points)
+
+        try:
+            data = self.dbfetcher.all(sql=ranking_sql, data=(match_day,))
+        except DBInserterError as ex:
+            self.logger.error(ex)
+            data = list()
+
+        return data
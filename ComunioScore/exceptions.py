@@ -25,7 +25,21 @@ class SofascoreRequestError(Exception):
     pass
 
 
+class SofascoreQuotaError(SofascoreRequestError):
+    """SofascoreQuotaError"""
+    pass
+
+
+class SofascoreCircuitOpenError(SofascoreRequestError):
+    """SofascoreCircuitOpenError"""
+    pass
+
+
 class ComunioAccessTokenError(Exception):
     """ComunioAccessTokenError"""
     pass
 
+
+class ScoringRulesError(Exception):
+    """ScoringRulesError"""
+    pass
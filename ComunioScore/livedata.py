@@ -1,12 +1,15 @@
 import logging
-import unicodedata
 from time import sleep
 from threading import Lock
-from difflib import SequenceMatcher
 
 from ComunioScore import DBHandler
 from ComunioScore.score import BundesligaScore
-from ComunioScore import PointCalculator
+from ComunioScore.scoringrules import ScoringRules
+from ComunioScore.playermatcher import PlayerMatcher
+from ComunioScore.clubregistry import ClubRegistry
+from ComunioScore.squadcache import SquadCache
+from ComunioScore.pollingpolicy import PollingPolicy
+from ComunioScore.records import UserMatchScore, ScoredPlayer
 
 
 class LiveData(DBHandler):
@@ -30,19 +33,45 @@ class LiveData(DBHandler):
         self.running = True
         self.is_notify = True
         self.msg_rate = 10 * 60  # 10 min as default
-        self.msg_rate_timer = 0
 
         # bundesligascore instance
         self.bundesliga = BundesligaScore()
 
-        # create PointCalculator instance
-        self.pointcalculator = PointCalculator()
+        # polling intervals depending on the match phase
+        self.pollingpolicy = PollingPolicy()
+
+        # compiled scoring rule sets, the default PointCalculator is used for communities without an own rule set
+        self.scoringrules = ScoringRules()
+        self.pointcalculator = self.scoringrules.get()
+
+        # player matcher per match id and the SequenceMatcher ratios for home and away players
+        self.player_matchers = dict()
+        self.home_match_ratio = 0.74
+        self.away_match_ratio = 0.77
+
+        # registry to resolve comunio club names to sofascore team names
+        self.clubregistry = ClubRegistry()
+
+        # persisted mapping of comunio players to sofascore player ids: {(playername, club): (playerid, name)}
+        self.player_mapping = None
+        self.player_mapping_lock = Lock()
 
         # sql
-        self.user_sql = "select userid, username from {}.{}".format(self.comunioscore_schema, self.comunioscore_table_user)
-        self.squad_sql = "select playername, playerposition, club  from {}.{} where userid = %s and linedup = 'true' ".format(self.comunioscore_schema, self.comunioscore_table_squad)
+        self.user_sql = "select userid, username, community from {}.{}".format(self.comunioscore_schema, self.comunioscore_table_user)
         self.comunio_users = self.dbfetcher.all(sql=self.user_sql)
 
+        # linedup squads of all comunio users, shared by all fetch threads
+        self.squadcache = SquadCache()
+
+        # incremental mode: only users with changed players are recalculated and written to the database
+        self.incremental = True
+        self.match_snapshots = dict()
+        self.match_livedata = dict()
+        self.match_scores = dict()
+
+        # squad version of the last stored squad snapshot per match, the squads are replayed with the lineup snapshots
+        self.squad_snapshot_versions = dict()
+
         # event handler
         self.update_squad_event_handler = None
         self.telegram_send_event_handler = None
@@ -50,9 +79,6 @@ class LiveData(DBHandler):
         # init current match day to None
         self.current_match_day = None
 
-        # create lock object
-        self.telegram_lock = Lock()
-
     def register_update_squad_event_handler(self, func):
         """ register the update squad event handler
 
@@ -75,15 +101,46 @@ class LiveData(DBHandler):
         :param home_team: home team
         :param away_team: away team
         """
+        self.start_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team)
 
+        # collect livedata as long as match is not finished
+        msg_rate_timer = 0
+        status = self.bundesliga.match_status(matchid=match_id)
+        while status.get('type') != 'finished':
+            if msg_rate_timer > self.msg_rate:
+                self.update_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team, send=True)
+                msg_rate_timer = 0
+            else:
+                self.update_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team, send=False)
+            interval = self.pollingpolicy.interval(status=status)
+            sleep(interval)  # update data depending on the match phase
+            msg_rate_timer += interval
+            self.pollingpolicy.refresh_quota(func=self.bundesliga.get_scraper_requests)
+            status = self.bundesliga.match_status(matchid=match_id)
+
+        self.finish_match(match_id=match_id, home_team=home_team, away_team=away_team)
+
+        # update livedata for the last time after the ratings are settled
+        sleep(self.pollingpolicy.interval(phase='settlement'))
+        self.logger.info("Match {} vs {} finished, updating live data the last time".format(home_team, away_team))
+        self.update_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team, send=True)
+
+        self.close_match(match_id=match_id)
+
+    def start_match(self, match_day, match_id, home_team, away_team):
+        """ starts fetching live data for the given match
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        """
         live_data_start_msg = "Start fetching live data from match day {}: *{}* vs. *{}*".format(match_day, home_team, away_team)
         self.logger.info(live_data_start_msg)
 
         # send start msg
         if self.is_notify:
-            self.telegram_lock.acquire()
-            self.telegram_send_event_handler(live_data_start_msg)
-            self.telegram_lock.release()
+            self.telegram_send_event_handler(text=live_data_start_msg)
 
         # set current match_day
         self.current_match_day = match_day
@@ -91,63 +148,182 @@ class LiveData(DBHandler):
         # update linedup comunio players in database before sending livedata
         self.update_linedup_squad()
 
-        def update_livedata(send=False):
+    def update_match(self, match_day, match_id, home_team, away_team, send=False, match_lineup=None):
+        """ updates the livedata and points of the given match
 
-            # get all comunio players of interest for sofascore rating
-            players_of_interest_for_match = self.set_comunio_players_of_interest_for_match(home_team=home_team, away_team=away_team)
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        :param send: send the livedata as telegram message
+        :param match_lineup: already fetched match lineup, None to request it
+        """
 
-            # get match lineup from match id
-            match_lineup = self.bundesliga.lineup_from_match_id(match_id=match_id)
+        # get all comunio players of interest for sofascore rating
+        players_of_interest_for_match = self.set_comunio_players_of_interest_for_match(home_team=home_team, away_team=away_team)
+        self.store_match_squads(match_id=match_id)
+
+        # get match lineup from match id
+        if match_lineup is None:
+            match_lineup = self.request_lineup(match_id=match_id)
+        if match_lineup is None:
+            self.logger.error("No lineup for match day {}: {} vs. {}, skip the update".format(match_day, home_team, away_team))
+            return
+
+        # compare ratings and incidents with the last update
+        changed_players = self.diff_lineup_snapshot(match_id=match_id, match_lineup=match_lineup) if self.incremental else None
+        last_livedata = self.match_livedata.get(match_id)
 
+        if (changed_players is None) or changed_players or (last_livedata is None):
             # create livedata with mapping of comunio players and sofascore lineup players
             self.logger.info("Map livedata for match day {}: {} vs. {}".format(match_day, home_team, away_team))
             livedata = self.map_players_of_interest_with_match_lineup(players_of_interest=players_of_interest_for_match,
-                                                                      match_lineup=match_lineup)
+                                                                      match_lineup=match_lineup, match_id=match_id)
+            self.match_livedata[match_id] = livedata
 
             # calculate the points for current match day
             self.logger.info("Calculate points for match day {}: {} vs. {}".format(match_day, home_team, away_team))
-            self.calculate_points_per_match(livedata=livedata, match_id=match_id, match_day=match_day)
+            userids = self.get_affected_users(livedata=livedata, last_livedata=last_livedata, changed_players=changed_players)
+            scores = self.calculate_points_per_match(livedata=livedata, match_id=match_id, match_day=match_day, userids=userids)
+            self.match_scores.setdefault(match_id, dict()).update(scores)
+        else:
+            self.logger.info("No rating or incident changes for match day {}: {} vs. {}".format(match_day, home_team, away_team))
+            livedata = last_livedata
 
-            if self.is_notify and send:
-                # prepare the telegram message
-                self.logger.info("Prepare telegram message for match day {}: {} vs. {}".format(match_day, home_team, away_team))
-                livedata_msg = self.prepare_telegram_message(livedata=livedata, home_team=home_team, away_team=away_team,
-                                                             match_day=match_day, match_id=match_id)
+        if self.is_notify and send:
+            # prepare the telegram message
+            self.logger.info("Prepare telegram message for match day {}: {} vs. {}".format(match_day, home_team, away_team))
+            livedata_msg = self.prepare_telegram_message(livedata=livedata, scores=self.match_scores.get(match_id, dict()),
+                                                         home_team=home_team, away_team=away_team)
 
-                self.telegram_lock.acquire()
-                self.telegram_send_event_handler(text=livedata_msg)
-                self.telegram_lock.release()
-                self.msg_rate_timer = 0
+            self.telegram_send_event_handler(text=livedata_msg, key=match_id, match_day=match_day)
 
-        # collect livedata as long as match is not finished
-        #while self.running:
-        while not self.bundesliga.is_finished(matchid=match_id):
-            if self.msg_rate_timer > self.msg_rate:
-                update_livedata(send=True)
-            else:
-                update_livedata(send=False)
-            sleep(480)  # update data every 8 minutes
-            self.msg_rate_timer += 480
+    def request_lineup(self, match_id):
+        """ requests the match lineup, the last stored lineup snapshot is used if the request fails
+
+        :param match_id: match id for sofascore
+
+        :return: match lineup, None if neither the lineup nor a snapshot is available
+        """
+        try:
+            match_lineup = self.bundesliga.lineup_from_match_id(match_id=match_id)
+        except KeyError as ex:
+            self.logger.error("Could not request the lineup of match {}: {}".format(match_id, ex))
+            match_lineup = None
 
+        if match_lineup is None:
+            match_lineup = self.last_lineup(match_id=match_id)
+        return match_lineup
+
+    def last_lineup(self, match_id):
+        """ get the match lineup from the last stored lineup snapshot
+
+        :param match_id: match id for sofascore
+
+        :return: match lineup, None if no snapshot is stored
+        """
+        snapshot = self.query_last_lineup_snapshot(match_id=match_id)
+        if snapshot is None:
+            return None
+
+        self.logger.info("Use the lineup snapshot of match {} from {}".format(match_id, snapshot[0]))
+        return self.bundesliga.parse_lineup(lineup=snapshot[1])
+
+    def finish_match(self, match_id, home_team, away_team):
+        """ sends the finish message of the given match
+
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        """
         # after match is finished send msg
         live_data_end_msg = "Finished fetching live data from match *{}* vs *{}*".format(home_team, away_team)
         self.logger.info(live_data_end_msg)
 
         if self.is_notify:
             # send finish msg
-            self.telegram_lock.acquire()
             self.telegram_send_event_handler(text=live_data_end_msg)
-            self.telegram_lock.release()
 
-        # update livedata for the last time
-        if self.bundesliga.is_finished(matchid=match_id):
-            sleep(600)  # sleep 10 minutes and update last time
-            self.logger.info("Match {} vs {} finished, updating live data the last time after 10 min".format(home_team, away_team))
-            update_livedata(send=True)
+    def close_match(self, match_id):
+        """ closes the given match after the last update
 
+        :param match_id: match id for sofascore
+        """
         # set linedup squad to false
         LiveData.is_squad_updated = False
 
+        # remove the player matcher, snapshots, snapshot hashes and written points of the finished match
+        self.player_matchers.pop(match_id, None)
+        self.match_snapshots.pop(match_id, None)
+        self.match_livedata.pop(match_id, None)
+        self.match_scores.pop(match_id, None)
+        self.lineup_snapshot_hashes.pop(match_id, None)
+        self.squad_snapshot_versions.pop(match_id, None)
+        self.squad_snapshot_hashes.pop(match_id, None)
+        self.points_written.pop(match_id, None)
+
+    def diff_lineup_snapshot(self, match_id, match_lineup):
+        """ compares ratings and incidents of the lineup with the snapshot of the last update and stores the new snapshot
+
+        :param match_id: match id
+        :param match_lineup: match lineup
+
+        :return: set with (team, name) of changed players, None if there is no comparable snapshot
+        """
+        # players are keyed by team and name, a home and an away player can have the same name
+        snapshot = dict()
+        for team in ('homeTeam', 'awayTeam'):
+            incidents = match_lineup[team + 'IncidentsByPlayer']
+            for player in match_lineup[team]:
+                player_incidents = tuple(incident.key() for incident in incidents.get(player.name, ()))
+                snapshot[(team, player.name)] = (player.rating, player_incidents)
+
+        squads_version = self.squadcache.version
+        last_snapshot = self.match_snapshots.get(match_id)
+        self.match_snapshots[match_id] = (squads_version, snapshot)
+
+        # first update or the squads have changed since the last update
+        if (last_snapshot is None) or (last_snapshot[0] != squads_version):
+            return None
+
+        last_players = last_snapshot[1]
+        return {key for key in set(snapshot) | set(last_players) if snapshot.get(key) != last_players.get(key)}
+
+    @staticmethod
+    def get_affected_users(livedata, last_livedata, changed_players):
+        """ get the users with changed players in the current or the last livedata
+
+        :param livedata: current livedata
+        :param last_livedata: livedata of the last update
+        :param changed_players: set with (team, name) of changed players, None if all players changed
+
+        :return: set with userids, None for all users
+        """
+        if (changed_players is None) or (last_livedata is None):
+            return None
+
+        userids = set()
+        for user in livedata + last_livedata:
+            if any(player.key() in changed_players for player in user['squad']):
+                userids.add(user['userid'])
+
+        return userids
+
+    def store_match_squads(self, match_id):
+        """ stores the linedup squads of all users for the match, once for every loaded version of the squads
+
+        :param match_id: match id
+        """
+        squads = self.squadcache.get(match_day=self.current_match_day, loader=self.load_linedup_squads)
+        squads_version = self.squadcache.version
+        if self.squad_snapshot_versions.get(match_id) == squads_version:
+            return
+
+        self.store_squad_snapshot(match_id=match_id, squads={str(userid): {'user': username, 'community': community,
+                                                                           'squad': [list(player) for player in squads.get(userid, list())]}
+                                                             for (userid, username, community) in self.comunio_users})
+        self.squad_snapshot_versions[match_id] = squads_version
+
     def update_linedup_squad(self):
         """ update linedup squad to fetch livedata only from linedup players
 
@@ -161,22 +337,72 @@ class LiveData(DBHandler):
         else:
             self.logger.error("Squad already updated in LiveData class")
 
+    def load_linedup_squads(self):
+        """ loads the comunio users and the linedup squads of all users and resolves the squad clubs
+
+        :return: dict with userid as key and list of (playername, playerposition, club) as value
+        """
+        self.comunio_users = self.dbfetcher.all(sql=self.user_sql)
+        squads = self.query_linedup_squads()
+
+        # resolve the comunio clubs to the team names of the season
+        self.update_club_registry()
+
+        return squads
+
+    def invalidate_linedup_squads(self):
+        """ invalidates the linedup squads, they will be loaded again with the next update
+
+        """
+        self.squadcache.invalidate()
+
+    def update_club_registry(self):
+        """ builds the club registry from the season teams and the squad clubs
+
+        """
+        teams, clubs = self.query_club_names()
+        self.clubregistry.build(teams=teams, clubs=clubs)
+
+    def set_club_aliases(self, aliases):
+        """ sets aliases for comunio club names which could not be resolved
+
+        :param aliases: dict with club name as key and team name as value
+        """
+        for alias, team in aliases.items():
+            self.clubregistry.add_alias(alias=alias, team=team)
+
     def set_comunio_players_of_interest_for_match(self, home_team, away_team):
         """ sets all comunio players of interest for current match
 
         :return: list with all comunio players of interest
-        [{'user': 'Shaggy', 'squad': [('Jorge Meré', '1. FC Köln'), ('Bornauw', '1. FC Köln')]}, ...]
+        [{'user': 'Shaggy', 'community': 'Bundesliga Kickers', 'squad': [('Jorge Meré', '1. FC Köln'), ('Bornauw', '1. FC Köln')]}, ...]
+        """
+        # linedup squads of all comunio users for the current match day
+        squads = self.squadcache.get(match_day=self.current_match_day, loader=self.load_linedup_squads)
+
+        return self.filter_players_of_interest(users=self.comunio_users, squads=squads, home_team=home_team,
+                                               away_team=away_team)
+
+    def filter_players_of_interest(self, users, squads, home_team, away_team):
+        """ filters the linedup squads of the comunio users for players of the home and away team
+
+        :param users: list with (userid, username, community)
+        :param squads: dict with userid as key and list of (playername, playerposition, club) as value
+        :param home_team: home team
+        :param away_team: away team
+
+        :return: list with all comunio players of interest
         """
         # complete player list of interest for rest query to sofascore
         all_players_of_interest_for_rating_query = list()
 
         # iterate over all comunio users
-        for user in self.comunio_users:
+        for user in users:
             user_id = user[0]
             user_name = user[1]
 
-            # get current squad (player,club) with userid from database
-            squad = self.dbfetcher.all(sql=self.squad_sql, data=(user_id,))
+            # get current squad (player, position, club) of the user
+            squad = squads.get(user_id, list())
 
             if len(squad) < 11:
                 self.logger.error("Length of linedup comunio squad from {} is less as 11".format(user_name))
@@ -186,170 +412,173 @@ class LiveData(DBHandler):
 
             # check if comunio player in home or away team
             for player in squad:
-                team = player[2]
+                team = self.clubregistry.resolve(club=player[2])
                 if (team == home_team) or (team == away_team):
                     player_list_per_user.append(player)
-                else:
-                    hometeam_ratio = SequenceMatcher(None, team, home_team).ratio()
-                    awayteam_ratio = SequenceMatcher(None, team, away_team).ratio()
-                    if (hometeam_ratio > 0.6) or (awayteam_ratio > 0.6):
-                        player_list_per_user.append(player)
 
             user_query = dict()
             user_query['user'] = user_name
             user_query['userid'] = user_id
+            user_query['community'] = user[2]
             user_query['squad'] = player_list_per_user
             all_players_of_interest_for_rating_query.append(user_query)
 
         return all_players_of_interest_for_rating_query
 
-    def map_players_of_interest_with_match_lineup(self, players_of_interest, match_lineup):
+    def map_players_of_interest_with_match_lineup(self, players_of_interest, match_lineup, match_id=None):
         """ maps player of interest with match line up and creates a new data structure for livedata
 
         :param players_of_interest: players of interest
         :param match_lineup: match lineup
+        :param match_id: match id to reuse the player matcher of the match
 
         :return: list with live data
-        [{'user': 'Shaggy', 'userid': 13065521, 'squad': [{'name': 'Jorge Mere', 'rating': '7.6', 'position': 'defender', 'points': 6, 'incidents': [{'type': 'goal', 'class': 'regulargoal', 'player': 'Jorge Mere'}]}]}, ...]
+        [{'user': 'Shaggy', 'userid': 13065521, 'community': 'Bundesliga Kickers', 'squad': [ScoredPlayer(name='Jorge Mere', rating=7.6, points=6, position='defender', incidents=[Incident(...)])]}, ...]
         """
 
         # data with all comunio user and related players
         livedata = list()
-        #print(match_lineup)
+
+        matcher = self.get_player_matcher(match_id=match_id, match_lineup=match_lineup)
+
         # iterate over all comunio users
         for comuniouser in players_of_interest:
             user_name = comuniouser['user']
             user_id = comuniouser['userid']
+            community = comuniouser.get('community')
             comuniosquad = comuniouser['squad']
+            pointcalculator = self.scoringrules.get(community=community)
 
             # dict with comunio user and related players for livedata
             user_squad_dict = dict()
             user_squad_dict['user'] = user_name
             user_squad_dict['userid'] = user_id
+            user_squad_dict['community'] = community
             user_squad_dict['squad'] = list()
 
             # iterate over squad of comunio user
+            linedup_players = list()
             for comunioplayerdata in comuniosquad:
                 comunioplayername = comunioplayerdata[0]
                 comunioplayerposition = comunioplayerdata[1]
-                comunioplayername_forename, comunioplayername_surename = self.seperate_playername(playername=comunioplayername)
-
-                # iterate over all homeplayer of home team
-                for homeplayer in match_lineup['homeTeam']:
-                    homeplayer_name = homeplayer['player_name']
-                    homeplayer_forename, homeplayer_surename = self.seperate_playername(playername=homeplayer_name)
-
-                    #print("compare {} with {}".format(comunioplayername_surename, homeplayer_surename))
-
-                    # compare comunio player name with sofascore player name
-                    if ((comunioplayername_surename == homeplayer_surename) or
-                            (SequenceMatcher(None, comunioplayername_surename, homeplayer_surename,).ratio() > 0.74)):
-                        if comunioplayername_forename:
-                            if comunioplayername_forename == homeplayer_forename[:len(comunioplayername_forename)]:
-                                user_squad_dict['squad'].append(self.get_player_data(playername=homeplayer_name,
-                                                                                     playerrating=homeplayer['player_rating'],
-                                                                                     playerposition=comunioplayerposition,
-                                                                                     incidents=match_lineup['homeTeamIncidents']))
-                                break
-                        else:
-                            user_squad_dict['squad'].append(self.get_player_data(playername=homeplayer_name,
-                                                                                 playerrating=homeplayer['player_rating'],
-                                                                                 playerposition=comunioplayerposition,
-                                                                                 incidents=match_lineup['homeTeamIncidents']))
-                            break
-
-                # iterate over all awayplayer of away team
-                for awayplayer in match_lineup['awayTeam']:
-                    awayplayer_name = awayplayer['player_name']
-                    awayplayer_forename, awayplayer_surename = self.seperate_playername(playername=awayplayer_name)
-
-                    #print("compare {} with {}".format(comunioplayername_surename, awayplayer_surename))
-
-                    # compare comunio player name with sofascore player name
-                    if ((comunioplayername_surename == awayplayer_surename) or
-                            (SequenceMatcher(None, comunioplayername_surename, awayplayer_surename).ratio() > 0.77)):
-                        if comunioplayername_forename:
-                            if (comunioplayername_forename == awayplayer_forename[:len(comunioplayername_forename)]):
-                                user_squad_dict['squad'].append(self.get_player_data(playername=awayplayer_name,
-                                                                                     playerrating=awayplayer['player_rating'],
-                                                                                     playerposition=comunioplayerposition,
-                                                                                     incidents=match_lineup['awayTeamIncidents']))
-                                break
-                        else:
-                            user_squad_dict['squad'].append(self.get_player_data(playername=awayplayer_name,
-                                                                                 playerrating=awayplayer['player_rating'],
-                                                                                 playerposition=comunioplayerposition,
-                                                                                 incidents=match_lineup['awayTeamIncidents']))
-                            break
+                comunioplayerclub = comunioplayerdata[2]
+
+                match = self.match_lineup_player(matcher=matcher, match_lineup=match_lineup,
+                                                 playername=comunioplayername, club=comunioplayerclub)
+                if match is not None:
+                    team, index = match
+                    linedup_players.append((team, match_lineup[team][index], comunioplayerposition))
+
+            # rating points of all linedup players in one lookup, the scores are summed up from these points
+            points = pointcalculator.get_points_from_ratings(ratings=[player.rating for (_, player, _) in linedup_players])
+            for (team, lineup_player, comunioplayerposition), playerpoints in zip(linedup_players, points):
+                user_squad_dict['squad'].append(self.get_player_data(playername=lineup_player.name,
+                                                                     playerrating=lineup_player.rating,
+                                                                     playerposition=comunioplayerposition,
+                                                                     playerpoints=playerpoints, team=team,
+                                                                     incidents=self.get_player_incidents(
+                                                                         match_lineup=match_lineup, team=team,
+                                                                         lineup_player=lineup_player)))
 
             # add user data to list
             livedata.append(user_squad_dict)
-        #print(livedata)
+
         return livedata
 
-    def get_player_data(self, playername, playerrating, playerposition, incidents):
-        """ get player data dict for livedata
+    def match_lineup_player(self, matcher, match_lineup, playername, club):
+        """ matches a comunio player with the lineup, known players are resolved with the persisted player mapping
 
-        :param playername: player name
-        :param playerrating: player rating
-        :param playerposition: player position
+        :param matcher: PlayerMatcher instance of the match
+        :param match_lineup: match lineup
+        :param playername: comunio player name
+        :param club: comunio player club
 
-        :return: dict of player data
+        :return: tuple (team, index) of the lineup player, None if the player is not in the lineup
         """
-        player_data = dict()
+        with self.player_mapping_lock:
+            if self.player_mapping is None:
+                self.player_mapping = self.query_player_mapping()
+            mapped_player = self.player_mapping.get((playername, club))
+
+        if mapped_player is not None:
+            return matcher.match_player_id(player_id=mapped_player[0])
+
+        # compare comunio player name with sofascore player names
+        match = matcher.match(playername=playername)
+        if match is not None:
+            team, index = match
+            lineup_player = match_lineup[team][index]
+            if lineup_player.player_id is not None:
+                with self.player_mapping_lock:
+                    if (playername, club) not in self.player_mapping:
+                        self.player_mapping[(playername, club)] = (lineup_player.player_id, lineup_player.name)
+                        self.insert_player_mapping(playername=playername, club=club,
+                                                   sofascore_playerid=lineup_player.player_id,
+                                                   sofascore_playername=lineup_player.name)
+        return match
+
+    def get_player_matcher(self, match_id, match_lineup):
+        """ get the player matcher for the match, a new one is built if the lineup players have changed
 
-        player_data['name'] = playername # from sofascore
-        player_data['rating'] = playerrating
-        if playerrating == "–":
-            player_data['points'] = playerrating
-        else:
-            player_data['points'] = self.pointcalculator.get_points_from_rating(rating=float(playerrating))
-        player_data['position'] = playerposition
+        :param match_id: match id
+        :param match_lineup: match lineup
+
+        :return: PlayerMatcher instance
+        """
+        matcher = self.player_matchers.get(match_id)
+
+        if (matcher is None) or (not matcher.is_valid_for(lineup=match_lineup)):
+            matcher = PlayerMatcher(lineup=match_lineup, home_ratio=self.home_match_ratio, away_ratio=self.away_match_ratio)
+            if match_id is not None:
+                self.player_matchers[match_id] = matcher
+
+        return matcher
+
+    @staticmethod
+    def get_player_incidents(match_lineup, team, lineup_player):
+        """ get the incidents of a lineup player, looked up by player id and by player name as fallback
+
+        :param match_lineup: match lineup
+        :param team: 'homeTeam' or 'awayTeam'
+        :param lineup_player: LineupPlayer of the lineup
+
+        :return: list with Incident records of the player
+        """
+        player_id = lineup_player.player_id
+        if (player_id is not None) and (player_id in match_lineup[team + 'IncidentsById']):
+            return match_lineup[team + 'IncidentsById'][player_id]
+
+        return match_lineup[team + 'IncidentsByPlayer'].get(lineup_player.name, list())
+
+    def get_player_data(self, playername, playerrating, playerposition, incidents, playerpoints, team=None):
+        """ get the scored player for livedata
 
-        # check active incidents
-        incidents_list = list()
-        for incident in incidents:
-            # check if given player has an active incident
-            if incident['player'] == playername:
-                # TODO remove player name incident.pop('player')
-                incidents_list.append(incident)
-        player_data['incidents'] = incidents_list
+        :param playername: player name
+        :param playerrating: float player rating, NO_RATING for players without rating
+        :param playerposition: player position
+        :param incidents: list with Incident records of the player
+        :param playerpoints: points of the rating from PointCalculator.get_points_from_ratings
+        :param team: 'homeTeam' or 'awayTeam' of the lineup player
 
-        return player_data
+        :return: ScoredPlayer
+        """
+        return ScoredPlayer(name=playername, rating=playerrating, points=playerpoints, position=playerposition,
+                            incidents=incidents, team=team)
 
     def seperate_playername(self, playername):
         """ seperates the playername into forename and surename
 
         :return: forename and surename of player
         """
-        playername_list = playername.split()
-
-        if len(playername_list) == 0:
-            playername_forename = ''
-            playername_surename = ''
-        elif len(playername_list) == 1:
-            playername_forename = ''
-            playername_surename = playername_list[0]
-        elif len(playername_list) == 2:
-            playername_forename = playername_list[0].replace('.', '')
-            playername_surename = playername_list[1]
-        elif len(playername_list) == 3:
-            playername_forename = playername_list[0]
-            playername_surename = playername_list[2]
-        else:
-            playername_forename = ''
-            playername_surename = ''
-
-        # remove accents
-        nfkd_form = unicodedata.normalize('NFKD', playername_surename)
-        playername_surename_accents = u"".join([c for c in nfkd_form if not unicodedata.name(c).endswith('ACCENT')])
+        return PlayerMatcher.seperate_playername(playername=playername)
 
-        return playername_forename, playername_surename_accents
-
-    def prepare_telegram_message(self, livedata, home_team, away_team, match_day, match_id):
+    def prepare_telegram_message(self, livedata, scores, home_team, away_team):
         """ prepares the livedata for a new telegram message
 
         :param livedata: livedata data structure
+        :param scores: dict with userid as key and UserMatchScore as value
+        :param home_team: home team
+        :param away_team: away team
 
         :return: telegram message
         """
@@ -367,88 +596,88 @@ class LiveData(DBHandler):
             if len(squad) == 0:
                 telegram_str += "no player in lineup!\n"
             else:
-                points_data = self.query_rating_goal_off_points(userid=userid, match_day=match_day, match_id=match_id)
+                score = scores.get(userid, UserMatchScore(userid=userid, username=username))
 
-                points_rating = points_data[0][0]
-                points_goal = points_data[0][1]
-                points_off = points_data[0][2]
-                points = points_rating + points_goal + points_off
                 for player in squad:
-                    player_str = ''.join("{} (*{}*)=>*{}*\n".format(player['name'], player['rating'], player['points']))
+                    player_str = ''.join("{} (*{}*)=>*{}*\n".format(player.name, player.rating, player.points))
                     telegram_str += player_str
-                rating_str = "*P: {} + G: {} + O: {} => {}*\n".format(points_rating, points_goal, points_off, points)
+                rating_str = "*P: {} + G: {} + O: {} => {}*\n".format(score.rating, score.goal, score.off, score.total)
                 telegram_str += rating_str
 
         return telegram_str
 
-    def calculate_points_per_match(self, livedata, match_id, match_day):
-        """ calculates the points for each user with the linedup players
+    def calculate_points_per_match(self, livedata, match_id, match_day, userids=None):
+        """ calculates the points for each user with the linedup players and writes them to the database
 
         :param livedata: live data with player points
         :param match_id: match id
         :param match_day: match day
+        :param userids: set with userids to calculate, None for all users
 
+        :return: dict with userid as key and UserMatchScore as value
         """
-        # points for rating, goals (regulargoal, penalty) and offs (YellowRed, Red)
+        scores = self.score_livedata(livedata=livedata, userids=userids)
+
+        # write the points of all users in one transaction
+        if not self.update_points_in_database_batch(match_id=match_id, match_day=match_day,
+                                                    points=[(userid,) + score.points() for (userid, score) in scores.items()]):
+            # the next update recalculates and writes the points of all users, even if the lineup is unchanged
+            self.match_snapshots.pop(match_id, None)
+
+        return scores
+
+    def score_livedata(self, livedata, userids=None):
+        """ calculates the points for each user with the linedup players
+
+        :param livedata: live data with player points
+        :param userids: set with userids to calculate, None for all users
+
+        :return: dict with userid as key and UserMatchScore as value
+        """
+        scores = dict()
+
+        # users grouped by community, each community is scored with its own rule set
+        communities = dict()
         for user in livedata:
-            userid = user['userid']
-            squad = user['squad']
-            points_rating = 0
-            points_goals = 0
-            points_offs = 0
-            for player in squad:
-                for incident in player['incidents']:
-                    # goal points regular
-                    if (incident['type'] == 'goal') and (incident['class'] == 'regulargoal'):
-                        points = self.pointcalculator.get_points_for_goal(position=player['position'])
-                        if points is not None:
-                            points_goals += points
-                    # goal points penalty
-                    elif (incident['type'] == 'goal') and (incident['class'] == 'penalty'):
-                        points_goals += self.pointcalculator.get_penalty()
-                    # yellow red off points
-                    elif (incident['type'] == 'card') and (incident['class'] == 'YellowRed'):
-                        points_offs += self.pointcalculator.get_points_for_offs(off_type='yellow_red')
-                    # red off points
-                    elif (incident['type'] == 'card') and (incident['class'] == 'Red'):
-                        points_offs += self.pointcalculator.get_points_for_offs(off_type='red')
-                # rating points
-                if player['points'] != '–':
-                    points_rating += player['points']
-
-            self.update_points_in_database(userid=userid, match_id=match_id, match_day=match_day,
-                                           points_rating=points_rating, points_goal=points_goals, points_off=points_offs)
+            if (userids is None) or (user['userid'] in userids):
+                communities.setdefault(user.get('community'), list()).append(user)
+
+        for community, users in communities.items():
+            pointcalculator = self.scoringrules.get(community=community)
+            players = [player for user in users for player in user['squad']]
+
+            # points for goals (regulargoal, penalty) and offs (YellowRed, Red) of all players in one batch, the
+            # rating points are already calculated for the scored players
+            player_points = pointcalculator.calculate_batch(ratings=[player.rating for player in players],
+                                                            positions=[player.position for player in players],
+                                                            incidents=[player.incidents for player in players],
+                                                            rating_points=[player.points for player in players])
+
+            index = 0
+            for user in users:
+                userid = user['userid']
+                points_rating = 0
+                points_goals = 0
+                points_offs = 0
+                for (rating, goal, off) in player_points[index:index + len(user['squad'])]:
+                    points_rating += rating
+                    points_goals += goal
+                    points_offs += off
+                index += len(user['squad'])
+
+                scores[userid] = UserMatchScore(userid=userid, username=user['user'], rating=points_rating,
+                                                goal=points_goals, off=points_offs)
+
+        return scores
 
     def points_summery(self):
         """ sums up the current points for each comunio player
 
         :return: dict with sorted players and points
         """
+        ranking = self.query_points_ranking(match_day=self.current_match_day)
 
-        sum_points = dict()
-
-        for user in self.comunio_users:
-            userid = user[0]
-            username = user[1]
-            points_data = self.query_rating_goal_off_points(userid=userid, match_day=self.current_match_day)
-            # iterate over 9 matches
-            points_all = 0
-            for match in points_data:
-                # check if not all elements are none
-                if all(el is not None for el in match):
-                    points_rating = match[0]
-                    points_goal = match[1]
-                    points_offs = match[2]
-                    points_match = points_rating + points_goal + points_offs
-                    points_all += points_match
-                else:
-                    #self.logger.error("Invalid None points: {}".format(match))
-                    pass
-
-            sum_points[username] = points_all
-
-        # sort dict by key
-        sum_points_sorted = {k: v for k, v in sorted(sum_points.items(), key=lambda item: item[1], reverse=True)}
+        sum_points_sorted = {username: points for (username, points) in ranking}
 
         return self.current_match_day, sum_points_sorted
 
@@ -462,6 +691,34 @@ class LiveData(DBHandler):
         except ValueError as ex:
             self.logger.error(ex)
 
+    def set_match_ratios(self, home_ratio, away_ratio):
+        """ sets the SequenceMatcher ratios for the player name comparison
+
+        :param home_ratio: ratio for players of the home team
+        :param away_ratio: ratio for players of the away team
+        """
+        self.home_match_ratio = float(home_ratio)
+        self.away_match_ratio = float(away_ratio)
+        self.player_matchers.clear()
+
+    def set_polling_intervals(self, intervals):
+        """ sets the polling intervals for the match phases
+
+        :param intervals: dict with phase as key and seconds as value
+        """
+        try:
+            self.pollingpolicy.set_intervals(intervals=intervals)
+        except ValueError as ex:
+            self.logger.error(ex)
+
+    def set_scoring_rules(self, sections):
+        """ loads the scoring rule sets from the scoring sections of the configuration file
+
+        :param sections: dict with section name as key and dict of options as value
+        """
+        self.scoringrules.load_config(sections=sections)
+        self.pointcalculator = self.scoringrules.get()
+
     def set_notify_flag(self, notify):
         """ sets the notify flag
 
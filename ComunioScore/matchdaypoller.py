@@ -0,0 +1,229 @@
+import logging
+import datetime
+from time import time
+from threading import Thread, Condition
+
+from ComunioScore.score import MatchdayStatus
+
+
+class MatchdayPoller(Thread):
+    """ class MatchdayPoller to fetch the livedata of all running matches in one thread
+
+    USAGE:
+            poller = MatchdayPoller(livedata=livedata)
+            poller.start()
+            poller.add_match(match_day=3, match_id=8272345, home_team='Hertha BSC', away_team='Fortuna Düsseldorf')
+
+    """
+    def __init__(self, livedata, policy=None, max_workers=6):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class MatchdayPoller')
+
+        # init base class
+        Thread.__init__(self, name='MatchdayPoller')
+
+        self.livedata = livedata
+
+        # polling intervals depending on the match phase
+        self.policy = livedata.pollingpolicy if policy is None else policy
+
+        # status of all matches from the date feed
+        self.matchdaystatus = MatchdayStatus(bundesliga=livedata.bundesliga)
+
+        # maximum number of concurrent lineup requests
+        self.max_workers = max_workers
+
+        self.running = True
+
+        # running matches with match id as key
+        self.matches = dict()
+        self.cv = Condition()
+
+        self.poll_start_event_handler = None
+        self.poll_end_event_handler = None
+
+    def register_poll_start_event_handler(self, func):
+        """ register the poll start event handler, called before the due matches are updated
+
+        :param func: handler function
+        """
+        self.poll_start_event_handler = func
+
+    def register_poll_end_event_handler(self, func):
+        """ register the poll end event handler, called after the due matches are updated
+
+        :param func: handler function
+        """
+        self.poll_end_event_handler = func
+
+    def add_match(self, match_day, match_id, home_team, away_team):
+        """ adds a new match to the poller, signature of the livedata event handler
+
+        :param match_day: current match day
+        :param match_id: match id for sofascore
+        :param home_team: home team
+        :param away_team: away team
+        """
+        self.livedata.start_match(match_day=match_day, match_id=match_id, home_team=home_team, away_team=away_team)
+
+        match = dict()
+        match['match_day'] = match_day
+        match['match_id'] = match_id
+        match['home_team'] = home_team
+        match['away_team'] = away_team
+        match['date'] = datetime.date.today().strftime('%Y-%m-%d')
+        match['last_msg_ts'] = time()
+        match['next_poll_ts'] = time()
+        match['finished_ts'] = None
+
+        with self.cv:
+            self.logger.info("MatchdayPoller adds match {}: {} vs. {}".format(match_id, home_team, away_team))
+            self.matches[match_id] = match
+            self.cv.notify()
+
+    def get_matches(self):
+        """ get the running matches
+
+        :return: list with match dicts
+        """
+        with self.cv:
+            return list(self.matches.values())
+
+    def run(self) -> None:
+        """ run thread for class MatchdayPoller
+
+        """
+        self.logger.info("Start MatchdayPoller run thread!")
+
+        while self.running:
+            with self.cv:
+                # wait until the next match is due
+                timeout = self.next_timeout()
+                while self.running and ((timeout is None) or (timeout > 0)):
+                    self.cv.wait(timeout=timeout)
+                    timeout = self.next_timeout()
+
+            if self.running:
+                try:
+                    self.poll()
+                except Exception as ex:
+                    # an unexpected error must not stop the poller thread, the due matches are polled again
+                    self.logger.error("MatchdayPoller could not poll the matches: {}".format(ex))
+                    self.postpone_due_matches()
+
+    def next_timeout(self):
+        """ get the seconds until the next match is due, must be called with the condition acquired
+
+        :return: seconds until the next poll, None if no match is running
+        """
+        if not self.matches:
+            return None
+
+        return min(match['next_poll_ts'] for match in self.matches.values()) - time()
+
+    def stop(self):
+        """ stops the run thread
+
+        """
+        with self.cv:
+            self.running = False
+            self.cv.notify()
+
+    def poll(self):
+        """ updates all running matches which are due
+
+        """
+        self.policy.refresh_quota(func=self.livedata.bundesliga.get_scraper_requests)
+
+        now = time()
+        due_matches = [match for match in self.get_matches() if match['next_poll_ts'] <= now]
+
+        # one date feed request for the status of all running matches
+        dates = [match['date'] for match in due_matches if match['finished_ts'] is None]
+        if dates:
+            self.matchdaystatus.refresh(dates=dates)
+
+        statuses = {match['match_id']: self.matchdaystatus.status(match_id=match['match_id'])
+                    for match in due_matches if match['finished_ts'] is None}
+
+        # lineups of all due matches which are updated in this poll with concurrent requests
+        match_ids = [match['match_id'] for match in due_matches
+                     if statuses.get(match['match_id'], {}).get('type') != 'finished']
+        lineups = self.livedata.bundesliga.lineups_from_match_ids(match_ids=match_ids, max_workers=self.max_workers)
+
+        # the messages of all matches updated in this poll are merged by the poll handlers
+        if self.poll_start_event_handler is not None:
+            self.poll_start_event_handler()
+        try:
+            for match in due_matches:
+                try:
+                    self.poll_match(match=match, status=statuses.get(match['match_id']), lineup=lineups.get(match['match_id']))
+                except Exception as ex:
+                    self.logger.error("MatchdayPoller could not update match {}: {}".format(match['match_id'], ex))
+                    match['next_poll_ts'] = time() + self.policy.interval(phase='unknown')
+        finally:
+            if self.poll_end_event_handler is not None:
+                self.poll_end_event_handler()
+
+    def postpone_due_matches(self):
+        """ postpones all due matches by the interval of the unknown phase after a failed poll
+
+        """
+        now = time()
+        with self.cv:
+            for match in self.matches.values():
+                if match['next_poll_ts'] <= now:
+                    match['next_poll_ts'] = now + self.policy.interval(phase='unknown')
+
+    def poll_match(self, match, status=None, lineup=None):
+        """ updates one match and finishes it after the final whistle
+
+        :param match: match dict
+        :param status: status dict of the match, None to get it from the matchday status
+        :param lineup: tuple (lineup dict, exception) of lineups_from_match_ids, None to request the lineup
+        """
+        now = time()
+
+        if match['finished_ts'] is None:
+            if status is None:
+                status = self.matchdaystatus.status(match_id=match['match_id'])
+            if status.get('type') == 'finished':
+                self.livedata.finish_match(match_id=match['match_id'], home_team=match['home_team'], away_team=match['away_team'])
+                match['finished_ts'] = now
+            else:
+                send = (now - match['last_msg_ts']) > self.livedata.msg_rate
+                self.update(match=match, send=send, lineup=lineup)
+                if send:
+                    match['last_msg_ts'] = now
+            match['next_poll_ts'] = now + self.policy.interval(status=status)
+
+        else:
+            self.logger.info("Match {} vs {} finished, updating live data the last time".format(match['home_team'], match['away_team']))
+            self.update(match=match, send=True, lineup=lineup)
+            self.livedata.close_match(match_id=match['match_id'])
+
+            with self.cv:
+                self.matches.pop(match['match_id'], None)
+
+    def update(self, match, send, lineup=None):
+        """ updates the livedata of one match, the last lineup snapshot is used if the lineup request failed
+
+        :param match: match dict
+        :param send: send the livedata as telegram message
+        :param lineup: tuple (lineup dict, exception) of lineups_from_match_ids, None to request the lineup
+        """
+        match_lineup = None
+        if lineup is not None:
+            match_lineup, error = lineup
+            if error is not None:
+                self.logger.error("Could not request the lineup of match {}: {}".format(match['match_id'], error))
+            if match_lineup is None:
+                match_lineup = self.livedata.last_lineup(match_id=match['match_id'])
+            if match_lineup is None:
+                if error is not None:
+                    raise error
+                self.logger.error("No lineup for match {}, skip the update".format(match['match_id']))
+                return
+
+        self.livedata.update_match(match_day=match['match_day'], match_id=match['match_id'], home_team=match['home_team'],
+                                   away_team=match['away_team'], send=send, match_lineup=match_lineup)
@@ -9,7 +9,7 @@ class MatchScheduler:
 
     USAGE:
             matchscheduler = MatchScheduler()
-            matchscheduler.register_livedata_event_handler(func=livedata.fetch)
+            matchscheduler.register_livedata_event_handler(func=matchdaypoller.add_match)
             matchscheduler.new_event(time.time(), 2, 103388, "team1", "team2")
     """
     livedata_event_handler = None
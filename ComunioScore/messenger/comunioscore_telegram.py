@@ -7,6 +7,9 @@ from telegram.bot import Bot
 from telegram.parsemode import ParseMode
 from telegram.ext.dispatcher import run_async
 
+from ComunioScore.messenger.telegramsender import TelegramSender
+from ComunioScore.messenger.scoreboard import Scoreboard
+
 RATE = range(1)
 NOTIFY = range(1)
 
@@ -15,11 +18,12 @@ class ComunioScoreTelegram:
     """ class ComunioScoreTelegram to send updates to the Telegram group
 
     USAGE:
-            cstelegram = ComunioScoreTelegram(token='')
-            cstelegram.new_msg()
+            cstelegram = ComunioScoreTelegram(token='', chat_id=18539452)
+            cstelegram.run()
+            cstelegram.new_msg(text='Points rating', key=8272345)
 
     """
-    def __init__(self, token, chat_id):
+    def __init__(self, token, chat_id, scoreboard=False):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class ComunioScoreTelegram')
 
@@ -33,6 +37,12 @@ class ComunioScoreTelegram:
         self.notify = True
         self.last_points_sent = time.time()
 
+        # queued messages are sent from the sender thread
+        self.sender = TelegramSender(send_func=self.send_message)
+
+        # one pinned scoreboard message per match day instead of a new message for each livedata update
+        self.scoreboard = Scoreboard(bot=self.bot, chat_id=self.comunioscore_chatid) if scoreboard else None
+
         # handler to request the current points per user
         self.add_handler(command="ranking", handler=self.get_current_points)
 
@@ -74,6 +84,7 @@ class ComunioScoreTelegram:
         """ runs the telegram updater
 
         """
+        self.sender.start()
         self.updater.start_polling()
         if blocking:
             self.updater.idle()
@@ -107,15 +118,38 @@ class ComunioScoreTelegram:
         """
         self.notify_event_handler = func
 
-    def new_msg(self, text):
-        """ sends new text message to the bot
+    def new_msg(self, text, key=None, match_day=None):
+        """ queues a new text message for the bot, never blocks on the telegram request
+
+        :param text: message text
+        :param key: key to replace a queued message with the same key, e.g. the match id
+        :param match_day: match day of a livedata message, updates the scoreboard in scoreboard mode
+        """
+        if (self.scoreboard is not None) and (match_day is not None) and (key is not None):
+            self.scoreboard.update(match_day=match_day, match_id=key, text=text)
+            self.sender.enqueue(chat_id=self.comunioscore_chatid, text=self.scoreboard.publish, key='scoreboard')
+        else:
+            self.sender.enqueue(chat_id=self.comunioscore_chatid, text=text, key=key)
+
+    def hold_messages(self):
+        """ holds the queued messages to merge them until release_messages is called, e.g. during one poll
+
+        """
+        self.sender.hold()
+
+    def release_messages(self):
+        """ releases the held messages
 
         """
+        self.sender.release()
+
+    def send_message(self, chat_id, text):
+        """ sends a text message to the chat, called from the sender thread
 
-        try:
-            self.bot.sendMessage(chat_id=self.comunioscore_chatid, text=text, parse_mode=ParseMode.MARKDOWN, timeout=20)
-        except Exception as ex:
-            self.logger.error(ex)
+        :param chat_id: telegram chat id
+        :param text: message text
+        """
+        self.bot.sendMessage(chat_id=chat_id, text=text, parse_mode=ParseMode.MARKDOWN, timeout=20)
 
     @run_async
     def get_current_points(self, update, context):
@@ -0,0 +1,170 @@
+import logging
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from telegram.parsemode import ParseMode
+from telegram.error import BadRequest, TelegramError
+
+from ComunioScore.messenger.telegramsender import TelegramSender
+
+
+class Scoreboard:
+    """ class Scoreboard to keep the livedata of all matches of a match day in pinned telegram messages
+
+    the scoreboard is split at match and line boundaries into messages of at most max_length characters. The messages
+    are sent with the first update of a match day, the first one is pinned, and edited in place afterwards. A message is
+    only edited if the hash of its rendered page has changed, messages of pages which are not needed anymore are deleted
+
+    USAGE:
+            scoreboard = Scoreboard(bot=bot, chat_id=18539452)
+            scoreboard.update(match_day=3, match_id=8272345, text='Points rating for *Hertha BSC* vs. *Freiburg*')
+            scoreboard.publish()
+
+    """
+    max_length = 4096
+
+    def __init__(self, bot, chat_id):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class Scoreboard')
+
+        self.bot = bot
+        self.chat_id = chat_id
+
+        self.lock = Lock()
+
+        self.match_day = None
+
+        # message id and hash of the last published page with the page index as key
+        self.message_ids = dict()
+        self.last_hashes = dict()
+
+        # livedata text of each match with the match id as key
+        self.matches = OrderedDict()
+
+    def update(self, match_day, match_id, text):
+        """ updates the livedata text of a match, a new match day starts new scoreboard messages
+
+        :param match_day: match day
+        :param match_id: match id
+        :param text: livedata text of the match
+        """
+        with self.lock:
+            if match_day != self.match_day:
+                self.logger.info("Start new scoreboard for match day {}".format(match_day))
+                self.match_day = match_day
+                self.message_ids = dict()
+                self.last_hashes = dict()
+                self.matches.clear()
+
+            self.matches[match_id] = text
+
+    def render(self):
+        """ renders the scoreboard of the match day into pages of at most max_length characters
+
+        :return: list with the text of each page
+        """
+        with self.lock:
+            header = "*Live scores for match day {}*\n".format(self.match_day)
+            texts = list(self.matches.values())
+
+        # matches are kept on one page, a match longer than a page is split at its lines. Markdown entities never
+        # span lines, so no entity is split
+        pages = list()
+        page = header
+        for text in texts:
+            for chunk in TelegramSender.split(text="\n" + text, max_length=self.max_length):
+                if len(page) + len(chunk) > self.max_length:
+                    pages.append(page)
+                    page = chunk.lstrip("\n")
+                else:
+                    page += chunk
+        pages.append(page)
+
+        return pages
+
+    def publish(self):
+        """ sends or edits the scoreboard messages whose rendered page has changed and deletes the messages of pages
+            which are not needed anymore
+
+        """
+        pages = self.render()
+        for index, text in enumerate(pages):
+            text_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+            if self.last_hashes.get(index) == text_hash:
+                continue
+
+            if index in self.message_ids:
+                self.edit(index=index, text=text, text_hash=text_hash)
+            else:
+                self.send(index=index, text=text, text_hash=text_hash)
+
+        for index in sorted(index for index in self.message_ids if index >= len(pages)):
+            self.delete(index=index)
+
+    def edit(self, index, text, text_hash):
+        """ edits the message of a page, a deleted message is sent again
+
+        :param index: index of the page
+        :param text: text of the page
+        :param text_hash: hash of the text
+        """
+        try:
+            self.bot.editMessageText(chat_id=self.chat_id, message_id=self.message_ids[index], text=text,
+                                     parse_mode=ParseMode.MARKDOWN, timeout=20)
+        except BadRequest as ex:
+            if 'message to edit not found' in str(ex).lower():
+                self.logger.error("Scoreboard message was deleted, send it again")
+                self.message_ids.pop(index, None)
+                self.send(index=index, text=text, text_hash=text_hash)
+                return
+            if 'not modified' not in str(ex).lower():
+                # the page is edited again with the next publish
+                self.logger.error("Could not edit the scoreboard message: {}".format(ex))
+                return
+        except TelegramError as ex:
+            self.logger.error("Could not edit the scoreboard message: {}".format(ex))
+            return
+
+        self.last_hashes[index] = text_hash
+
+    def send(self, index, text, text_hash):
+        """ sends the message of a page, the first page is pinned
+
+        :param index: index of the page
+        :param text: text of the page
+        :param text_hash: hash of the text
+        """
+        try:
+            message = self.bot.sendMessage(chat_id=self.chat_id, text=text, parse_mode=ParseMode.MARKDOWN, timeout=20)
+        except TelegramError as ex:
+            # the page is sent again with the next publish
+            self.logger.error("Could not send the scoreboard message: {}".format(ex))
+            return
+
+        self.message_ids[index] = message.message_id
+        self.last_hashes[index] = text_hash
+
+        if index == 0:
+            try:
+                self.bot.pinChatMessage(chat_id=self.chat_id, message_id=message.message_id, disable_notification=True)
+            except TelegramError as ex:
+                self.logger.error("Could not pin the scoreboard message: {}".format(ex))
+
+    def delete(self, index):
+        """ deletes the message of a page which is not needed anymore, a message which can not be deleted is emptied
+
+        :param index: index of the page
+        """
+        message_id = self.message_ids.pop(index)
+        self.last_hashes.pop(index, None)
+        try:
+            self.bot.deleteMessage(chat_id=self.chat_id, message_id=message_id, timeout=20)
+            return
+        except TelegramError as ex:
+            self.logger.error("Could not delete the scoreboard message: {}".format(ex))
+
+        try:
+            self.bot.editMessageText(chat_id=self.chat_id, message_id=message_id, text="-", timeout=20)
+        except TelegramError as ex:
+            self.logger.error("Could not empty the scoreboard message: {}".format(ex))
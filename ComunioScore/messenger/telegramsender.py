@@ -0,0 +1,256 @@
+import logging
+from time import time
+from collections import OrderedDict
+from threading import Thread, Condition
+
+from telegram.error import RetryAfter
+
+
+class TelegramSender(Thread):
+    """ class TelegramSender to send queued telegram messages from one worker thread
+
+    messages for the same chat which are queued within the merge interval are sent as one message, a newer message with
+    the same key replaces the queued one. While the sender is held, e.g. during one poll of all matches, the messages are
+    queued and merged until it is released. Instead of a text a function can be queued which sends or edits a message
+    itself. The messages of a chat are sent at most every chat_interval seconds
+
+    USAGE:
+            sender = TelegramSender(send_func=bot_send_func)
+            sender.start()
+            sender.hold()
+            sender.enqueue(chat_id=18539452, text='Points rating for *Hertha BSC* vs. *Freiburg*', key=8272345)
+            sender.release()
+
+            # without the run thread, e.g. in tests
+            sender.process(now=1000)
+
+    """
+    # telegram limits: 4096 characters per message and about 20 messages per minute in a group
+    max_length = 4096
+
+    # maximum seconds the messages are held if the sender is not released
+    max_hold = 120
+
+    def __init__(self, send_func, merge_interval=2, chat_interval=3):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class TelegramSender')
+
+        # init base class
+        Thread.__init__(self, name='TelegramSender', daemon=True)
+
+        self.send_func = send_func
+        self.merge_interval = merge_interval
+        self.chat_interval = chat_interval
+
+        self.running = True
+        self.cv = Condition()
+
+        # number of holds and the timestamp of the first hold
+        self.holds = 0
+        self.hold_ts = None
+
+        # queued messages per chat: {chat_id: OrderedDict(key: text)}, first enqueue and next allowed send timestamp
+        self.pending = dict()
+        self.first_enqueue_ts = dict()
+        self.next_send_ts = dict()
+        self.counter = 0
+
+    def enqueue(self, chat_id, text, key=None, now=None):
+        """ queues a new message without blocking
+
+        :param chat_id: telegram chat id
+        :param text: message text or function without arguments which sends the message
+        :param key: key to replace a queued message, e.g. the match id of a scoreboard
+        :param now: current timestamp
+        """
+        now = time() if now is None else now
+        with self.cv:
+            if key is None:
+                self.counter += 1
+                key = ('msg', self.counter)
+
+            messages = self.pending.setdefault(chat_id, OrderedDict())
+            if not messages:
+                self.first_enqueue_ts[chat_id] = now
+            messages[key] = text
+            self.cv.notify()
+
+    def hold(self, now=None):
+        """ holds the queued messages until release is called
+
+        :param now: current timestamp
+        """
+        now = time() if now is None else now
+        with self.cv:
+            if self.holds == 0:
+                self.hold_ts = now
+            self.holds += 1
+
+    def release(self):
+        """ releases a hold, the held messages are sent merged after the last release
+
+        """
+        with self.cv:
+            self.holds = max(self.holds - 1, 0)
+            self.cv.notify()
+
+    def stop(self):
+        """ stops the run thread
+
+        """
+        with self.cv:
+            self.running = False
+            self.cv.notify()
+
+    def run(self) -> None:
+        """ run thread for class TelegramSender
+
+        """
+        self.logger.info("Start TelegramSender run thread!")
+
+        while self.running:
+            self.process(wait=True)
+
+    def process(self, wait=False, now=None):
+        """ sends the messages of the next chat if they are due
+
+        :param wait: wait until the messages of a chat are due or the sender is stopped
+        :param now: current timestamp, only used without wait
+
+        :return: seconds until the next chat is due, 0 if a chat was sent, None if no message is queued
+        """
+        with self.cv:
+            chat_id, timeout = self.next_chat(now=now)
+            if wait:
+                while self.running and ((chat_id is None) or (timeout > 0)):
+                    self.cv.wait(timeout=timeout)
+                    chat_id, timeout = self.next_chat()
+
+                if not self.running:
+                    return None
+            elif (chat_id is None) or (timeout > 0):
+                return timeout
+
+            messages = self.pending.pop(chat_id)
+            self.first_enqueue_ts.pop(chat_id, None)
+
+        self.send(chat_id=chat_id, messages=messages, now=now)
+        return 0
+
+    def next_chat(self, now=None):
+        """ get the chat which can be sent next, must be called with the condition acquired
+
+        :param now: current timestamp
+
+        :return: tuple (chat id, seconds until the chat can be sent), (None, None) if no message is queued
+        """
+        next_chat_id, next_timeout = None, None
+        now = time() if now is None else now
+        if (self.holds > 0) and ((now - self.hold_ts) < self.max_hold):
+            return None, self.hold_ts + self.max_hold - now
+
+        for chat_id, messages in self.pending.items():
+            if not messages:
+                continue
+            send_ts = max(self.first_enqueue_ts[chat_id] + self.merge_interval, self.next_send_ts.get(chat_id, 0))
+            if (next_timeout is None) or ((send_ts - now) < next_timeout):
+                next_chat_id, next_timeout = chat_id, send_ts - now
+
+        return next_chat_id, next_timeout
+
+    def send(self, chat_id, messages, now=None):
+        """ sends the merged messages of one chat
+
+        :param chat_id: telegram chat id
+        :param messages: OrderedDict with key and text or function of the queued messages
+        :param now: current timestamp
+        """
+        items = self.merge(texts=[text for text in messages.values() if not callable(text)])
+        items.extend(func for func in messages.values() if callable(func))
+
+        for index, item in enumerate(items):
+            try:
+                if callable(item):
+                    item()
+                else:
+                    self.send_func(chat_id=chat_id, text=item)
+                self.next_send_ts[chat_id] = (time() if now is None else now) + self.chat_interval
+            except RetryAfter as ex:
+                self.logger.error("Telegram flood control for chat {}, retry in {} seconds".format(chat_id, ex.retry_after))
+                self.requeue(chat_id=chat_id, texts=items[index:], retry_after=ex.retry_after, now=now)
+                return
+            except Exception as ex:
+                self.logger.error(ex)
+
+    def requeue(self, chat_id, texts, retry_after, now=None):
+        """ queues the unsent messages of a chat again in front of newer messages
+
+        :param chat_id: telegram chat id
+        :param texts: list with unsent texts or functions
+        :param retry_after: seconds until the chat can be sent again
+        :param now: current timestamp
+        """
+        now = time() if now is None else now
+        with self.cv:
+            messages = OrderedDict()
+            for text in texts:
+                self.counter += 1
+                messages[('msg', self.counter)] = text
+            messages.update(self.pending.get(chat_id, OrderedDict()))
+
+            self.pending[chat_id] = messages
+            self.first_enqueue_ts[chat_id] = now
+            self.next_send_ts[chat_id] = now + retry_after
+            self.cv.notify()
+
+    @staticmethod
+    def split(text, max_length):
+        """ splits a text at line boundaries into chunks of at most max_length characters, markdown entities never span
+            lines and are not split
+
+        :param text: text
+        :param max_length: maximum length of a chunk
+
+        :return: list with chunks
+        """
+        if len(text) <= max_length:
+            return [text]
+
+        chunks = list()
+        chunk = ""
+        for line in text.splitlines(True):
+            if chunk and (len(chunk) + len(line) > max_length):
+                chunks.append(chunk)
+                chunk = ""
+            # a single line longer than a message is cut, which is only possible with unusable texts
+            while len(line) > max_length:
+                chunks.append(line[:max_length])
+                line = line[max_length:]
+            chunk += line
+        chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def merge(texts):
+        """ merges the texts into as few messages as possible, texts are only split if they are too long for one message
+
+        :param texts: list with texts
+
+        :return: list with merged texts not longer than max_length
+        """
+        chunks = list()
+        chunk = ''
+        for text in texts:
+            parts = TelegramSender.split(text=text, max_length=TelegramSender.max_length) or ['']
+            for part in parts:
+                if not chunk:
+                    chunk = part
+                elif len(chunk) + 2 + len(part) <= TelegramSender.max_length:
+                    chunk += '\n\n' + part
+                else:
+                    chunks.append(chunk)
+                    chunk = part
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
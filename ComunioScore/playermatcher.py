@@ -0,0 +1,181 @@
+import logging
+import unicodedata
+from difflib import SequenceMatcher
+
+
+class PlayerMatcher:
+    """ class PlayerMatcher to resolve comunio player names against the sofascore lineup of one match
+
+    USAGE:
+            matcher = PlayerMatcher(lineup=lineup, home_ratio=0.74, away_ratio=0.77)
+            matcher.match(playername='T. Müller')
+
+    """
+    def __init__(self, lineup, home_ratio=0.74, away_ratio=0.77, ngram_size=2):
+        self.logger = logging.getLogger('ComunioScore')
+
+        self.home_ratio = home_ratio
+        self.away_ratio = away_ratio
+        self.ngram_size = ngram_size
+
+        # player names of the lineup to detect if the matcher can be reused
+        self.names = self.lineup_names(lineup=lineup)
+
+        # index per team: {'homeTeam': {'names': [...], 'exact': {...}, 'ngrams': {...}}, ...}
+        self.index = dict()
+        for team in ('homeTeam', 'awayTeam'):
+            self.index[team] = self.__build_index(players=lineup[team])
+
+        # sofascore player ids: {player_id: (team, index)}
+        self.ids = dict()
+        for team in ('homeTeam', 'awayTeam'):
+            for i, player in enumerate(lineup[team]):
+                if player.player_id is not None:
+                    self.ids.setdefault(player.player_id, (team, i))
+
+        # already resolved comunio player names
+        self.resolved = dict()
+
+    @staticmethod
+    def lineup_names(lineup):
+        """ get the player names of a lineup
+
+        :param lineup: match lineup
+
+        :return: tuple with home and away player names
+        """
+        return (tuple(player.name for player in lineup['homeTeam']),
+                tuple(player.name for player in lineup['awayTeam']))
+
+    def is_valid_for(self, lineup):
+        """ checks if the matcher was built from the same lineup players
+
+        :param lineup: match lineup
+
+        :return: True if the lineup players are unchanged, else False
+        """
+        return self.names == self.lineup_names(lineup=lineup)
+
+    def __build_index(self, players):
+        """ builds the exact surname dict and the n-gram index for the players of a team
+
+        :param players: list with lineup players
+
+        :return: dict with the index data
+        """
+        names = list()
+        exact = dict()
+        ngrams = dict()
+
+        for i, player in enumerate(players):
+            forename, surename = self.seperate_playername(playername=player.name)
+            names.append((forename, surename))
+            exact.setdefault(surename, list()).append(i)
+            for gram in self.ngrams(surename):
+                ngrams.setdefault(gram, set()).add(i)
+
+        return {'names': names, 'exact': exact, 'ngrams': ngrams}
+
+    def ngrams(self, name):
+        """ creates the n-grams of a name padded with start and end markers
+
+        :param name: name
+
+        :return: set with n-grams
+        """
+        padded = "^{}$".format(name.lower())
+        return {padded[i:i + self.ngram_size] for i in range(len(padded) - self.ngram_size + 1)}
+
+    def match_player_id(self, player_id):
+        """ get the lineup player with the given sofascore player id
+
+        :param player_id: sofascore player id
+
+        :return: tuple (team, index) of the lineup player, None if the player is not in the lineup
+        """
+        return self.ids.get(player_id)
+
+    def match(self, playername):
+        """ matches a comunio player name with a player of the lineup
+
+        :param playername: comunio player name
+
+        :return: tuple (team, index) of the lineup player, None if no player matches
+        """
+        if playername in self.resolved:
+            return self.resolved[playername]
+
+        forename, surename = self.seperate_playername(playername=playername)
+
+        result = None
+        for team, ratio in (('homeTeam', self.home_ratio), ('awayTeam', self.away_ratio)):
+            index = self.__match_team(team_index=self.index[team], forename=forename, surename=surename, ratio=ratio)
+            if index is not None:
+                result = (team, index)
+                break
+
+        self.resolved[playername] = result
+        return result
+
+    def __match_team(self, team_index, forename, surename, ratio):
+        """ matches forename and surename with the players of one team
+
+        :param team_index: index data of the team
+        :param forename: comunio player forename
+        :param surename: comunio player surename
+        :param ratio: minimum SequenceMatcher ratio for the surename
+
+        :return: index of the lineup player, None if no player matches
+        """
+        exact_hits = set(team_index['exact'].get(surename, ()))
+
+        candidates = set(exact_hits)
+        for gram in self.ngrams(surename):
+            candidates.update(team_index['ngrams'].get(gram, ()))
+
+        # keep the lineup order, the first matching player wins
+        for i in sorted(candidates):
+            lineup_forename, lineup_surename = team_index['names'][i]
+
+            if i not in exact_hits:
+                matcher = SequenceMatcher(None, surename, lineup_surename)
+                if (matcher.real_quick_ratio() <= ratio) or (matcher.quick_ratio() <= ratio) or (matcher.ratio() <= ratio):
+                    continue
+
+            if forename:
+                if forename == lineup_forename[:len(forename)]:
+                    return i
+            else:
+                return i
+
+        return None
+
+    @staticmethod
+    def seperate_playername(playername):
+        """ seperates the playername into forename and surename
+
+        :return: forename and surename of player
+        """
+        playername_list = playername.split()
+
+        if len(playername_list) == 0:
+            playername_forename = ''
+            playername_surename = ''
+        elif len(playername_list) == 1:
+            playername_forename = ''
+            playername_surename = playername_list[0]
+        elif len(playername_list) == 2:
+            playername_forename = playername_list[0].replace('.', '')
+            playername_surename = playername_list[1]
+        elif len(playername_list) == 3:
+            playername_forename = playername_list[0]
+            playername_surename = playername_list[2]
+        else:
+            playername_forename = ''
+            playername_surename = ''
+
+        # remove accents
+        nfkd_form = unicodedata.normalize('NFKD', playername_surename)
+        playername_surename_accents = u"".join([c for c in nfkd_form if not unicodedata.name(c).endswith('ACCENT')])
+
+        return playername_forename, playername_surename_accents
@@ -1,4 +1,14 @@
 import logging
+from bisect import bisect_right
+
+from ComunioScore.exceptions import ScoringRulesError
+from ComunioScore.records import NO_RATING
+
+try:
+    import numpy as np
+    is_numpy_importable = True
+except ImportError:
+    is_numpy_importable = False
 
 
 class PointCalculator:
@@ -6,102 +16,179 @@ class PointCalculator:
 
     USAGE:
             calc = PointCalculator()
+            calc.get_points_from_rating(rating=6.8)
+            calc.get_points_from_ratings(ratings=[6.8, NO_RATING])
+            calc.calculate_batch(ratings=[6.8, NO_RATING], positions=['keeper', 'striker'],
+                                 incidents=[[], [Incident(type='goal', incident_class='regulargoal', player='Kramaric')]])
     """
-    def __init__(self):
+    # comunio scoring rules, the rating bands are sorted lower bounds with the points of the band
+    default_rules = {
+        'rating': ((0.0, -8), (4.7, -7), (5.0, -6), (5.3, -5), (5.5, -4), (5.7, -3), (5.9, -2), (6.1, -1),
+                   (6.3, 0), (6.5, 1), (6.7, 2), (6.9, 3), (7.1, 4), (7.3, 5), (7.5, 6), (7.7, 7), (7.9, 8),
+                   (8.1, 9), (8.5, 10), (8.9, 11), (9.3, 12)),
+        'max_rating': 10.0,
+        'goal': {'keeper': 6, 'defender': 5, 'midfielder': 4, 'striker': 3},
+        'penalty': 3,
+        'offs': {'yellow_red': -3, 'red': -6},
+    }
+
+    # sofascore positions to comunio positions
+    position_aliases = {'Goalkeeper': 'keeper', 'Defender': 'defender', 'Midfielder': 'midfielder', 'Forward': 'striker'}
+
+    # (incident type, incident class) to (points category, rule)
+    incident_rules = {
+        ('goal', 'regulargoal'): ('goal', 'goal'),
+        ('goal', 'penalty'):     ('goal', 'penalty'),
+        ('card', 'YellowRed'):   ('off', 'yellow_red'),
+        ('card', 'Red'):         ('off', 'red'),
+    }
+
+    def __init__(self, rules=None):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class PointCalculator')
 
-    @staticmethod
-    def get_points_from_rating(rating):
-        """ calculates the points from rating
+        self.rules = PointCalculator.default_rules if rules is None else rules
+
+        # compiled lookup structures of the rules
+        try:
+            self.breakpoints = [float(lower) for (lower, _) in self.rules['rating']]
+            self.band_points = [int(points) for (_, points) in self.rules['rating']]
+            self.max_rating = float(self.rules['max_rating'])
+            self.goal_points = {position: int(points) for (position, points) in self.rules['goal'].items()}
+            for alias, position in PointCalculator.position_aliases.items():
+                self.goal_points[alias] = self.goal_points[position]
+            self.penalty = int(self.rules['penalty'])
+            self.off_points = {off_type: int(points) for (off_type, points) in self.rules['offs'].items()}
+        except (KeyError, TypeError, ValueError) as ex:
+            raise ScoringRulesError("Invalid scoring rules: {}".format(ex))
+
+        if (not self.breakpoints) or (self.breakpoints != sorted(self.breakpoints)):
+            raise ScoringRulesError("Rating bands of the scoring rules must be sorted by the lower bound")
+
+    def get_points_from_rating(self, rating):
+        """ calculates the points from rating, ratings between two bands fall into the lower band
 
         :param rating: rating number
         :return: points for given rating
         """
+        if (rating < self.breakpoints[0]) or (rating > self.max_rating):
+            self.logger.error("Invalid rating {}".format(rating))
+            return None
 
-        if (rating >= 0) and (rating <= 4.6):
-            return -8
-        elif (rating >= 4.7) and (rating <= 4.9):
-            return -7
-        elif (rating >= 5.0) and (rating <= 5.2):
-            return -6
-        elif (rating >= 5.3) and (rating <= 5.4):
-            return -5
-        elif (rating >= 5.5) and (rating <= 5.6):
-            return -4
-        elif (rating >= 5.7) and (rating <= 5.8):
-            return -3
-        elif (rating >= 5.9) and (rating <= 6.0):
-            return -2
-        elif (rating >= 6.1) and (rating <= 6.2):
-            return -1
-        elif (rating >= 6.3) and (rating <= 6.4):
-            return 0
-        elif (rating >= 6.5) and (rating <= 6.6):
-            return 1
-        elif (rating >= 6.7) and (rating <= 6.8):
-            return 2
-        elif (rating >= 6.9) and (rating <= 7.0):
-            return 3
-        elif (rating >= 7.1) and (rating <= 7.2):
-            return 4
-        elif (rating >= 7.3) and (rating <= 7.4):
-            return 5
-        elif (rating >= 7.5) and (rating <= 7.6):
-            return 6
-        elif (rating >= 7.7) and (rating <= 7.8):
-            return 7
-        elif (rating >= 7.9) and (rating <= 8.0):
-            return 8
-        elif (rating >= 8.1) and (rating <= 8.4):
-            return 9
-        elif (rating >= 8.5) and (rating <= 8.8):
-            return 10
-        elif (rating >= 8.9) and (rating <= 9.2):
-            return 11
-        elif (rating >= 9.3) and (rating <= 10.0):
-            return 12
-        else:
-            logging.getLogger('ComunioScore').error("Invalid rating {}".format(rating))
+        return self.band_points[bisect_right(self.breakpoints, rating) - 1]
 
-    @staticmethod
-    def get_points_for_goal(position):
+    def get_points_from_ratings(self, ratings):
+        """ calculates the points of many ratings with one lookup, with numpy searchsorted if numpy is importable
+
+        :param ratings: list with float ratings, NO_RATING or None for players without rating
+
+        :return: list with points, NO_RATING for players without rating and None for invalid ratings
+        """
+        if is_numpy_importable:
+            return self.__rating_points_numpy(ratings=ratings)
+
+        return [NO_RATING if (rating is None) or (rating is NO_RATING) else self.get_points_from_rating(rating=rating)
+                for rating in ratings]
+
+    def get_points_for_goal(self, position):
         """ calculates points for goals
 
         :param position: position type
         :return: points for the position type
         """
+        points = self.goal_points.get(position)
+        if points is None:
+            self.logger.error("Invalid position {}".format(position))
 
-        if (position == 'Goalkeeper') or (position == 'keeper'):
-            return 6
-        elif (position == 'Defender') or (position == 'defender'):
-            return 5
-        elif (position == 'Midfielder') or (position == 'midfielder'):
-            return 4
-        elif (position == 'Forward') or (position == 'striker'):
-            return 3
-        else:
-            logging.getLogger('ComunioScore').error("Invalid position {}".format(position))
+        return points
 
-    @staticmethod
-    def get_points_for_offs(off_type):
+    def get_points_for_offs(self, off_type):
         """ get points for offs
 
         :return: points for the off type
         """
+        points = self.off_points.get(off_type)
+        if points is None:
+            self.logger.error("Invalid off_type {}".format(off_type))
 
-        if off_type == 'yellow_red':
-            return -3
-        elif off_type == 'red':
-            return -6
-        else:
-            logging.getLogger('ComunioScore').error("Invalid off_type {}".format(off_type))
+        return points
 
-    @staticmethod
-    def get_penalty():
+    def get_penalty(self):
         """ get points for penalty
 
         :return: points for penalty
         """
-        return 3
+        return self.penalty
+
+    def get_points_for_incident(self, incident, position):
+        """ get the points for a goal or card incident
+
+        :param incident: Incident record
+        :param position: position type of the player
+
+        :return: tuple (category 'goal' or 'off', points), None if the incident gives no points
+        """
+        rule = PointCalculator.incident_rules.get(incident.key())
+        if rule is None:
+            return None
+
+        category, name = rule
+        if name == 'goal':
+            points = self.get_points_for_goal(position=position)
+        elif name == 'penalty':
+            points = self.get_penalty()
+        else:
+            points = self.get_points_for_offs(off_type=name)
+
+        if points is None:
+            return None
+        return category, points
+
+    def calculate_batch(self, ratings, positions, incidents, rating_points=None):
+        """ calculates the rating, goal and off points of many players in one call
+
+        :param ratings: list with float ratings, NO_RATING or None for players without rating
+        :param positions: list with the position types
+        :param incidents: list with the Incident record lists of the players
+        :param rating_points: list with the already calculated points of the ratings, None to calculate them
+
+        :return: list with tuples (rating points, goal points, off points) per player
+        """
+        goal_points = [0] * len(ratings)
+        off_points = [0] * len(ratings)
+        for index, (position, player_incidents) in enumerate(zip(positions, incidents)):
+            for incident in player_incidents:
+                incident_points = self.get_points_for_incident(incident=incident, position=position)
+                if incident_points is None:
+                    continue
+                if incident_points[0] == 'goal':
+                    goal_points[index] += incident_points[1]
+                else:
+                    off_points[index] += incident_points[1]
+
+        if rating_points is None:
+            rating_points = self.get_points_from_ratings(ratings=ratings)
+        rating_points = [0 if (points is None) or (points is NO_RATING) else points for points in rating_points]
+
+        return list(zip(rating_points, goal_points, off_points))
+
+    def __rating_points_numpy(self, ratings):
+        """ looks up the rating points of all ratings with one searchsorted call
+
+        :param ratings: list with float ratings, NO_RATING or None for players without rating
+
+        :return: list with rating points, NO_RATING for missing and None for invalid ratings
+        """
+        values = np.array([np.nan if (rating is None) or (rating is NO_RATING) else rating for rating in ratings],
+                          dtype=float)
+        valid = (values >= self.breakpoints[0]) & (values <= self.max_rating)
+
+        invalid = ~valid & ~np.isnan(values)
+        if invalid.any():
+            self.logger.error("Invalid ratings {}".format(values[invalid].tolist()))
+
+        indices = np.searchsorted(np.array(self.breakpoints), np.where(valid, values, self.breakpoints[0]), side='right') - 1
+        points = np.array(self.band_points)[indices].tolist()
 
+        return [NO_RATING if (rating is None) or (rating is NO_RATING) else (points[index] if valid[index] else None)
+                for (index, rating) in enumerate(ratings)]
@@ -0,0 +1,154 @@
+import logging
+from time import time
+from threading import Lock
+
+
+class PollingPolicy:
+    """ class PollingPolicy to get the polling interval of a match depending on the match phase and the ScraperAPI quota
+
+    USAGE:
+            policy = PollingPolicy(intervals={'firsthalf': 240})
+            policy.update_quota(scraper_requests={'requestCount': 500, 'requestLimit': 1000})
+            policy.interval(status={'type': 'inprogress', 'code': 6, 'description': '1st half'})
+
+    """
+    # default polling intervals in seconds for each match phase
+    default_intervals = {
+        'prematch':   300,  # lineup before kickoff
+        'firsthalf':  300,
+        'halftime':   600,
+        'secondhalf': 300,
+        'stoppage':   180,
+        'settlement': 600,  # ratings are settled after the final whistle
+        'unknown':    480,
+    }
+
+    # quota usage thresholds and the factors for the intervals
+    quota_factors = ((0.95, 4), (0.85, 2))
+
+    # maximum factor for the intervals if the projected usage exceeds the quota
+    max_projected_factor = 4
+
+    def __init__(self, intervals=None, period_length=45 * 60, quota_refresh=1800):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class PollingPolicy')
+
+        self.intervals = dict(PollingPolicy.default_intervals)
+        if intervals is not None:
+            self.set_intervals(intervals=intervals)
+
+        self.period_length = period_length  # 2700 seconds (45 min) per half
+        self.quota_refresh = quota_refresh  # 1800 seconds (30 min) between two account requests
+
+        self.quota_usage = 0.0
+        self.projected_usage = 0.0
+        self.last_quota_ts = None
+        # refresh_quota is called from every fetch thread
+        self.quota_lock = Lock()
+
+    def set_intervals(self, intervals):
+        """ sets the polling intervals for the given phases
+
+        :param intervals: dict with phase as key and seconds as value
+        """
+        for phase, interval in intervals.items():
+            if phase in self.intervals:
+                self.intervals[phase] = int(interval)
+            else:
+                self.logger.error("Invalid polling phase {}".format(phase))
+
+    def phase(self, status, now=None):
+        """ get the match phase from the match status
+
+        :param status: status dict from BundesligaScore.match_status
+        :param now: current timestamp
+
+        :return: match phase
+        """
+        now = time() if now is None else now
+        status_type = status.get('type')
+        code = status.get('code')
+        description = (status.get('description') or '').lower()
+
+        if status_type == 'notstarted':
+            return 'prematch'
+        elif status_type == 'finished':
+            return 'settlement'
+        elif status_type == 'inprogress':
+            if (code == 31) or (description == 'halftime'):
+                return 'halftime'
+            elif (code == 6) or (description == '1st half'):
+                half = 'firsthalf'
+            elif (code == 7) or (description == '2nd half'):
+                half = 'secondhalf'
+            else:
+                return 'unknown'
+
+            # check if the half is in stoppage time
+            period_start = status.get('period_start')
+            if period_start and ((now - period_start) > self.period_length):
+                return 'stoppage'
+            return half
+        else:
+            return 'unknown'
+
+    def interval(self, status=None, phase=None):
+        """ get the polling interval for the match status or phase
+
+        :param status: status dict from BundesligaScore.match_status
+        :param phase: match phase, used if no status is given
+
+        :return: interval in seconds
+        """
+        if status is not None:
+            phase = self.phase(status=status)
+
+        return self.intervals.get(phase, self.intervals['unknown']) * self.quota_factor()
+
+    def quota_factor(self):
+        """ get the factor for the intervals depending on the quota usage and the projected usage
+
+        :return: factor
+        """
+        factor = 1
+        for usage, usage_factor in PollingPolicy.quota_factors:
+            if self.quota_usage >= usage:
+                factor = usage_factor
+                break
+
+        # stretch the intervals so that the projected requests fit into the quota
+        if self.projected_usage > 1:
+            factor = max(factor, min(self.projected_usage, PollingPolicy.max_projected_factor))
+
+        return factor
+
+    def update_quota(self, scraper_requests):
+        """ updates the quota usage from the ScraperAPI account info
+
+        :param scraper_requests: account dict with 'requestCount', 'requestLimit' and the optional 'projectedCount'
+        """
+        if ('requestCount' in scraper_requests) and ('requestLimit' in scraper_requests) and scraper_requests['requestLimit']:
+            with self.quota_lock:
+                self.last_quota_ts = time()
+                self.quota_usage = scraper_requests['requestCount'] / scraper_requests['requestLimit']
+                self.projected_usage = scraper_requests.get('projectedCount', 0) / scraper_requests['requestLimit']
+            if self.quota_factor() > 1:
+                self.logger.error("Scraper quota usage at {:.0%} and projected at {:.0%}, polling intervals are multiplied "
+                                  "by {:.2f}".format(self.quota_usage, self.projected_usage, self.quota_factor()))
+        else:
+            with self.quota_lock:
+                self.last_quota_ts = time()
+            self.logger.error("Could not update the quota usage from the scraper account info")
+
+    def refresh_quota(self, func):
+        """ refreshes the quota usage if the last refresh is older than quota_refresh
+
+        :param func: function which returns the ScraperAPI account info
+        """
+        # only one thread requests the account info, the others keep the current quota usage
+        with self.quota_lock:
+            if (self.last_quota_ts is not None) and ((time() - self.last_quota_ts) <= self.quota_refresh):
+                return
+            self.last_quota_ts = time()
+
+        self.update_quota(scraper_requests=func())
@@ -0,0 +1,221 @@
+class NoRating:
+    """ class NoRating for the sentinel of players without a sofascore rating, displayed as '–'
+
+    USAGE:
+            rating = LineupPlayer.parse_rating(value='–')
+            rating is NO_RATING
+
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        """ string representation of the missing rating
+
+        :return: string
+        """
+        return '–'
+
+    def __repr__(self):
+        """ string representation of the missing rating
+
+        :return: string
+        """
+        return 'NO_RATING'
+
+
+NO_RATING = NoRating()
+
+
+class Incident:
+    """ class Incident to hold a goal or card incident of a lineup player
+
+    USAGE:
+            incident = Incident(type='goal', incident_class='regulargoal', player='Jorge Mere', player_id=794839)
+
+    """
+    __slots__ = ('type', 'incident_class', 'player', 'player_id')
+
+    def __init__(self, type, incident_class, player, player_id=None):
+        self.type = type
+        self.incident_class = incident_class
+        self.player = player
+        self.player_id = player_id
+
+    def key(self):
+        """ get the type and class of the incident
+
+        :return: tuple (type, incident_class)
+        """
+        return self.type, self.incident_class
+
+    def __eq__(self, other):
+        """ compares two incidents
+
+        :return: True if all fields are equal
+        """
+        if not isinstance(other, Incident):
+            return NotImplemented
+        return (self.key(), self.player, self.player_id) == (other.key(), other.player, other.player_id)
+
+    def __hash__(self):
+        """ hash over the fields of __eq__
+
+        :return: hash
+        """
+        return hash((self.key(), self.player, self.player_id))
+
+    def __repr__(self):
+        """ string representation of the incident
+
+        :return: string
+        """
+        return "Incident(type={}, incident_class={}, player={}, player_id={})".format(self.type, self.incident_class,
+                                                                                     self.player, self.player_id)
+
+
+class LineupPlayer:
+    """ class LineupPlayer to hold a player of a sofascore lineup with the rating parsed to float
+
+    USAGE:
+            player = LineupPlayer(name='Rune Jarstein', player_id=35612, substitute=False,
+                                  rating=LineupPlayer.parse_rating(value='6.5'))
+
+    """
+    __slots__ = ('name', 'player_id', 'substitute', 'rating')
+
+    def __init__(self, name, player_id=None, substitute=False, rating=NO_RATING):
+        self.name = name
+        self.player_id = player_id
+        self.substitute = substitute
+        self.rating = rating
+
+    @staticmethod
+    def parse_rating(value):
+        """ parses a sofascore rating once to float
+
+        :param value: rating string or number, '–' or None for players without rating
+
+        :return: float rating, NO_RATING if the player has no valid rating
+        """
+        if (value is None) or (value is NO_RATING):
+            return NO_RATING
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return NO_RATING
+
+    def __eq__(self, other):
+        """ compares two lineup players
+
+        :return: True if all fields are equal
+        """
+        if not isinstance(other, LineupPlayer):
+            return NotImplemented
+        return ((self.name, self.player_id, self.substitute, self.rating) ==
+                (other.name, other.player_id, other.substitute, other.rating))
+
+    def __hash__(self):
+        """ hash over the fields of __eq__
+
+        :return: hash
+        """
+        return hash((self.name, self.player_id, self.substitute, self.rating))
+
+    def __repr__(self):
+        """ string representation of the lineup player
+
+        :return: string
+        """
+        return "LineupPlayer(name={}, player_id={}, substitute={}, rating={})".format(self.name, self.player_id,
+                                                                                     self.substitute, self.rating)
+
+
+class ScoredPlayer:
+    """ class ScoredPlayer to hold a comunio player of the livedata with the rating points of the matched lineup player
+
+    USAGE:
+            player = ScoredPlayer(name='Jorge Mere', rating=7.6, points=6, position='defender', incidents=[], team='homeTeam')
+            player.key()
+
+    """
+    __slots__ = ('name', 'rating', 'points', 'position', 'incidents', 'team')
+
+    def __init__(self, name, rating, points, position, incidents=(), team=None):
+        self.name = name
+        self.rating = rating
+        self.points = points
+        self.position = position
+        self.incidents = incidents
+        self.team = team
+
+    def key(self):
+        """ key of the lineup player, players of both teams can have the same name
+
+        :return: tuple (team, name)
+        """
+        return self.team, self.name
+
+    def __repr__(self):
+        """ string representation of the scored player
+
+        :return: string
+        """
+        return "ScoredPlayer(name={}, rating={}, points={}, position={}, incidents={}, team={})".format(
+            self.name, self.rating, self.points, self.position, self.incidents, self.team)
+
+
+class UserMatchScore:
+    """ class UserMatchScore to hold the points of one comunio user for one match
+
+    USAGE:
+            score = UserMatchScore(userid=13065521, username='Shaggy', rating=6, goal=5, off=0)
+            score.total
+
+    """
+    __slots__ = ('userid', 'username', 'rating', 'goal', 'off')
+
+    def __init__(self, userid, username, rating=0, goal=0, off=0):
+        self.userid = userid
+        self.username = username
+        self.rating = rating
+        self.goal = goal
+        self.off = off
+
+    @property
+    def total(self):
+        """ total points of rating, goal and off
+
+        :return: total points
+        """
+        return self.rating + self.goal + self.off
+
+    def points(self):
+        """ get the points as tuple
+
+        :return: tuple (rating, goal, off)
+        """
+        return self.rating, self.goal, self.off
+
+    def __eq__(self, other):
+        """ compares two scores
+
+        :return: True if userid and points are equal
+        """
+        if not isinstance(other, UserMatchScore):
+            return NotImplemented
+        return (self.userid, self.points()) == (other.userid, other.points())
+
+    def __hash__(self):
+        """ hash over the fields of __eq__
+
+        :return: hash
+        """
+        return hash((self.userid, self.points()))
+
+    def __repr__(self):
+        """ string representation of the user match score
+
+        :return: string
+        """
+        return "UserMatchScore(userid={}, username={}, rating={}, goal={}, off={})".format(self.userid, self.username,
+                                                                                          self.rating, self.goal, self.off)
@@ -0,0 +1,276 @@
+import os
+import json
+import logging
+import argparse
+import configparser
+from time import perf_counter
+from configparser import NoOptionError, NoSectionError
+
+from ComunioScore.livedata import LiveData
+from ComunioScore.score import BundesligaScore
+from ComunioScore.records import LineupPlayer, Incident
+from ComunioScore.utils import Logger
+from ComunioScore.exceptions import ScoringRulesError
+from ComunioScore import __version__
+
+
+class Replay(LiveData):
+    """ class Replay to recompute the points of past matches from stored lineup snapshots
+
+    snapshot records are json lines with the match lineup and the squads of the match day. The database snapshots are
+    replayed with the squad snapshot stored during the match, records without squads are skipped because the current
+    squads would overwrite or compare the points of past matches with wrong values:
+    {"match_day": 3, "match_id": 8272345, "home_team": "Hertha BSC", "away_team": "Fortuna Düsseldorf",
+     "lineup": {"homeTeam": [{"player_name": "Rune Jarstein", "player_id": 35612, "player_rating": "6.5"}, ...],
+                "awayTeam": [...], "homeTeamIncidents": [{"type": "card", "class": "Red", "player": "Rune Jarstein"}],
+                "awayTeamIncidents": [...]},
+     "squads": {"13065521": {"user": "Shaggy", "community": "Bundesliga Kickers",
+                             "squad": [["Jorge Meré", "defender", "1. FC Köln"]]}}}
+
+    USAGE:
+            replay = Replay(write=False, **dbparams)
+            summary = replay.run(path='/var/lib/comunioscore/season2019.jsonl')
+            summary = replay.run()  # last lineup snapshot of each match in the database
+
+    """
+    def __init__(self, write=False, **dbparams):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class Replay')
+
+        # init base class
+        super().__init__(**dbparams)
+
+        # write the replayed points and player mappings to the database, otherwise only compare them
+        self.write = write
+
+        # no telegram messages and every match is scored from scratch
+        self.is_notify = False
+        self.incremental = False
+
+    def run(self, path=None):
+        """ replays all snapshot records of the path or the lineup snapshots of the database
+
+        :param path: json lines file or directory with json lines files, None for the database snapshots
+
+        :return: summary dict with matches, users, differences, skipped match ids and seconds
+        """
+        if path is None:
+            records = self.load_db_snapshots()
+            self.logger.info("Replay {} matches from the lineup snapshots".format(len(records)))
+        else:
+            records = list(self.load_snapshots(path=path))
+            self.logger.info("Replay {} matches from {}".format(len(records), path))
+
+        # resolve the clubs of all squads to the teams of all replayed matches
+        teams, clubs = self.query_club_names()
+        for record in records:
+            teams.extend((record['home_team'], record['away_team']))
+            for user in record.get('squads', dict()).values():
+                clubs.extend(player[2] for player in user['squad'])
+        self.clubregistry.build(teams=set(teams), clubs=set(clubs))
+
+        summary = {'matches': 0, 'users': 0, 'differences': list(), 'skipped': list(), 'seconds': 0.0}
+
+        start = perf_counter()
+        for record in records:
+            scores = self.replay_match(record=record)
+            if scores is None:
+                summary['skipped'].append(record['match_id'])
+                continue
+            summary['matches'] += 1
+            summary['users'] += len(scores)
+            if not self.write:
+                summary['differences'].extend(self.compare_points(match_id=record['match_id'], scores=scores))
+        summary['seconds'] = perf_counter() - start
+
+        self.logger.info("Replayed {} matches in {:.2f} seconds with {} differences, skipped {} matches without squads"
+                         .format(summary['matches'], summary['seconds'], len(summary['differences']), len(summary['skipped'])))
+        return summary
+
+    def replay_match(self, record):
+        """ maps and scores the lineup of one snapshot record
+
+        :param record: snapshot record
+
+        :return: dict with userid as key and UserMatchScore as value, None if the record has no squads
+        """
+        match_id = record['match_id']
+        if 'squads' not in record:
+            self.logger.error("No squads stored for match {}, skip the replay".format(match_id))
+            return None
+
+        match_lineup = self.prepare_lineup(lineup=record['lineup'])
+
+        users = [(int(userid), user['user'], user.get('community')) for (userid, user) in record['squads'].items()]
+        squads = {int(userid): [tuple(player) for player in user['squad']] for (userid, user) in record['squads'].items()}
+
+        players_of_interest = self.filter_players_of_interest(users=users, squads=squads, home_team=record['home_team'],
+                                                              away_team=record['away_team'])
+        livedata = self.map_players_of_interest_with_match_lineup(players_of_interest=players_of_interest,
+                                                                  match_lineup=match_lineup, match_id=match_id)
+        self.player_matchers.pop(match_id, None)
+
+        scores = self.score_livedata(livedata=livedata)
+
+        if self.write:
+            self.update_points_in_database_batch(match_id=match_id, match_day=record['match_day'],
+                                                 points=[(userid,) + score.points() for (userid, score) in scores.items()])
+
+        return scores
+
+    def compare_points(self, match_id, scores):
+        """ compares the replayed points with the points in the database
+
+        :param match_id: match id
+        :param scores: dict with userid as key and UserMatchScore as value
+
+        :return: list with (match_id, userid, stored points, replayed points)
+        """
+        stored_points = self.query_match_points(match_id=match_id)
+
+        differences = list()
+        for userid, score in scores.items():
+            stored = stored_points.get(userid)
+            if stored != score.points():
+                differences.append((match_id, userid, stored, score.points()))
+
+        return differences
+
+    def insert_player_mapping(self, playername, club, sofascore_playerid, sofascore_playername):
+        """ persists new player mappings only in write mode
+
+        """
+        if self.write:
+            super().insert_player_mapping(playername=playername, club=club, sofascore_playerid=sofascore_playerid,
+                                          sofascore_playername=sofascore_playername)
+
+    def load_db_snapshots(self):
+        """ loads the last lineup snapshot and the last squad snapshot of every match from the database
+
+        :return: list with snapshot records, without squads if no squad snapshot is stored
+        """
+        records = dict()
+        for (match_day, match_id, home_team, away_team, lineup) in self.query_lineup_snapshot_records():
+            try:
+                match_lineup = self.bundesliga.parse_lineup(lineup=lineup)
+            except KeyError as ex:
+                self.logger.error("Could not parse the lineup snapshot of match {}: {}".format(match_id, ex))
+                continue
+            records[match_id] = {'match_day': match_day, 'match_id': match_id, 'home_team': home_team,
+                                 'away_team': away_team, 'lineup': match_lineup}
+
+            squads = self.query_last_squad_snapshot(match_id=match_id)
+            if squads is not None:
+                records[match_id]['squads'] = squads[1]
+
+        return list(records.values())
+
+    @staticmethod
+    def prepare_lineup(lineup):
+        """ converts the players and incidents of snapshot lineups to records and groups the incidents
+
+        :param lineup: lineup dict of a snapshot record or of lineup_from_match_id
+
+        :return: lineup dict of lineup_from_match_id
+        """
+        for team in ('homeTeam', 'awayTeam'):
+            lineup[team] = [LineupPlayer(name=player['player_name'], player_id=player.get('player_id'),
+                                         substitute=player.get('substitute', player.get('substitue', False)),
+                                         rating=LineupPlayer.parse_rating(value=player.get('player_rating')))
+                            if isinstance(player, dict) else player for player in lineup[team]]
+
+            incidents = lineup.get(team + 'Incidents', list())
+            is_json = any(isinstance(incident, dict) for incident in incidents)
+            if is_json or (team + 'IncidentsByPlayer' not in lineup):
+                incidents = [Incident(type=incident['type'], incident_class=incident['class'], player=incident['player'],
+                                      player_id=incident.get('player_id'))
+                             if isinstance(incident, dict) else incident for incident in incidents]
+                incidents_by_player, incidents_by_id = BundesligaScore.group_incidents(incidents=incidents)
+                lineup[team + 'Incidents'] = incidents
+                lineup[team + 'IncidentsByPlayer'] = incidents_by_player
+                lineup[team + 'IncidentsById'] = incidents_by_id
+                lineup[team + 'IncidentCount'] = len(incidents)
+
+        return lineup
+
+    @staticmethod
+    def load_snapshots(path):
+        """ loads the snapshot records of a json lines file or of all json lines files in a directory
+
+        :param path: path to a file or directory
+
+        :return: generator with snapshot records
+        """
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(('.json', '.jsonl')))
+        else:
+            files = [path]
+
+        for file in files:
+            with open(file, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def main():
+
+    description = "ComunioScore Replay\n\nUsage:\n    ComunioScoreReplay --file /etc/comunioscore/comunioscore.ini " \
+                  "/var/lib/comunioscore/season2019.jsonl\n    ComunioScoreReplay --file /etc/comunioscore/comunioscore.ini"
+
+    # parse arguments for the replay
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('snapshots',         type=str, nargs='?', default=None,
+                        help='Json lines file or directory with the snapshot records, default are the database snapshots')
+    parser.add_argument('--file',            type=str, help='Path to the configuration file for database, clubs and scoring')
+    parser.add_argument('--write',           action='store_true', help='Write the replayed points to the database')
+    parser.add_argument('-L', '--log_dir',   type=str, help='Logging directory for the replay', default='/var/log/')
+    parser.add_argument('-v', '--version',   action='version', version=__version__, help='show the current version')
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    if args.file:
+        config.read(args.file)
+
+    try:
+        # database section
+        dbparams = {'host':     config.get('database', 'host'),
+                    'port':     config.getint('database', 'port'),
+                    'username': config.get('database', 'username'),
+                    'password': config.get('database', 'password'),
+                    'dbname':   config.get('database', 'dbname')}
+    except (NoOptionError, NoSectionError, ValueError):
+        print("Sqlite database will be used!")
+        dbparams = dict()
+
+    # set up logger instance
+    logger = Logger(name='ComunioScore', level='info', log_folder=args.log_dir)
+    logger.info("Start ComunioScore Replay with version {}".format(__version__))
+
+    replay = Replay(write=args.write, **dbparams)
+
+    if config.has_section('clubs'):
+        replay.set_club_aliases(aliases=dict(config.items('clubs')))
+
+    try:
+        replay.set_scoring_rules(sections={section: dict(config.items(section)) for section in config.sections()
+                                           if section.split(' ')[0] == 'scoring'})
+    except ScoringRulesError as ex:
+        print(ex)
+        exit(1)
+
+    summary = replay.run(path=args.snapshots)
+
+    print("Replayed {} matches with {} user scores in {:.2f} seconds".format(summary['matches'], summary['users'],
+                                                                          summary['seconds']))
+    if summary['skipped']:
+        print("Skipped {} matches without stored squads: {}".format(len(summary['skipped']),
+                                                                   ', '.join(str(match_id) for match_id in summary['skipped'])))
+    if not args.write:
+        for (match_id, userid, stored, replayed) in summary['differences']:
+            print("Match {} user {}: stored {} replayed {}".format(match_id, userid, stored, replayed))
+        print("{} differences to the points table".format(len(summary['differences'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,3 @@
 from ComunioScore.score.sofascore import SofaScore
 from ComunioScore.score.bundesligascore import BundesligaScore
+from ComunioScore.score.matchdaystatus import MatchdayStatus
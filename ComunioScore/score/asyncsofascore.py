@@ -0,0 +1,222 @@
+import logging
+import asyncio
+from functools import partial
+
+try:
+    import aiohttp
+    is_aiohttp_importable = True
+except ImportError:
+    is_aiohttp_importable = False
+
+from ComunioScore.score.sofascore import SofaScore
+from ComunioScore.score.bundesligascore import BundesligaScore
+from ComunioScore.exceptions import SofascoreRequestError, SofascoreQuotaError
+
+
+class AsyncSofaScore:
+    """ class AsyncSofaScore to retrieve statistics from sofascore.com with coroutines
+
+    requests are sent non-blocking with aiohttp if it is importable, otherwise the blocking SofaScore requests run in
+    the executor of the event loop
+
+    USAGE:
+            sofascore = AsyncSofaScore()
+            await sofascore.get_date_data(date="2019-09-22")
+            await sofascore.close()
+
+    """
+    scraper_url = "https://api.scraperapi.com/"
+
+    def __init__(self, executor=None, timeout=60):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class AsyncSofaScore')
+
+        # blocking client for the urls and the executor fallback
+        self.sofascore = BundesligaScore()
+
+        self.executor = executor
+        self.timeout = timeout
+        self.session = None
+
+        if not is_aiohttp_importable:
+            self.logger.error("aiohttp is not installed, the requests are sent in the executor. Install the asyncio extra "
+                              "for non-blocking requests")
+
+    async def close(self):
+        """ closes the aiohttp session cleanly
+
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __request_api(self, url, endpoint, func, *args):
+        """ request data from sofascore url, fresh responses of the SofaScore cache are returned without a request and
+            concurrent requests of the same url are sent only once, also together with the blocking SofaScore requests
+
+        :param url: specific url depending on requested data
+        :param endpoint: endpoint name for the time to live of the response cache
+        :param func: blocking SofaScore method for the executor fallback
+        :param args: arguments of the blocking method
+
+        :return: json dict
+        """
+        if not is_aiohttp_importable:
+            return await asyncio.get_event_loop().run_in_executor(self.executor, partial(func, *args))
+
+        cached = SofaScore.cache.lookup(endpoint=endpoint, url=url)
+        if (cached is not None) and cached[2]:
+            return cached[0]
+
+        if not SofaScore.quota.allow(priority=SofaScore.quota.priority(endpoint=endpoint)):
+            if cached is not None:
+                self.logger.error("ScraperAPI quota is low, use the expired response of {}".format(url))
+                return cached[0]
+            raise SofascoreQuotaError("ScraperAPI quota is low, request of {} refused".format(url))
+
+        return await SofaScore.singleflight.do_async(key=url, func=partial(self.__fetch, url=url, endpoint=endpoint,
+                                                                           cached=cached))
+
+    async def __fetch(self, url, endpoint, cached):
+        """ sends the request with retries and serves the last good response if the upstream is degraded
+
+        :param url: specific url depending on requested data
+        :param endpoint: endpoint name for the time to live of the response cache
+        :param cached: expired cache entry (data, etag, is_fresh), None if the url is not cached
+
+        :return: json dict, empty dict if the request failed and no previous response exists
+        """
+        if SofaScore.scraper is None:
+            raise SofascoreRequestError("Sofascore scraper client is not initalized! Please call first init_scraper(api_key='')")
+
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+        # revalidate an expired response with its ETag
+        headers = {'If-None-Match': cached[1]} if (cached is not None) and cached[1] else {}
+
+        try:
+            return await SofaScore.policy.call_async(func=partial(self.__send, url=url, endpoint=endpoint, headers=headers,
+                                                                  cached=cached))
+        except SofascoreRequestError as ex:
+            self.logger.error("Could not retrieve data from Sofascore: {}".format(ex))
+
+        last_good = cached[0] if cached is not None else SofaScore.cache.last_good(url=url)
+        if last_good is not None:
+            self.logger.error("Use the last good response of {}".format(url))
+            return last_good
+        return {}
+
+    async def __send(self, url, endpoint, headers, cached, timeout):
+        """ sends one request without blocking and stores the response in the SofaScore cache
+
+        :param url: specific url depending on requested data
+        :param endpoint: endpoint name for the time to live of the response cache
+        :param headers: request headers
+        :param cached: expired cache entry (data, etag, is_fresh), None if the url is not cached
+        :param timeout: request timeout in seconds
+
+        :return: json dict
+        """
+        SofaScore.quota.record(priority=SofaScore.quota.priority(endpoint=endpoint))
+
+        params = {'api_key': SofaScore.scraper.api_key, 'url': url}
+        if headers:
+            # ScraperAPI forwards the request headers only with keep_headers
+            params['keep_headers'] = 'true'
+        try:
+            async with self.session.get(self.scraper_url, params=params, headers=headers,
+                                        timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if (response.status == 429) or (response.status >= 500):
+                    raise SofascoreRequestError("Status code {} for {}".format(response.status, url))
+                if (response.status == 304) and (cached is not None):
+                    # the entry can be evicted since the lookup, the expired response of the lookup is still valid
+                    data = SofaScore.cache.revalidate(url=url)
+                    return cached[0] if data is None else data
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            raise SofascoreRequestError(ex)
+        except ValueError as ex:
+            raise SofascoreRequestError("Invalid json for {}: {}".format(url, ex))
+
+        if data:
+            SofaScore.cache.store(endpoint=endpoint, url=url, data=data, etag=response.headers.get('ETag'))
+        return data
+
+    async def get_date_data(self, date):
+        """ get data from given date
+
+        :param date: date string: "2019-09-22"
+        :return: json dict
+        """
+        return await self.__request_api(self.sofascore.date_url.format(date=date), SofaScore.date_endpoint(date=date),
+                                        self.sofascore.get_date_data, date)
+
+    async def get_match_data(self, match_id):
+        """ get data from given match id
+
+        :param match_id: number for a specific match
+        :return: json dict
+        """
+        return await self.__request_api(self.sofascore.event_url.format(event_id=match_id), 'event',
+                                        self.sofascore.get_match_data, match_id)
+
+    async def get_lineups_match(self, match_id):
+        """ get squad lineups for given match id
+
+        :param match_id: number for a specific match
+        :return: json dict
+        """
+        return await self.__request_api(self.sofascore.lineups_url.format(event_id=match_id), 'lineups',
+                                        self.sofascore.get_lineups_match, match_id)
+
+
+class AsyncBundesligaScore(AsyncSofaScore):
+    """ class AsyncBundesligaScore to retrieve statistics from Bundesliga matches with coroutines
+
+    USAGE:
+            buli = AsyncBundesligaScore()
+            await buli.lineup_from_match_id(match_id=8272345)
+    """
+    def __init__(self, executor=None, timeout=60):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class AsyncBundesligaScore')
+
+        # init base class
+        super().__init__(executor=executor, timeout=timeout)
+
+    async def events_for_date(self, date):
+        """ get all Bundesliga events on given date
+
+        :param date: date string: "2019-09-22"
+
+        :return: list with sofascore event dicts
+        """
+        return self.sofascore.parse_events(date_data=await self.get_date_data(date=date), date=date)
+
+    async def lineup_from_match_id(self, match_id):
+        """ get lineup for given match_id
+
+        :return: lineup dict with 'homeTeam' and 'awayTeam', None if no lineup could be requested
+        """
+        lineup = await self.get_lineups_match(match_id=match_id)
+        if not self.sofascore.has_lineup(lineup=lineup):
+            self.logger.error("No lineup for match {}".format(match_id))
+            return None
+        if BundesligaScore.lineup_event_handler is not None:
+            await asyncio.get_event_loop().run_in_executor(self.executor, partial(BundesligaScore.notify_lineup,
+                                                                                  match_id=match_id, lineup=lineup))
+
+        return self.sofascore.parse_lineup(lineup=lineup)
+
+    async def match_status(self, matchid):
+        """ get the status of a match
+
+        :return: status dict, empty dict if the status could not be requested
+        """
+        try:
+            match_data = await self.get_match_data(match_id=matchid)
+        except SofascoreRequestError as ex:
+            self.logger.error(ex)
+            return {}
+        return self.sofascore.parse_match_status(match_data=match_data)
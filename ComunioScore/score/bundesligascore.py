@@ -1,7 +1,9 @@
 import logging
 from time import sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ComunioScore.score.sofascore import SofaScore
+from ComunioScore.records import LineupPlayer, Incident
 from ComunioScore.exceptions import SofascoreRequestError
 
 
@@ -17,6 +19,9 @@ class BundesligaScore(SofaScore):
     season_year = None  # 19/20
     season_id   = None  # 23583
 
+    # event handler for the raw lineup json of each request
+    lineup_event_handler = None
+
     def __init__(self):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class BundesligaScore')
@@ -27,6 +32,27 @@ class BundesligaScore(SofaScore):
         self.season_date = None
         self.matchday_data_list = None
 
+    @classmethod
+    def register_lineup_event_handler(cls, func):
+        """ registers the event handler for the raw lineup json, e.g. to store lineup snapshots
+
+        :param func: event handler with the parameters match_id and lineup
+        """
+        cls.lineup_event_handler = func
+
+    @classmethod
+    def notify_lineup(cls, match_id, lineup):
+        """ passes the raw lineup json to the lineup event handler
+
+        :param match_id: match id
+        :param lineup: raw json dict of get_lineups_match
+        """
+        if (cls.lineup_event_handler is not None) and lineup:
+            try:
+                cls.lineup_event_handler(match_id=match_id, lineup=lineup)
+            except Exception as ex:
+                logging.getLogger('ComunioScore').error("Lineup event handler failed for match {}: {}".format(match_id, ex))
+
     def init_season_data(self, season_date):
         """ checks if season data are set
 
@@ -110,69 +136,149 @@ class BundesligaScore(SofaScore):
         """
 
         matchday_data_list = list()
-        date_data = self.get_date_data(date=date)
-        tournaments = date_data['sportItem']['tournaments']
-        for tournament in tournaments:
-            if (tournament['tournament']['name'] == 'Bundesliga') and (tournament['category']['name'] == 'Germany'):
-                bundesliga_events = tournament['events']
-                for event in bundesliga_events:
-                    match = dict()
-                    match['id'] = event['id']
-                    match['match'] = event['name']
-                    match['homeTeam'] = {'name': event['name'].split(' - ')[0]}
-                    match['awayTeam'] = {'name': event['name'].split(' - ')[1]}
-                    matchday_data_list.append(match)
+        for event in self.events_for_date(date=date):
+            match = dict()
+            match['id'] = event['id']
+            match['match'] = event['name']
+            match['homeTeam'] = {'name': event['name'].split(' - ')[0]}
+            match['awayTeam'] = {'name': event['name'].split(' - ')[1]}
+            matchday_data_list.append(match)
 
         return matchday_data_list
 
+    def events_for_date(self, date):
+        """ get all Bundesliga events on given date
+
+        :param date: date string: "2019-09-22"
+
+        :return: list with sofascore event dicts
+        """
+        return self.parse_events(date_data=self.get_date_data(date=date), date=date)
+
+    def parse_events(self, date_data, date):
+        """ parses all Bundesliga events of the date data
+
+        :param date_data: json dict of get_date_data
+        :param date: date string: "2019-09-22"
+
+        :return: list with sofascore event dicts
+        """
+        events = list()
+        if 'sportItem' in date_data:
+            for tournament in date_data['sportItem']['tournaments']:
+                if (tournament['tournament']['name'] == 'Bundesliga') and (tournament['category']['name'] == 'Germany'):
+                    events.extend(tournament['events'])
+        else:
+            self.logger.error("no 'sportItem' in date data for {}".format(date))
+
+        return events
+
     def lineup_from_match_id(self, match_id):
         """ get lineup for given match_id
 
-        lineup = {'homeTeam': [{'player_name': 'Rune Jarstein', 'substitue': False, 'player_rating': '6.5'},
-                               {'player_name': 'Lukas Klünter', 'substitue': False, 'player_rating': '6.5'}],
-                  'awayTeam': [{'player_name': 'Zack Steffen', 'substitute': False, 'player_rating': '5.6'},
-                               {'player_name': 'Matthias Zimmermann', 'substitute': False, 'player_rating': '6.3'}]}
+        lineup = {'homeTeam': [LineupPlayer(name='Rune Jarstein', player_id=35612, substitute=False, rating=6.5),
+                               LineupPlayer(name='Lukas Klünter', player_id=283563, substitute=False, rating=6.5)],
+                  'awayTeam': [LineupPlayer(name='Zack Steffen', player_id=213492, substitute=False, rating=5.6),
+                               LineupPlayer(name='Matthias Zimmermann', player_id=122933, substitute=True, rating=NO_RATING)]}
 
-        :return: lineup dict with 'homeTeam' and 'awayTeam'
-        """
+        incidents per team: 'homeTeamIncidents' as list of Incident records, 'homeTeamIncidentsByPlayer' and
+        'homeTeamIncidentsById' grouped by player name and player id, 'homeTeamIncidentCount' to detect new incidents
 
+        :return: lineup dict with 'homeTeam' and 'awayTeam', None if no lineup could be requested
+        """
         lineup = self.get_lineups_match(match_id=match_id)
+        if not self.has_lineup(lineup=lineup):
+            self.logger.error("No lineup for match {}".format(match_id))
+            return None
+        self.notify_lineup(match_id=match_id, lineup=lineup)
+
+        return self.parse_lineup(lineup=lineup)
+
+    def lineups_from_match_ids(self, match_ids, max_workers=6):
+        """ get the lineups of several matches concurrently with a bounded worker pool
+
+        lineups = {8272345: (lineup, None), 8272011: (None, KeyError('homeTeam')), 8272012: (None, None)}
+
+        :param match_ids: list with match ids
+        :param max_workers: maximum number of concurrent requests
+
+        :return: dict with match id as key and tuple (lineup dict, None) or (None, exception) as value, the lineup
+                 dict is None if no lineup could be requested
+        """
+        lineups = dict()
+        if not match_ids:
+            return lineups
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(match_ids))) as executor:
+            futures = {executor.submit(self.lineup_from_match_id, match_id): match_id for match_id in match_ids}
+            for future in as_completed(futures):
+                try:
+                    lineups[futures[future]] = (future.result(), None)
+                except Exception as ex:
+                    lineups[futures[future]] = (None, ex)
+
+        return lineups
+
+    @staticmethod
+    def has_lineup(lineup):
+        """ checks if the sofascore lineups json contains the lineups of both teams
+
+        :param lineup: json dict of get_lineups_match
+
+        :return: bool, true or false
+        """
+        return all('lineupsSorted' in (lineup.get(team) or {}) for team in ('homeTeam', 'awayTeam'))
 
+    def parse_lineup(self, lineup):
+        """ parses the sofascore lineups json into the lineup dict of lineup_from_match_id
+
+        :param lineup: json dict of get_lineups_match
+
+        :return: lineup dict with 'homeTeam' and 'awayTeam'
+        """
         players_home_team = lineup['homeTeam']['lineupsSorted']
         players_away_team = lineup['awayTeam']['lineupsSorted']
 
         relevant_incidents = self._get_incidents_for_match(lineup=lineup)
 
+        # ratings are parsed once to float, players without rating get the NO_RATING sentinel
         lineup_dict = dict()
-        home_lineup_list = list()
-        away_lineup_list = list()
-        for player in players_home_team:
-            home_player_dict =  dict()
-            home_player_dict['player_name'] = player['player']['name']
-            home_player_dict['substitue']   = player['substitute']
-            try:
-                home_player_dict['player_rating'] = player['rating']
-            except KeyError:
-                home_player_dict['player_rating'] = '–'
-            home_lineup_list.append(home_player_dict)
-
-        for player in players_away_team:
-            away_player_dict = dict()
-            away_player_dict['player_name'] = player['player']['name']
-            away_player_dict['substitute']  = player['substitute']
-            try:
-                away_player_dict['player_rating'] = player['rating']
-            except KeyError:
-                away_player_dict['player_rating'] = '–'
-            away_lineup_list.append(away_player_dict)
-
-        lineup_dict['homeTeam'] = home_lineup_list
-        lineup_dict['awayTeam'] = away_lineup_list
-        lineup_dict['homeTeamIncidents'] = relevant_incidents['home_team_incidents']
-        lineup_dict['awayTeamIncidents'] = relevant_incidents['away_team_incidents']
+        lineup_dict['homeTeam'] = [LineupPlayer(name=player['player']['name'], player_id=player['player'].get('id'),
+                                                substitute=player.get('substitute', False),
+                                                rating=LineupPlayer.parse_rating(value=player.get('rating')))
+                                   for player in players_home_team]
+        lineup_dict['awayTeam'] = [LineupPlayer(name=player['player']['name'], player_id=player['player'].get('id'),
+                                                substitute=player.get('substitute', False),
+                                                rating=LineupPlayer.parse_rating(value=player.get('rating')))
+                                   for player in players_away_team]
+        for team, team_incidents in (('homeTeam', relevant_incidents['home_team_incidents']),
+                                     ('awayTeam', relevant_incidents['away_team_incidents'])):
+            incidents_by_player, incidents_by_id = self.group_incidents(incidents=team_incidents)
+            lineup_dict[team + 'Incidents'] = team_incidents
+            lineup_dict[team + 'IncidentsByPlayer'] = incidents_by_player
+            lineup_dict[team + 'IncidentsById'] = incidents_by_id
+            lineup_dict[team + 'IncidentCount'] = len(team_incidents)
 
         return lineup_dict
 
+    @staticmethod
+    def group_incidents(incidents):
+        """ groups the incidents of a team by player name and by sofascore player id
+
+        :param incidents: list with Incident records
+
+        :return: tuple (dict with player name as key, dict with player id as key), list of incidents as values
+        """
+        incidents_by_player = dict()
+        incidents_by_id = dict()
+
+        for incident in incidents:
+            incidents_by_player.setdefault(incident.player, list()).append(incident)
+            if incident.player_id is not None:
+                incidents_by_id.setdefault(incident.player_id, list()).append(incident)
+
+        return incidents_by_player, incidents_by_id
+
     def _get_incidents_for_match(self, lineup):
         """ get all incidents for a specific match
 
@@ -191,18 +297,14 @@ class BundesligaScore(SofaScore):
                     if 'incidentType' in inc:
                         # goal incident
                         if inc['incidentType'] == 'goal':
-                            incidents_hometeam = dict()
-                            incidents_hometeam['type'] = 'goal'
-                            incidents_hometeam['class'] = inc['incidentClass']
-                            incidents_hometeam['player'] = inc['player']['name']
-                            home_team_incidents_list.append(incidents_hometeam)
+                            home_team_incidents_list.append(Incident(type='goal', incident_class=inc['incidentClass'],
+                                                                     player=inc['player']['name'],
+                                                                     player_id=inc['player'].get('id')))
                         # yellowRed, Red incident
                         if (inc['incidentType'] == 'card') and ((inc['type'] == 'YellowRed') or (inc['type'] == 'Red')):
-                            incidents_hometeam = dict()
-                            incidents_hometeam['type'] = 'card'
-                            incidents_hometeam['class'] = inc['type']
-                            incidents_hometeam['player'] = inc['player']['name']
-                            home_team_incidents_list.append(incidents_hometeam)
+                            home_team_incidents_list.append(Incident(type='card', incident_class=inc['type'],
+                                                                     player=inc['player']['name'],
+                                                                     player_id=inc['player'].get('id')))
 
         away_team_incidents_list = list()
         if 'incidents' in lineup['awayTeam']:
@@ -212,18 +314,14 @@ class BundesligaScore(SofaScore):
                     if 'incidentType' in inc:
                         # goal incident
                         if inc['incidentType'] == 'goal':
-                            incidents_awayteam = dict()
-                            incidents_awayteam['type'] = 'goal'
-                            incidents_awayteam['class'] = inc['incidentClass']
-                            incidents_awayteam['player'] = inc['player']['name']
-                            away_team_incidents_list.append(incidents_awayteam)
+                            away_team_incidents_list.append(Incident(type='goal', incident_class=inc['incidentClass'],
+                                                                     player=inc['player']['name'],
+                                                                     player_id=inc['player'].get('id')))
                         # yellowRed, Red incident
                         if (inc['incidentType'] == 'card') and ((inc['type'] == 'YellowRed') or (inc['type'] == 'Red')):
-                            incidents_awayteam = dict()
-                            incidents_awayteam['type'] = 'card'
-                            incidents_awayteam['class'] = inc['type']
-                            incidents_awayteam['player'] = inc['player']['name']
-                            away_team_incidents_list.append(incidents_awayteam)
+                            away_team_incidents_list.append(Incident(type='card', incident_class=inc['type'],
+                                                                     player=inc['player']['name'],
+                                                                     player_id=inc['player'].get('id')))
 
         relevant_incidents['home_team_incidents'] = home_team_incidents_list
         relevant_incidents['away_team_incidents'] = away_team_incidents_list
@@ -276,25 +374,55 @@ class BundesligaScore(SofaScore):
             self.logger.error("KeyError: 'tournaments' not in season_data")
             return season_list
 
-    def is_finished(self, matchid):
-        """ checks if a match has finished
+    def match_status(self, matchid):
+        """ get the status of a match
 
-        :return: bool, true or false
+        status = {'type': 'inprogress', 'code': 7, 'description': '2nd half', 'period_start': 1565983800}
+
+        :return: status dict, empty dict if the status could not be requested
         """
         try:
             events = self.get_match_data(match_id=matchid)
         except SofascoreRequestError as ex:
             self.logger.error(ex)
-            return False
+            return {}
+        return self.parse_match_status(match_data=events)
+
+    def parse_match_status(self, match_data):
+        """ parses the status of the match data
+
+        :param match_data: json dict of get_match_data
+
+        :return: status dict, empty dict if the match data has no event
+        """
+        events = match_data
         if 'event' in events:
-            status = events['event']['status']['type']
-            if status == 'finished':
-                return True
-            else:
-                return False
+            return self.parse_status(event=events['event'])
         else:
             self.logger.error("no 'event' in self.get_match_data")
-            return False
+            return {}
+
+    @staticmethod
+    def parse_status(event):
+        """ parses the status of a sofascore event
+
+        :param event: sofascore event dict
+
+        :return: status dict
+        """
+        status = dict()
+        status['type'] = event['status']['type']
+        status['code'] = event['status'].get('code')
+        status['description'] = event['status'].get('description', event.get('statusDescription'))
+        status['period_start'] = event.get('time', {}).get('currentPeriodStartTimestamp')
+        return status
+
+    def is_finished(self, matchid):
+        """ checks if a match has finished
+
+        :return: bool, true or false
+        """
+        return self.match_status(matchid=matchid).get('type') == 'finished'
 
 
 if __name__ == '__main__':
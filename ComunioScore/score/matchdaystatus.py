@@ -0,0 +1,68 @@
+import logging
+
+from ComunioScore.score.bundesligascore import BundesligaScore
+from ComunioScore.exceptions import SofascoreRequestError
+
+
+class MatchdayStatus:
+    """ class MatchdayStatus to get the status of all matches of a date with one request of the date feed
+
+    USAGE:
+            matchdaystatus = MatchdayStatus(bundesliga=BundesligaScore())
+            matchdaystatus.refresh(dates=['2019-10-05'])
+            matchdaystatus.is_finished(match_id=8272345)
+
+    """
+    def __init__(self, bundesliga):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class MatchdayStatus')
+
+        self.bundesliga = bundesliga
+
+        # status snapshot of the last refresh with match id as key
+        self.statuses = dict()
+
+    def refresh(self, dates):
+        """ refreshes the status snapshot with one date feed request per date
+
+        :param dates: list with date strings: "2019-09-22"
+        """
+        statuses = dict()
+        for date in set(dates):
+            try:
+                events = self.bundesliga.events_for_date(date=date)
+            except SofascoreRequestError as ex:
+                self.logger.error(ex)
+                continue
+
+            for event in events:
+                try:
+                    statuses[event['id']] = BundesligaScore.parse_status(event=event)
+                except KeyError as ex:
+                    self.logger.error("Could not parse status of event {}: {}".format(event.get('id'), ex))
+
+        self.statuses = statuses
+
+    def status(self, match_id):
+        """ get the status of the match from the snapshot, requests the match data if the match is not in the snapshot
+
+        :param match_id: match id
+
+        :return: status dict
+        """
+        status = self.statuses.get(match_id)
+
+        if status is None:
+            self.logger.info("Match {} not in the date feed, request the match status".format(match_id))
+            status = self.bundesliga.match_status(matchid=match_id)
+
+        return status
+
+    def is_finished(self, match_id):
+        """ checks if a match has finished
+
+        :param match_id: match id
+
+        :return: bool, true or false
+        """
+        return self.status(match_id=match_id).get('type') == 'finished'
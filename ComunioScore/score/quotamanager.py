@@ -0,0 +1,232 @@
+import logging
+import datetime
+from time import time
+from threading import Lock
+
+
+class QuotaManager:
+    """ class QuotaManager to track the ScraperAPI requests and to throttle requests before the quota is used up
+
+    the requests are counted locally and reconciled with the ScraperAPI account info. The usage at the end of the billing
+    period is projected from the scheduled matches, background requests are refused if the projection exceeds the limit
+
+    USAGE:
+            quota = QuotaManager(requests_per_match=40)
+            quota.reconcile(account={'requestCount': 500, 'requestLimit': 1000, 'subscriptionDate': '2020-01-10T09:49:26.000Z'})
+            quota.set_schedule(timestamps=[1565980200, 1566048600])
+            quota.allow(priority='background')
+
+    """
+    # priority of the endpoints, live and essential requests are never refused. The weekly season refresh is
+    # essential, it finishes the played match days and schedules the next ones
+    endpoint_priorities = {
+        'date':         'live',
+        'past_date':    'essential',
+        'event':        'live',
+        'lineups':      'live',
+        'player_stats': 'background',
+        'season':       'essential',
+    }
+
+    # background requests are refused above these usage and projected usage thresholds
+    background_usage = 0.85
+    background_projected_usage = 1.0
+
+    # alert thresholds of the usage
+    alert_usages = (0.95, 0.85)
+
+    def __init__(self, requests_per_match=40, background_per_day=10):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class QuotaManager')
+
+        # estimated requests for one match and for the background requests of one day
+        self.requests_per_match = requests_per_match
+        self.background_per_day = background_per_day
+
+        self.lock = Lock()
+
+        self.count = 0
+        self.limit = None
+        self.period_end = None
+        self.last_reconcile_ts = None
+
+        # local counters since the start of the application
+        self.counters = {'live': 0, 'essential': 0, 'background': 0, 'refused': 0}
+
+        # kickoff timestamps of the scheduled matches
+        self.schedule = list()
+
+        self.last_alert = None
+
+    def configure(self, options):
+        """ configures the estimates from the options of the quota section in the configuration file
+
+        :param options: dict with 'requests_per_match' and 'background_per_day'
+        """
+        for option, value in options.items():
+            if option in ('requests_per_match', 'background_per_day'):
+                setattr(self, option, int(value))
+            else:
+                self.logger.error("Invalid quota option {}".format(option))
+
+    def priority(self, endpoint):
+        """ get the priority of an endpoint
+
+        :param endpoint: endpoint name, e.g. 'lineups'
+
+        :return: 'live', 'essential' or 'background'
+        """
+        return QuotaManager.endpoint_priorities.get(endpoint, 'background')
+
+    def record(self, priority):
+        """ counts a sent request
+
+        :param priority: 'live', 'essential' or 'background'
+        """
+        with self.lock:
+            self.count += 1
+            self.counters[priority] = self.counters.get(priority, 0) + 1
+
+    def reconcile(self, account, now=None):
+        """ reconciles the local count with the ScraperAPI account info
+
+        :param account: account dict with 'requestCount', 'requestLimit' and 'subscriptionDate'
+        :param now: current timestamp
+        """
+        if not (('requestCount' in account) and account.get('requestLimit')):
+            self.logger.error("Could not reconcile the quota with the scraper account info")
+            return
+
+        now = time() if now is None else now
+        with self.lock:
+            self.count = account['requestCount']
+            self.limit = account['requestLimit']
+            self.period_end = self.billing_period_end(subscription_date=account.get('subscriptionDate'), now=now)
+            self.last_reconcile_ts = now
+
+    def set_schedule(self, timestamps):
+        """ sets the kickoff timestamps of the scheduled matches
+
+        :param timestamps: list with kickoff timestamps
+        """
+        with self.lock:
+            self.schedule = sorted(timestamps)
+
+    def usage(self):
+        """ get the current usage of the quota
+
+        :return: usage between 0 and 1, 0 if the limit is unknown
+        """
+        with self.lock:
+            return (self.count / self.limit) if self.limit else 0.0
+
+    def projection(self, now=None):
+        """ projects the request count at the end of the billing period
+
+        :param now: current timestamp
+
+        :return: projected request count, None if the billing period is unknown
+        """
+        now = time() if now is None else now
+        with self.lock:
+            if self.period_end is None:
+                return None
+            remaining_matches = sum(1 for ts in self.schedule if now <= ts < self.period_end)
+            remaining_days = max(self.period_end - now, 0) / 86400
+            return int(self.count + remaining_matches * self.requests_per_match + remaining_days * self.background_per_day)
+
+    def projected_usage(self, now=None):
+        """ get the projected usage at the end of the billing period
+
+        :param now: current timestamp
+
+        :return: projected usage, 0 if the limit is unknown
+        """
+        projection = self.projection(now=now)
+        if (projection is None) or (not self.limit):
+            return 0.0
+        return projection / self.limit
+
+    def allow(self, priority, now=None):
+        """ checks if a request with the priority can be sent
+
+        :param priority: 'live', 'essential' or 'background'
+        :param now: current timestamp
+
+        :return: True if the request can be sent, else False
+        """
+        if priority != 'background':
+            return True
+
+        if (self.usage() < QuotaManager.background_usage) and \
+                (self.projected_usage(now=now) < QuotaManager.background_projected_usage):
+            return True
+
+        with self.lock:
+            self.counters['refused'] += 1
+        return False
+
+    def alert(self, now=None):
+        """ get an alert message if the usage or the projection has reached a new threshold
+
+        :param now: current timestamp
+
+        :return: alert message, None if no new threshold is reached
+        """
+        usage = self.usage()
+        projected_usage = self.projected_usage(now=now)
+
+        level = None
+        for threshold in QuotaManager.alert_usages:
+            if usage >= threshold:
+                level = 'usage {}'.format(threshold)
+                break
+        if (level is None) and (projected_usage >= 1.0):
+            level = 'projected'
+
+        if level == self.last_alert:
+            return None
+        self.last_alert = level
+        if level is None:
+            return None
+
+        period_end = datetime.datetime.fromtimestamp(self.period_end).strftime('%Y-%m-%d') if self.period_end else '-'
+        return "ScraperAPI quota: {} of {} requests used ({:.0%}), projected {:.0%} until {}. Background requests are " \
+               "paused and the polling intervals are stretched".format(self.count, self.limit, usage, projected_usage,
+                                                                       period_end)
+
+    def stats(self):
+        """ get the quota counters
+
+        :return: dict with count, limit, live, essential, background and refused requests
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats['count'] = self.count
+            stats['limit'] = self.limit
+        return stats
+
+    @staticmethod
+    def billing_period_end(subscription_date, now):
+        """ get the end of the monthly billing period which renews on the day of the subscription date
+
+        :param subscription_date: iso date string: "2020-01-10T09:49:26.000Z", None for calendar months
+        :param now: current timestamp
+
+        :return: timestamp of the end of the billing period
+        """
+        now_dt = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc)
+        try:
+            renewal = datetime.datetime.strptime(subscription_date[:19], '%Y-%m-%dT%H:%M:%S')
+        except (TypeError, ValueError):
+            renewal = datetime.datetime(2000, 1, 1)
+
+        # renew on the same day every month, days after the 28th renew on the 28th
+        year, month = now_dt.year, now_dt.month
+        end = now_dt.replace(day=min(renewal.day, 28), hour=renewal.hour, minute=renewal.minute, second=renewal.second,
+                             microsecond=0)
+        if end <= now_dt:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            end = end.replace(year=year, month=month)
+
+        return end.timestamp()
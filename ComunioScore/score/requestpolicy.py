@@ -0,0 +1,219 @@
+import random
+import asyncio
+import logging
+from time import time, sleep
+from threading import Lock
+from ComunioScore.exceptions import SofascoreRequestError, SofascoreCircuitOpenError
+
+
+class CircuitBreaker:
+    """ class CircuitBreaker to stop requests to a degraded upstream after consecutive failures
+
+    the breaker opens after failure_threshold consecutive failures and rejects all requests. After reset_timeout one
+    probe request is let through, a success closes the breaker and a failure opens it again
+
+    USAGE:
+            breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60)
+            if breaker.allow():
+                breaker.record_success()
+
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class CircuitBreaker')
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.lock = Lock()
+
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_ts = None
+
+    def allow(self, now=None):
+        """ checks if a request can be sent
+
+        :param now: current timestamp
+
+        :return: True if the breaker is closed or a probe request is due, else False
+        """
+        now = time() if now is None else now
+        with self.lock:
+            if self.state == 'closed':
+                return True
+
+            # let one probe request through every reset_timeout
+            if (now - self.opened_ts) >= self.reset_timeout:
+                self.state = 'half_open'
+                self.opened_ts = now
+                return True
+            return False
+
+    def record_success(self):
+        """ closes the breaker after a successful request
+
+        """
+        with self.lock:
+            if self.state != 'closed':
+                self.logger.info("Circuit breaker closed, upstream recovered")
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self, now=None):
+        """ counts a failed request and opens the breaker after failure_threshold consecutive failures
+
+        :param now: current timestamp
+        """
+        now = time() if now is None else now
+        with self.lock:
+            self.failures += 1
+            if (self.state == 'half_open') or ((self.state == 'closed') and (self.failures >= self.failure_threshold)):
+                self.logger.error("Circuit breaker opened after {} consecutive failures".format(self.failures))
+                self.state = 'open'
+                self.opened_ts = now
+
+
+class RequestPolicy:
+    """ class RequestPolicy to send requests with bounded retries, jittered exponential backoff and a circuit breaker
+
+    the request function raises SofascoreRequestError on an upstream failure, which is retried after a random backoff
+    between 0 and backoff_base * 2 ** attempt seconds. All other results and exceptions are passed to the caller
+
+    USAGE:
+            policy = RequestPolicy(retries=2, timeout=30)
+            policy.call(func=lambda timeout: scraper.get(url=url, timeout=timeout))
+            policy.stats()
+
+    """
+    def __init__(self, retries=2, backoff_base=0.5, backoff_max=8, timeout=30, failure_threshold=5, reset_timeout=60):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class RequestPolicy')
+
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+
+        self.lock = Lock()
+        self.counters = {'retries': 0, 'failures': 0, 'rejected': 0}
+
+    def configure(self, options):
+        """ configures the policy from the options of the request section in the configuration file
+
+        :param options: dict with 'retries', 'backoff_base', 'backoff_max', 'timeout', 'failure_threshold' and
+                        'reset_timeout'
+        """
+        for option, value in options.items():
+            if option == 'retries':
+                self.retries = int(value)
+            elif option in ('backoff_base', 'backoff_max', 'timeout'):
+                setattr(self, option, float(value))
+            elif option == 'failure_threshold':
+                self.breaker.failure_threshold = int(value)
+            elif option == 'reset_timeout':
+                self.breaker.reset_timeout = float(value)
+            else:
+                self.logger.error("Invalid request option {}".format(option))
+
+    def backoff(self, attempt):
+        """ get the jittered backoff before the next attempt
+
+        :param attempt: number of the failed attempt, starting with 0
+
+        :return: seconds to wait
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, func, wait=sleep):
+        """ calls the request function with retries as long as the circuit breaker is closed
+
+        :param func: request function with the parameter timeout
+        :param wait: function to wait the backoff seconds
+
+        :return: result of the function
+        """
+        last_error = None
+        for attempt in range(self.retries + 1):
+            self.__admit(last_error=last_error)
+            try:
+                result = func(timeout=self.timeout)
+            except SofascoreRequestError as ex:
+                last_error = ex
+                backoff = self.__failure(error=ex, attempt=attempt)
+                if backoff is not None:
+                    wait(backoff)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+        raise last_error
+
+    async def call_async(self, func):
+        """ awaits the request coroutine function with retries as long as the circuit breaker is closed
+
+        :param func: request coroutine function with the parameter timeout
+
+        :return: result of the coroutine
+        """
+        last_error = None
+        for attempt in range(self.retries + 1):
+            self.__admit(last_error=last_error)
+            try:
+                result = await func(timeout=self.timeout)
+            except SofascoreRequestError as ex:
+                last_error = ex
+                backoff = self.__failure(error=ex, attempt=attempt)
+                if backoff is not None:
+                    await asyncio.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+        raise last_error
+
+    def __admit(self, last_error):
+        """ raises an error if the circuit breaker rejects the next attempt
+
+        :param last_error: error of the previous attempt, None for the first attempt
+        """
+        if not self.breaker.allow():
+            with self.lock:
+                self.counters['rejected'] += 1
+            if last_error is not None:
+                raise last_error
+            raise SofascoreCircuitOpenError("Sofascore requests are paused after consecutive failures")
+
+    def __failure(self, error, attempt):
+        """ counts a failed attempt
+
+        :param error: error of the attempt
+        :param attempt: number of the failed attempt, starting with 0
+
+        :return: seconds to wait before the next attempt, None if no attempt is left or the breaker has opened
+        """
+        self.breaker.record_failure()
+        with self.lock:
+            self.counters['failures'] += 1
+        if (attempt >= self.retries) or (self.breaker.state == 'open'):
+            return None
+
+        backoff = self.backoff(attempt=attempt)
+        self.logger.error("{}, retry in {:.1f} seconds".format(error, backoff))
+        with self.lock:
+            self.counters['retries'] += 1
+        return backoff
+
+    def stats(self):
+        """ get the counters of the policy
+
+        :return: dict with retries, failures, rejected and the state of the circuit breaker
+        """
+        with self.lock:
+            stats = dict(self.counters)
+        stats['state'] = self.breaker.state
+        return stats
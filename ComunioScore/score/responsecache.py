@@ -0,0 +1,250 @@
+import os
+import json
+import logging
+import hashlib
+from time import time
+from threading import Lock, get_ident
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """ class ResponseCache to cache the sofascore json responses with a time to live per endpoint
+
+    responses are kept in a memory LRU and optionally in a cache directory to survive restarts. Expired responses with
+    an ETag are kept to revalidate them with a conditional request
+
+    USAGE:
+            cache = ResponseCache(max_entries=256, cache_dir='/var/cache/comunioscore')
+            cache.store(endpoint='season', url=url, data=data, etag='"5d8f"')
+            cache.lookup(endpoint='season', url=url)
+            cache.stats()
+
+    """
+    # default time to live in seconds for each endpoint, 0 disables the cache for live data like the match status of
+    # the date feed of today. The date feed of past dates does not change anymore
+    default_ttls = {
+        'date':         0,
+        'past_date':    7 * 24 * 3600,
+        'event':        0,
+        'lineups':      0,
+        'player_stats': 300,
+        'season':       6 * 3600,
+    }
+
+    # endpoints without time to live keep their last good response in memory as fallback for failed requests
+    last_good_endpoints = ('date', 'event', 'lineups')
+
+    def __init__(self, max_entries=256, cache_dir=None, ttls=None):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class ResponseCache')
+
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+
+        self.ttls = dict(ResponseCache.default_ttls)
+        if ttls is not None:
+            self.set_ttls(ttls=ttls)
+
+        self.lock = Lock()
+
+        # {url: (timestamp, etag, data)} in least recently used order
+        self.entries = OrderedDict()
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'revalidated': 0}
+
+    def configure(self, options):
+        """ configures the cache from the options of the cache section in the configuration file
+
+        :param options: dict with 'dir', 'size' and the time to live of the endpoints
+        """
+        options = dict(options)
+        if 'dir' in options:
+            self.cache_dir = options.pop('dir') or None
+        if 'size' in options:
+            self.max_entries = int(options.pop('size'))
+        self.set_ttls(ttls=options)
+
+    def set_ttls(self, ttls):
+        """ sets the time to live for the given endpoints
+
+        :param ttls: dict with endpoint as key and seconds as value
+        """
+        for endpoint, ttl in ttls.items():
+            if endpoint in self.ttls:
+                self.ttls[endpoint] = int(ttl)
+            else:
+                self.logger.error("Invalid cache endpoint {}".format(endpoint))
+
+    def ttl(self, endpoint):
+        """ get the time to live of an endpoint
+
+        :param endpoint: endpoint name, e.g. 'season'
+
+        :return: time to live in seconds, 0 if the endpoint is not cached
+        """
+        return self.ttls.get(endpoint, 0)
+
+    def lookup(self, endpoint, url, now=None):
+        """ looks up the response of an url in memory and in the cache directory
+
+        :param endpoint: endpoint name of the url
+        :param url: requested url
+        :param now: current timestamp
+
+        :return: tuple (data, etag, is_fresh), None if the url is not cached
+        """
+        ttl = self.ttl(endpoint=endpoint)
+        if ttl <= 0:
+            return None
+        now = time() if now is None else now
+
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                self.entries.move_to_end(url)
+
+        is_disk_entry = False
+        if (entry is None) and (self.cache_dir is not None):
+            entry = self.__read_disk(url=url)
+            if entry is not None:
+                is_disk_entry = True
+                self.__insert(url=url, entry=entry)
+
+        with self.lock:
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+
+            timestamp, etag, data = entry
+            is_fresh = (now - timestamp) < ttl
+            if is_fresh:
+                self.counters['disk_hits' if is_disk_entry else 'hits'] += 1
+            else:
+                self.counters['misses'] += 1
+
+        return data, etag, is_fresh
+
+    def store(self, endpoint, url, data, etag=None, now=None):
+        """ stores the response of an url if its endpoint is cached or keeps its last good response
+
+        :param endpoint: endpoint name of the url
+        :param url: requested url
+        :param data: json dict of the response
+        :param etag: ETag header of the response
+        :param now: current timestamp
+        """
+        entry = (time() if now is None else now, etag, data)
+        if self.ttl(endpoint=endpoint) <= 0:
+            if endpoint in ResponseCache.last_good_endpoints:
+                self.__insert(url=url, entry=entry)
+            return
+
+        self.__insert(url=url, entry=entry)
+        if self.cache_dir is not None:
+            self.__write_disk(url=url, entry=entry)
+
+    def last_good(self, url):
+        """ get the last good response of an url regardless of its time to live
+
+        :param url: requested url
+
+        :return: json dict of the last response, None if the url is not cached
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+        return entry[2] if entry is not None else None
+
+    def revalidate(self, url, now=None):
+        """ marks the cached response of an url as fresh after a not modified response
+
+        :param url: requested url
+        :param now: current timestamp
+
+        :return: json dict of the cached response, None if the url is not cached
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            entry = (time() if now is None else now, entry[1], entry[2])
+            self.entries[url] = entry
+            self.counters['revalidated'] += 1
+
+        if self.cache_dir is not None:
+            self.__write_disk(url=url, entry=entry)
+        return entry[2]
+
+    def stats(self):
+        """ get the cache counters
+
+        :return: dict with hits, disk_hits, misses, revalidated and entries
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self.entries)
+        return stats
+
+    def clear(self):
+        """ clears the memory entries and the counters, the cache directory is kept
+
+        """
+        with self.lock:
+            self.entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def __insert(self, url, entry):
+        """ inserts an entry into the memory LRU and evicts the least recently used entries
+
+        :param url: requested url
+        :param entry: tuple (timestamp, etag, data)
+        """
+        with self.lock:
+            self.entries[url] = entry
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __path(self, url):
+        """ get the cache file of an url
+
+        :param url: requested url
+
+        :return: file path
+        """
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def __read_disk(self, url):
+        """ reads the entry of an url from the cache directory
+
+        :param url: requested url
+
+        :return: tuple (timestamp, etag, data), None if no valid cache file exists
+        """
+        try:
+            with open(self.__path(url=url), encoding='utf-8') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as ex:
+            self.logger.error("Could not read cache file for {}: {}".format(url, ex))
+            return None
+
+        if cached.get('url') != url:
+            return None
+        return cached['timestamp'], cached.get('etag'), cached['data']
+
+    def __write_disk(self, url, entry):
+        """ writes the entry of an url atomically into the cache directory
+
+        :param url: requested url
+        :param entry: tuple (timestamp, etag, data)
+        """
+        path = self.__path(url=url)
+        tmp_path = "{}.{}.{}.tmp".format(path, os.getpid(), get_ident())
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'timestamp': entry[0], 'etag': entry[1], 'data': entry[2]}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as ex:
+            self.logger.error("Could not write cache file for {}: {}".format(url, ex))
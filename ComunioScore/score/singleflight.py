@@ -0,0 +1,141 @@
+import logging
+import asyncio
+from threading import Lock, Event
+
+
+class Call:
+    """ class Call to hold the result of one in-flight request for all waiting threads
+
+    USAGE:
+            call = Call()
+            call.event.wait()
+            call.result
+
+    """
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """ class SingleFlight to coalesce concurrent identical requests into one call
+
+    the first thread calls the function, threads with the same key wait for its result instead of calling the function
+    themselves. Exceptions of the call are raised in all waiting threads. Coroutines share the in-flight calls with the
+    threads, a waiting coroutine waits in the executor of the event loop
+
+    USAGE:
+            singleflight = SingleFlight()
+            singleflight.do(key=url, func=lambda: scraper.get(url=url).json())
+            await singleflight.do_async(key=url, func=fetch_coroutine_function)
+            singleflight.stats()
+
+    """
+    def __init__(self):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class SingleFlight')
+
+        self.lock = Lock()
+
+        # in-flight calls with the key as key
+        self.calls = dict()
+        self.counters = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key, func):
+        """ calls the function once for all concurrent callers with the same key
+
+        :param key: key of the request, e.g. the url
+        :param func: function without arguments
+
+        :return: result of the function
+        """
+        call, is_leader = self.__join(key=key)
+
+        if not is_leader:
+            call.event.wait()
+            return self.__result(call=call)
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as ex:
+            call.error = ex
+            raise
+        finally:
+            self.__finish(key=key, call=call)
+
+    async def do_async(self, key, func):
+        """ awaits the coroutine function once for all concurrent callers with the same key
+
+        :param key: key of the request, e.g. the url
+        :param func: coroutine function without arguments
+
+        :return: result of the coroutine
+        """
+        call, is_leader = self.__join(key=key)
+
+        if not is_leader:
+            await asyncio.get_event_loop().run_in_executor(None, call.event.wait)
+            return self.__result(call=call)
+
+        try:
+            call.result = await func()
+            return call.result
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            self.__finish(key=key, call=call)
+
+    def __join(self, key):
+        """ joins the in-flight call of the key or starts a new call
+
+        :param key: key of the request
+
+        :return: tuple (call, True if the caller must perform the call)
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = Call()
+                self.calls[key] = call
+                self.counters['calls'] += 1
+                return call, True
+
+            call.waiters += 1
+            self.counters['coalesced'] += 1
+            return call, False
+
+    def __finish(self, key, call):
+        """ removes the finished call and wakes up the waiting callers
+
+        :param key: key of the request
+        :param call: finished call
+        """
+        with self.lock:
+            self.calls.pop(key, None)
+        call.event.set()
+
+    @staticmethod
+    def __result(call):
+        """ get the result of a finished call
+
+        :param call: finished call
+
+        :return: result of the call, the exception of the call is raised
+        """
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """ get the counters of the performed and the coalesced calls
+
+        :return: dict with calls and coalesced
+        """
+        with self.lock:
+            return dict(self.counters)
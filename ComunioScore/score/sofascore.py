@@ -1,8 +1,14 @@
 import logging
+import datetime
 import requests
+from functools import partial
 
 from scraper_api import ScraperAPIClient
-from ComunioScore.exceptions import SofascoreRequestError
+from ComunioScore.score.responsecache import ResponseCache
+from ComunioScore.score.singleflight import SingleFlight
+from ComunioScore.score.quotamanager import QuotaManager
+from ComunioScore.score.requestpolicy import RequestPolicy
+from ComunioScore.exceptions import SofascoreRequestError, SofascoreQuotaError
 
 
 class SofaScore:
@@ -12,10 +18,17 @@ class SofaScore:
             sofascore = SofaScore()
             sofascore.init_scraper(api_key=api_key)
             sofascore.get_date_data(date="2019-09-22")
+            SofaScore.get_cache_stats()
 
     """
     scraper = None
 
+    # response cache, coalescing of concurrent identical requests, ScraperAPI quota and retry policy shared by all instances
+    cache = ResponseCache()
+    singleflight = SingleFlight()
+    quota = QuotaManager()
+    policy = RequestPolicy()
+
     def __init__(self):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class SofaScore')
@@ -53,36 +66,189 @@ class SofaScore:
         # create the ScraperAPIClient
         cls.scraper = ScraperAPIClient(api_key)
 
+    @classmethod
+    def init_cache(cls, options):
+        """ configures the response cache
+
+        :param options: dict with 'dir', 'size' and the time to live of the endpoints
+        """
+        try:
+            cls.cache.configure(options=options)
+        except ValueError as ex:
+            logging.getLogger('ComunioScore').error("Invalid cache option: {}".format(ex))
+
+    @classmethod
+    def get_cache_stats(cls):
+        """ get the counters of the response cache
+
+        :return: dict with hits, disk_hits, misses, revalidated and entries
+        """
+        return cls.cache.stats()
+
+    @classmethod
+    def get_singleflight_stats(cls):
+        """ get the counters of the performed and the coalesced requests
+
+        :return: dict with calls and coalesced
+        """
+        return cls.singleflight.stats()
+
+    @classmethod
+    def init_quota(cls, options):
+        """ configures the estimates of the quota projection
+
+        :param options: dict with 'requests_per_match' and 'background_per_day'
+        """
+        try:
+            cls.quota.configure(options=options)
+        except ValueError as ex:
+            logging.getLogger('ComunioScore').error("Invalid quota option: {}".format(ex))
+
+    @classmethod
+    def set_quota_schedule(cls, timestamps):
+        """ sets the kickoff timestamps of the scheduled matches for the quota projection
+
+        :param timestamps: list with kickoff timestamps
+        """
+        cls.quota.set_schedule(timestamps=timestamps)
+
+    @classmethod
+    def get_quota_stats(cls):
+        """ get the counters of the ScraperAPI quota
+
+        :return: dict with count, limit, live, essential, background and refused requests
+        """
+        return cls.quota.stats()
+
+    @classmethod
+    def init_policy(cls, options):
+        """ configures the retries, backoff, timeout and circuit breaker of the requests
+
+        :param options: dict with the options of the request section
+        """
+        try:
+            cls.policy.configure(options=options)
+        except ValueError as ex:
+            logging.getLogger('ComunioScore').error("Invalid request option: {}".format(ex))
+
+    @classmethod
+    def get_policy_stats(cls):
+        """ get the counters of the retries and the state of the circuit breaker
+
+        :return: dict with retries, failures, rejected and state
+        """
+        return cls.policy.stats()
+
     @classmethod
     def get_scraper_requests(cls):
-        """ get scraper account infos like number of requests
+        """ get scraper account infos like number of requests, the quota is reconciled with the account infos
 
-        :return: json dict
+        :return: json dict with the additional 'projectedCount' at the end of the billing period
         """
         try:
-            return cls.scraper.account()
+            account = cls.scraper.account()
         except Exception as ex:
             logging.getLogger('ComunioScore').error(ex)
             return {}
 
-    def __request_api(self, url):
-        """ request data from sofascore url
+        cls.quota.reconcile(account=account)
+        projection = cls.quota.projection()
+        if projection is not None:
+            account['projectedCount'] = projection
+        return account
+
+    def __request_api(self, url, endpoint=None):
+        """ request data from sofascore url, fresh cached responses are returned without a request and concurrent
+            requests of the same url are sent only once
 
         :param url: specific url depending on requested data
+        :param endpoint: endpoint name for the time to live of the response cache
 
         :return: json dict
         """
+        cached = SofaScore.cache.lookup(endpoint=endpoint, url=url)
+        if (cached is not None) and cached[2]:
+            return cached[0]
+
+        # player stats requests are refused if the quota runs low, an expired response is better than none
+        if not SofaScore.quota.allow(priority=SofaScore.quota.priority(endpoint=endpoint)):
+            if cached is not None:
+                self.logger.error("ScraperAPI quota is low, use the expired response of {}".format(url))
+                return cached[0]
+            raise SofascoreQuotaError("ScraperAPI quota is low, request of {} refused".format(url))
+
+        return SofaScore.singleflight.do(key=url, func=partial(self.__fetch, url=url, endpoint=endpoint, cached=cached))
+
+    def __fetch(self, url, endpoint, cached):
+        """ sends the request with retries and serves the last good response if the upstream is degraded
+
+        :param url: specific url depending on requested data
+        :param endpoint: endpoint name for the time to live of the response cache
+        :param cached: expired cache entry (data, etag, is_fresh), None if the url is not cached
+
+        :return: json dict, empty dict if the request failed and no previous response exists
+        """
+        if SofaScore.scraper is None:
+            raise SofascoreRequestError("Sofascore scraper client is not initalized! Please call first init_scraper(api_key='')")
+
+        # revalidate an expired response with its ETag
+        headers = {'If-None-Match': cached[1]} if (cached is not None) and cached[1] else {}
+
         try:
-            if SofaScore.scraper is not None:
-                return SofaScore.scraper.get(url=url).json()
-            else:
-                raise SofascoreRequestError("Sofascore scraper client is not initalized! Please call first init_scraper(api_key='')")
-        except requests.exceptions.RequestException as ex:
+            return SofaScore.policy.call(func=partial(self.__send, url=url, endpoint=endpoint, headers=headers,
+                                                      cached=cached))
+        except SofascoreRequestError as ex:
             self.logger.error("Could not retrieve data from Sofascore: {}".format(ex))
-            return {}
+
+        last_good = cached[0] if cached is not None else SofaScore.cache.last_good(url=url)
+        if last_good is not None:
+            self.logger.error("Use the last good response of {}".format(url))
+            return last_good
+        return {}
+
+    def __send(self, url, endpoint, headers, cached, timeout):
+        """ sends one request with ScraperAPI and stores the response in the cache
+
+        :param url: specific url depending on requested data
+        :param endpoint: endpoint name for the time to live of the response cache
+        :param headers: request headers
+        :param cached: expired cache entry (data, etag, is_fresh), None if the url is not cached
+        :param timeout: request timeout in seconds
+
+        :return: json dict
+        """
+        SofaScore.quota.record(priority=SofaScore.quota.priority(endpoint=endpoint))
+        try:
+            # the retries are done by the request policy
+            response = SofaScore.scraper.get(url=url, headers=headers, retry=0, timeout=timeout)
+        except requests.exceptions.RequestException as ex:
+            raise SofascoreRequestError(ex)
+
+        if (response.status_code == 429) or (response.status_code >= 500):
+            raise SofascoreRequestError("Status code {} for {}".format(response.status_code, url))
+
+        if (response.status_code == 304) and (cached is not None):
+            # the entry can be evicted since the lookup, the expired response of the lookup is still valid
+            data = SofaScore.cache.revalidate(url=url)
+            return cached[0] if data is None else data
+
+        try:
+            data = response.json()
         except ValueError as ex:
-            self.logger.error(ex)
-            return {}
+            raise SofascoreRequestError("Invalid json for {}: {}".format(url, ex))
+
+        if data:
+            SofaScore.cache.store(endpoint=endpoint, url=url, data=data, etag=response.headers.get('ETag'))
+        return data
+
+    @staticmethod
+    def date_endpoint(date):
+        """ get the cache endpoint of the date feed, the feed of past dates is cached and the live feed is not
+
+        :param date: date string: "2019-09-22"
+        :return: 'past_date' for dates before today, else 'date'
+        """
+        return 'past_date' if date < datetime.date.today().strftime('%Y-%m-%d') else 'date'
 
     def get_date_data(self, date):
         """ get data from given date
@@ -94,7 +260,7 @@ class SofaScore:
         # create correct url
         date_url = self.date_url.format(date=date)
 
-        return self.__request_api(url=date_url)
+        return self.__request_api(url=date_url, endpoint=self.date_endpoint(date=date))
 
     def get_match_data(self, match_id):
         """ get data from given match id
@@ -106,7 +272,7 @@ class SofaScore:
         # create correct url
         match_url = self.event_url.format(event_id=match_id)
 
-        return self.__request_api(url=match_url)
+        return self.__request_api(url=match_url, endpoint='event')
 
     def get_lineups_match(self, match_id):
         """ get squad lineups for given match id
@@ -117,7 +283,7 @@ class SofaScore:
         # create correct url
         lineups_url = self.lineups_url.format(event_id=match_id)
 
-        return self.__request_api(url=lineups_url)
+        return self.__request_api(url=lineups_url, endpoint='lineups')
 
     def get_player_stats(self, match_id, player_id):
         """ get stats from given player and match
@@ -129,7 +295,7 @@ class SofaScore:
         # create correct url
         player_stats_url = self.player_stats_url.format(event_id=match_id, player_id=player_id)
 
-        return self.__request_api(url=player_stats_url)
+        return self.__request_api(url=player_stats_url, endpoint='player_stats')
 
     def get_season(self, season_id):
         """ get season data from given season_id
@@ -140,6 +306,6 @@ class SofaScore:
         # create correct url
         season_url = self.season_url.format(season_id=season_id)
 
-        return self.__request_api(url=season_url)
+        return self.__request_api(url=season_url, endpoint='season')
 
 
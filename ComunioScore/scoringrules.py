@@ -0,0 +1,163 @@
+import json
+import logging
+
+from ComunioScore.pointcalculator import PointCalculator
+from ComunioScore.exceptions import ScoringRulesError
+
+
+class ScoringRules:
+    """ class ScoringRules to hold the compiled PointCalculator of each scoring rule set
+
+    USAGE:
+            scoringrules = ScoringRules()
+            scoringrules.add_rule_set(name='nopenalty', rules={'penalty': 0})
+            scoringrules.set_community(community='Bundesliga Kickers', name='nopenalty')
+            scoringrules.get(community='Bundesliga Kickers')
+
+    """
+    # section prefix of the scoring rule sets in the configuration file
+    section_prefix = 'scoring'
+
+    def __init__(self):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class ScoringRules')
+
+        # compiled point calculators with the rule set name as key
+        self.calculators = {'default': PointCalculator()}
+        self.default_name = 'default'
+
+        # rule set name with the lowercase community name as key
+        self.communities = dict()
+
+    def add_rule_set(self, name, rules):
+        """ compiles a rule set, missing rules are taken from the comunio default rules
+
+        :param name: name of the rule set
+        :param rules: rules dict with the keys of PointCalculator.default_rules
+        """
+        unknown = set(rules) - set(PointCalculator.default_rules)
+        if unknown:
+            raise ScoringRulesError("Unknown rules {} in rule set {}".format(sorted(unknown), name))
+
+        merged = dict(PointCalculator.default_rules)
+        for key in ('goal', 'offs'):
+            merged[key] = dict(PointCalculator.default_rules[key])
+            merged[key].update(rules.get(key, dict()))
+        for key in ('rating', 'max_rating', 'penalty'):
+            if key in rules:
+                merged[key] = rules[key]
+
+        self.logger.info("Add scoring rule set {}".format(name))
+        self.calculators[name] = PointCalculator(rules=merged)
+
+    def set_community(self, community, name):
+        """ selects the rule set for a community
+
+        :param community: community name
+        :param name: name of the rule set
+        """
+        if name not in self.calculators:
+            raise ScoringRulesError("Unknown rule set {} for community {}".format(name, community))
+
+        self.communities[community.lower()] = name
+
+    def set_default(self, name):
+        """ selects the rule set for all communities without an own rule set
+
+        :param name: name of the rule set
+        """
+        if name not in self.calculators:
+            raise ScoringRulesError("Unknown default rule set {}".format(name))
+
+        self.default_name = name
+
+    def get(self, community=None):
+        """ get the point calculator for the community
+
+        :param community: community name, None for the default rule set
+
+        :return: PointCalculator instance
+        """
+        if community is not None:
+            name = self.communities.get(community.lower(), self.default_name)
+        else:
+            name = self.default_name
+
+        return self.calculators[name]
+
+    def load_json(self, path):
+        """ loads rule sets from a json file: {"name": {"penalty": 0, "offs": {"red": -8}}}
+
+        :param path: path to the json file
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                rule_sets = json.load(f)
+        except (OSError, ValueError) as ex:
+            raise ScoringRulesError("Could not load scoring rules from {}: {}".format(path, ex))
+
+        for name, rules in rule_sets.items():
+            self.add_rule_set(name=name, rules=rules)
+
+    def load_config(self, sections):
+        """ loads the rule sets from the scoring sections of the configuration file
+
+        [scoring]
+        file = /etc/comunioscore/scoring.json
+        default = nopenalty
+        bundesliga kickers = classic
+
+        [scoring classic]
+        rating = 0.0:-8, 4.7:-7, 5.0:-6
+        keeper = 6
+        penalty = 3
+        red = -6
+
+        :param sections: dict with section name as key and dict of options as value
+        """
+        # named rule sets first, the main section refers to them
+        for section, options in sections.items():
+            if section.startswith(ScoringRules.section_prefix + ' '):
+                name = section[len(ScoringRules.section_prefix) + 1:].strip()
+                self.add_rule_set(name=name, rules=self.parse_options(options=options))
+
+        options = dict(sections.get(ScoringRules.section_prefix, dict()))
+        if 'file' in options:
+            self.load_json(path=options.pop('file'))
+        if 'default' in options:
+            self.set_default(name=options.pop('default'))
+        for community, name in options.items():
+            self.set_community(community=community, name=name)
+
+    @staticmethod
+    def parse_options(options):
+        """ parses the options of a scoring rule set section
+
+        :param options: dict with option as key and string value
+
+        :return: rules dict
+        """
+        rules = dict()
+
+        try:
+            for option, value in options.items():
+                if option == 'rating':
+                    bands = list()
+                    for band in value.split(','):
+                        lower, points = band.split(':')
+                        bands.append((float(lower), int(points)))
+                    rules['rating'] = bands
+                elif option == 'max_rating':
+                    rules['max_rating'] = float(value)
+                elif option == 'penalty':
+                    rules['penalty'] = int(value)
+                elif option in PointCalculator.default_rules['goal']:
+                    rules.setdefault('goal', dict())[option] = int(value)
+                elif option in PointCalculator.default_rules['offs']:
+                    rules.setdefault('offs', dict())[option] = int(value)
+                else:
+                    raise ScoringRulesError("Unknown scoring option {}".format(option))
+        except ValueError as ex:
+            raise ScoringRulesError("Invalid scoring option: {}".format(ex))
+
+        return rules
@@ -16,7 +16,7 @@ class SofascoreDB(DBHandler, Thread):
             sofascoredb.start()
 
     """
-    def __init__(self, update_season_frequence=604800, query_match_data_frequence=28800, scraper_requests_frequence=43200, **dbparams):
+    def __init__(self, update_season_frequence=604800, query_match_data_frequence=28800, scraper_requests_frequence=10800, **dbparams):
         self.logger = logging.getLogger('ComunioScore')
         self.logger.info('Create class SofascoreDB')
 
@@ -27,13 +27,14 @@ class SofascoreDB(DBHandler, Thread):
         # attributes for the update frequence
         self.update_season_frequence = update_season_frequence        # 604800 seconds (once in a week)
         self.query_match_data_frequence = query_match_data_frequence  # 28800 seconds (8h)
-        self.scraper_requests_frequence = scraper_requests_frequence  # 43200 seconds (12h)
+        self.scraper_requests_frequence = scraper_requests_frequence  # 10800 seconds (3h)
 
         self.running = True
 
         # event handler
         self.matchscheduler_event_handler = None
         self.comunio_user_data_event_handler = None
+        self.quota_alert_event_handler = None
 
         # counters set to zero
         self.update_season_counter = 0
@@ -92,6 +93,21 @@ class SofascoreDB(DBHandler, Thread):
         """
         self.comunio_user_data_event_handler = func
 
+    def register_quota_alert_event_handler(self, func):
+        """ register the quota alert event handler function
+
+        :param func: event handler function with the parameter text
+        """
+        self.quota_alert_event_handler = func
+
+    def set_quota_schedule(self):
+        """ sets the kickoff timestamps of the not started matches for the quota projection
+
+        """
+        if self.season_data:
+            self.bundesliga.set_quota_schedule(timestamps=[matchday['startTimestamp'] for matchday in self.season_data
+                                                           if matchday['type'] == 'notstarted'])
+
     def insert_season(self):
         """ insert season data into database
 
@@ -115,6 +131,8 @@ class SofascoreDB(DBHandler, Thread):
         except DBInserterError as ex:
             self.logger.error(ex)
 
+        self.set_quota_schedule()
+
     def update_season(self):
         """ updates season data into database
 
@@ -132,6 +150,8 @@ class SofascoreDB(DBHandler, Thread):
         except DBInserterError as ex:
             self.logger.error(ex)
 
+        self.set_quota_schedule()
+
     def delete_season(self):
         """ deletes season data from database
 
@@ -273,15 +293,40 @@ class SofascoreDB(DBHandler, Thread):
             self.logger.error(ex)
 
     def scraper_account_requests(self):
-        """ logs the scraper account requests
+        """ logs the scraper account requests and sends an alert if the quota runs low
 
         """
 
         scraper_requests = self.bundesliga.get_scraper_requests()
-        if ('requestCount' and 'requestLimit') in scraper_requests.keys():
+        if ('requestCount' in scraper_requests) and ('requestLimit' in scraper_requests):
             request_count = scraper_requests['requestCount']
             request_limit = scraper_requests['requestLimit']
-            self.logger.info("Scraper request {} from Limit of {}".format(request_count, request_limit))
+            self.logger.info("Scraper request {} from Limit of {}, projected {} until the end of the billing period"
+                             .format(request_count, request_limit, scraper_requests.get('projectedCount', '-')))
         else:
             self.logger.error("Could not request the ScraperAPIClient account info!")
-        # TODO send telegram msg
+
+        alert = self.bundesliga.quota.alert()
+        if alert is not None:
+            self.logger.error(alert)
+            if self.quota_alert_event_handler:
+                self.quota_alert_event_handler(text=alert)
+
+        quota_stats = self.bundesliga.get_quota_stats()
+        self.logger.info("Scraper requests since start: {} live, {} essential, {} background, {} refused"
+                         .format(quota_stats['live'], quota_stats['essential'], quota_stats['background'],
+                                 quota_stats['refused']))
+
+        policy_stats = self.bundesliga.get_policy_stats()
+        self.logger.info("Sofascore request failures: {} failed, {} retried, {} rejected, circuit breaker {}"
+                         .format(policy_stats['failures'], policy_stats['retries'], policy_stats['rejected'],
+                                 policy_stats['state']))
+
+        cache_stats = self.bundesliga.get_cache_stats()
+        self.logger.info("Sofascore response cache: {} hits, {} disk hits, {} misses, {} revalidated, {} entries"
+                         .format(cache_stats['hits'], cache_stats['disk_hits'], cache_stats['misses'],
+                                 cache_stats['revalidated'], cache_stats['entries']))
+
+        singleflight_stats = self.bundesliga.get_singleflight_stats()
+        self.logger.info("Sofascore requests: {} sent, {} coalesced with concurrent identical requests"
+                         .format(singleflight_stats['calls'], singleflight_stats['coalesced']))
@@ -0,0 +1,48 @@
+import logging
+from threading import Lock
+
+
+class SquadCache:
+    """ class SquadCache to share the linedup squads of all comunio users between the livedata threads
+
+    USAGE:
+            squadcache = SquadCache()
+            squadcache.get(match_day=3, loader=livedata.load_linedup_squads)
+            squadcache.invalidate()
+
+    """
+    def __init__(self):
+        self.logger = logging.getLogger('ComunioScore')
+        self.logger.info('Create class SquadCache')
+
+        self.lock = Lock()
+
+        self.match_day = None
+        self.squads = None
+
+        # increases with every load, consumers can detect changed squads
+        self.version = 0
+
+    def get(self, match_day, loader):
+        """ get the linedup squads for the match day, loads them if the cache is empty or invalid
+
+        :param match_day: current match day
+        :param loader: function which returns the squads dict
+
+        :return: dict with userid as key and list of (playername, playerposition, club) as value
+        """
+        with self.lock:
+            if (self.squads is None) or (self.match_day != match_day):
+                self.logger.info("Load linedup squads for match day {}".format(match_day))
+                self.squads = loader()
+                self.match_day = match_day
+                self.version += 1
+            return self.squads
+
+    def invalidate(self):
+        """ invalidates the cached squads
+
+        """
+        with self.lock:
+            self.logger.info("Invalidate linedup squads of match day {}".format(self.match_day))
+            self.squads = None
@@ -31,6 +31,14 @@ class TestDBCreator(unittest.TestCase):
         self.assertIsInstance(self.table_str, str, msg="table creation must be type of string")
         self.assertEqual(self.table_str, "create table if not exists test (id bigint , id2 text )", msg="table creation string is faulty")
 
+    def test_table_composite_key(self):
+
+        table_str = Table("mapping", Column(name="name", type="text", prim_key=True),
+                                     Column(name="club", type="text", prim_key=True),
+                                     Column(name="id", type="bigint")).__repr__()
+        self.assertEqual(table_str, "create table if not exists mapping (name text , club text , id bigint , "
+                                    "primary key (name, club))", msg="composite primary key string is faulty")
+
     def test_column(self):
 
         self.colum_str = Column(name="id", type="bigint").__repr__()
@@ -0,0 +1,155 @@
+import unittest
+from telegram.error import BadRequest, NetworkError, TimedOut
+from ComunioScore.messenger.scoreboard import Scoreboard
+
+
+class MessageStub:
+
+    def __init__(self, message_id):
+        self.message_id = message_id
+
+
+class BotStub:
+
+    def __init__(self):
+        self.calls = list()
+        self.edit_error = None
+        self.send_errors = list()
+
+    def sendMessage(self, chat_id, text, parse_mode=None, timeout=None):
+        if self.send_errors:
+            error = self.send_errors.pop(0)
+            if error is not None:
+                raise error
+        self.calls.append(('send', text))
+        return MessageStub(message_id=len(self.calls))
+
+    def deleteMessage(self, chat_id, message_id, timeout=None):
+        self.calls.append(('delete', message_id))
+
+    def pinChatMessage(self, chat_id, message_id, disable_notification=False):
+        self.calls.append(('pin', message_id))
+
+    def editMessageText(self, chat_id, message_id, text, parse_mode=None, timeout=None):
+        if isinstance(self.edit_error, Exception):
+            raise self.edit_error
+        if self.edit_error is not None:
+            raise BadRequest(self.edit_error)
+        self.calls.append(('edit', message_id, text))
+
+
+class TestScoreboard(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.bot = BotStub()
+        self.scoreboard = Scoreboard(bot=self.bot, chat_id=1)
+        self.scoreboard.update(match_day=3, match_id=10, text='Hertha BSC vs. Freiburg')
+        self.scoreboard.publish()
+
+    def test_send_and_pin(self):
+
+        self.assertEqual(self.bot.calls, [('send', '*Live scores for match day 3*\n\nHertha BSC vs. Freiburg'), ('pin', 1)])
+
+    def test_edit_changed_content(self):
+
+        self.scoreboard.update(match_day=3, match_id=11, text='1. FC Köln vs. Bayern München')
+        self.scoreboard.publish()
+        self.assertEqual(self.bot.calls[-1], ('edit', 1, '*Live scores for match day 3*\n\nHertha BSC vs. Freiburg\n'
+                                                         '1. FC Köln vs. Bayern München'))
+
+    def test_skip_unchanged_content(self):
+
+        self.scoreboard.update(match_day=3, match_id=10, text='Hertha BSC vs. Freiburg')
+        self.scoreboard.publish()
+        self.assertEqual(len(self.bot.calls), 2, msg="unchanged scoreboard must not be edited")
+
+    def test_new_match_day(self):
+
+        self.scoreboard.update(match_day=4, match_id=20, text='RB Leipzig vs. Schalke 04')
+        self.scoreboard.publish()
+        self.assertEqual(self.bot.calls[-2:], [('send', '*Live scores for match day 4*\n\nRB Leipzig vs. Schalke 04'), ('pin', 3)])
+
+    def test_deleted_message(self):
+
+        self.bot.edit_error = 'Message to edit not found'
+        self.scoreboard.update(match_day=3, match_id=10, text='Hertha BSC vs. Freiburg 1:0')
+        self.scoreboard.publish()
+        self.assertEqual(self.bot.calls[-2][0], 'send', msg="a deleted scoreboard must be sent again")
+
+    def test_parse_error(self):
+
+        self.bot.edit_error = "Can't parse entities: can't find end of the entity"
+        self.scoreboard.update(match_day=3, match_id=10, text='Hertha BSC vs. Freiburg 1:0')
+        self.scoreboard.publish()
+        self.assertEqual(len(self.bot.calls), 2, msg="other edit errors must not send a new scoreboard")
+
+    def test_pages(self):
+
+        match_text = "Points rating for *Hertha BSC* vs. *Freiburg*\n" + "\n".join("*user{}*: 5 points".format(i) for i in range(60))
+        for match_id in range(10, 16):
+            self.scoreboard.update(match_day=3, match_id=match_id, text=match_text)
+
+        pages = self.scoreboard.render()
+        self.assertGreater(len(pages), 1, msg="long scoreboard must be split into several pages")
+        self.assertTrue(all(len(page) <= Scoreboard.max_length for page in pages), msg="pages must fit into one message")
+        self.assertEqual(sum(page.count('Points rating') for page in pages), 6, msg="no match must be dropped")
+        self.assertTrue(all(line.count('*') % 2 == 0 for page in pages for line in page.splitlines()),
+                        msg="markdown entities must not be split")
+
+        self.scoreboard.publish()
+        self.assertEqual(self.bot.calls[2][0], 'edit', msg="first page must be edited")
+        self.assertEqual([call[0] for call in self.bot.calls[3:]], ['send'] * (len(pages) - 1),
+                         msg="further pages must be sent as new messages")
+        self.assertEqual(len(self.scoreboard.message_ids), len(pages))
+
+    def long_match_text(self, match_id):
+        return "Points rating for match {}\n".format(match_id) + "\n".join("*user{}*: 5 points".format(i) for i in range(100))
+
+    def test_failed_send(self):
+
+        for match_id in range(10, 16):
+            self.scoreboard.update(match_day=3, match_id=match_id, text=self.long_match_text(match_id=match_id))
+        pages = self.scoreboard.render()
+        self.assertGreater(len(pages), 2)
+
+        # the second page fails, the third page is sent
+        self.bot.send_errors = [NetworkError('Connection reset'), None]
+        self.scoreboard.publish()
+        self.assertEqual(sorted(self.scoreboard.message_ids), [0] + list(range(2, len(pages))),
+                         msg="message ids must be stored by page index")
+
+        self.bot.calls.clear()
+        self.scoreboard.publish()
+        self.assertEqual([call[0] for call in self.bot.calls], ['send'], msg="only the failed page must be sent again")
+        self.assertEqual(self.bot.calls[0][1], pages[1], msg="the failed page must be sent with its own text")
+
+    def test_fewer_pages(self):
+
+        for match_id in range(10, 16):
+            self.scoreboard.update(match_day=3, match_id=match_id, text=self.long_match_text(match_id=match_id))
+        self.scoreboard.publish()
+        message_ids = dict(self.scoreboard.message_ids)
+
+        for match_id in range(10, 16):
+            self.scoreboard.update(match_day=3, match_id=match_id, text='match {}'.format(match_id))
+        self.scoreboard.publish()
+        self.assertEqual([call for call in self.bot.calls if call[0] == 'delete'],
+                         [('delete', message_ids[index]) for index in sorted(message_ids) if index > 0],
+                         msg="messages of pages which are not needed anymore must be deleted")
+        self.assertEqual(list(self.scoreboard.message_ids), [0])
+
+    def test_network_error(self):
+
+        self.bot.edit_error = TimedOut()
+        self.scoreboard.update(match_day=3, match_id=10, text='Hertha BSC vs. Freiburg 1:0')
+        self.scoreboard.publish()
+        self.assertEqual(len(self.bot.calls), 2, msg="network errors must not be raised by publish")
+
+        self.bot.edit_error = None
+        self.scoreboard.publish()
+        self.assertEqual(self.bot.calls[-1][0], 'edit', msg="the page must be edited again with the next publish")
+
+
+if __name__ == '__main__':
+    unittest.main()
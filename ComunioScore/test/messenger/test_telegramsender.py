@@ -0,0 +1,98 @@
+import unittest
+from telegram.error import RetryAfter
+from ComunioScore.messenger.telegramsender import TelegramSender
+
+
+class TestTelegramSender(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.sent = list()
+        self.flood = False
+        # the queue is processed step by step with fixed timestamps, the run thread is not started
+        self.sender = TelegramSender(send_func=self.send_func, merge_interval=2, chat_interval=3)
+
+    def send_func(self, chat_id, text):
+        if self.flood:
+            self.flood = False
+            raise RetryAfter(retry_after=10)
+        self.sent.append((chat_id, text))
+
+    def test_merge_queued_messages(self):
+
+        self.sender.enqueue(chat_id=1, text='Hertha BSC vs. Freiburg: 1', key=10, now=1000)
+        self.sender.enqueue(chat_id=1, text='1. FC Köln vs. Bayern München', key=11, now=1001)
+        self.sender.enqueue(chat_id=1, text='Hertha BSC vs. Freiburg: 2', key=10, now=1001)
+        self.assertEqual(self.sender.process(now=1001), 1, msg="messages must be merged for the merge interval")
+        self.assertEqual(self.sent, [], msg="messages must not be sent within the merge interval")
+
+        self.assertEqual(self.sender.process(now=1002), 0, msg="messages must be sent after the merge interval")
+        self.assertEqual(self.sent, [(1, 'Hertha BSC vs. Freiburg: 2\n\n1. FC Köln vs. Bayern München')],
+                         msg="queued messages must be merged and the newer message with the same key must be sent")
+        self.assertIsNone(self.sender.process(now=1002), msg="no message must be queued")
+
+    def test_chat_interval(self):
+
+        self.sender.enqueue(chat_id=1, text='Start fetching live data', now=1000)
+        self.sender.process(now=1002)
+        self.sender.enqueue(chat_id=1, text='Hertha BSC vs. Freiburg', now=1002)
+        self.assertEqual(self.sender.process(now=1004), 1, msg="chat must be sent at most every chat interval")
+
+        self.sender.process(now=1005)
+        self.assertEqual(self.sent, [(1, 'Start fetching live data'), (1, 'Hertha BSC vs. Freiburg')],
+                         msg="messages must be sent after the chat interval")
+
+    def test_retry_after(self):
+
+        self.flood = True
+        self.sender.enqueue(chat_id=1, text='Start fetching live data', now=1000)
+        self.sender.enqueue(chat_id=2, text='Hertha BSC vs. Freiburg', now=1000)
+        self.sender.process(now=1002)
+        self.assertEqual(self.sender.process(now=1002), 0, msg="other chats must not wait for the flood control")
+        self.assertEqual(self.sender.process(now=1002), 10, msg="chat must be sent again after retry_after")
+
+        self.sender.process(now=1012)
+        self.assertEqual(self.sent, [(2, 'Hertha BSC vs. Freiburg'), (1, 'Start fetching live data')],
+                         msg="message must be sent after the flood control")
+
+    def test_merge_max_length(self):
+
+        chunks = TelegramSender.merge(texts=['a' * 3000, 'b' * 3000, 'c' * 5000])
+        self.assertEqual([len(chunk) for chunk in chunks], [3000, 3000, 4096, 904], msg="chunks must not exceed 4096")
+
+    def test_merge_line_boundaries(self):
+
+        text = '\n'.join('*Spieler {}*: 10 Punkte'.format(i) for i in range(300))
+        chunks = TelegramSender.merge(texts=['*Hertha BSC* vs. *Freiburg*', text])
+        self.assertEqual(chunks[0], '*Hertha BSC* vs. *Freiburg*', msg="messages must be split at message boundaries")
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks), msg="chunks must not exceed 4096")
+        self.assertEqual(''.join(chunks[1:]), text, msg="long messages must be split at line boundaries")
+        self.assertTrue(all(line.count('*') % 2 == 0 for chunk in chunks for line in chunk.split('\n')),
+                        msg="markdown entities must not be split")
+
+    def test_hold_release(self):
+
+        self.sender.hold(now=1000)
+        self.sender.enqueue(chat_id=1, text='Hertha BSC vs. Freiburg', key=10, now=1000)
+        self.sender.enqueue(chat_id=1, text='1. FC Köln vs. Bayern München', key=11, now=1010)
+        self.assertEqual(self.sender.process(now=1010), TelegramSender.max_hold - 10, msg="held messages must wait")
+        self.assertEqual(self.sent, [], msg="held messages must not be sent")
+
+        self.sender.release()
+        self.assertEqual(self.sender.process(now=1010), 0, msg="released messages must be sent")
+        self.assertEqual(self.sent, [(1, 'Hertha BSC vs. Freiburg\n\n1. FC Köln vs. Bayern München')],
+                         msg="messages of one hold must be merged")
+
+    def test_max_hold(self):
+
+        self.sender.hold(now=1000)
+        self.sender.enqueue(chat_id=1, text='Hertha BSC vs. Freiburg', now=1000)
+        self.assertEqual(self.sender.process(now=1000 + TelegramSender.max_hold), 0,
+                         msg="held messages must be sent after max_hold")
+
+    def tearDown(self) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
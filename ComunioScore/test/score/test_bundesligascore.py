@@ -3,6 +3,7 @@ import unittest
 import configparser
 
 from ComunioScore.score import SofaScore, BundesligaScore
+from ComunioScore.records import LineupPlayer, Incident
 from ComunioScore import ROOT_DIR
 
 
@@ -52,9 +53,13 @@ class TestBundesligaScore(unittest.TestCase):
         self.assertIsInstance(lineup['awayTeam'], list, msg="lineup['awayTeam'] must be type of list")
         self.assertIsInstance(lineup['homeTeamIncidents'], list, msg="lineup['homeTeamIncidents'] must be type of list")
         self.assertIsInstance(lineup['awayTeamIncidents'], list, msg="lineup['awayTeamIncidents'] must be type of list")
+        self.assertIsInstance(lineup['homeTeamIncidentsByPlayer'], dict, msg="lineup['homeTeamIncidentsByPlayer'] must be type of dict")
+        self.assertIsInstance(lineup['awayTeamIncidentsById'], dict, msg="lineup['awayTeamIncidentsById'] must be type of dict")
+        self.assertEqual(lineup['homeTeamIncidentCount'], len(lineup['homeTeamIncidents']),
+                         msg="lineup['homeTeamIncidentCount'] must be the number of home team incidents")
         for (homeplayer, awayplayer) in zip(lineup['homeTeam'], lineup['awayTeam']):
-            self.assertIsInstance(homeplayer, dict, msg="homeplayer must be type of list")
-            self.assertIsInstance(awayplayer, dict, msg="awayplayer must be type of list")
+            self.assertIsInstance(homeplayer, LineupPlayer, msg="homeplayer must be type of LineupPlayer")
+            self.assertIsInstance(awayplayer, LineupPlayer, msg="awayplayer must be type of LineupPlayer")
 
     def test_season_data(self):
 
@@ -73,5 +78,77 @@ class TestBundesligaScore(unittest.TestCase):
         self.bundesliga.close()
 
 
+class TestGroupIncidents(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.incidents = [Incident(type='goal', incident_class='regulargoal', player='Jorge Mere', player_id=794839),
+                          Incident(type='goal', incident_class='penalty', player='Jorge Mere', player_id=794839),
+                          Incident(type='card', incident_class='Red', player='Jhon Córdoba')]
+
+    def test_group_incidents(self):
+
+        incidents_by_player, incidents_by_id = BundesligaScore.group_incidents(incidents=self.incidents)
+        self.assertEqual(len(incidents_by_player['Jorge Mere']), 2, msg="Jorge Mere must have two incidents")
+        self.assertEqual(incidents_by_id[794839], incidents_by_player['Jorge Mere'], msg="id and name groups must be equal")
+        self.assertIn('Jhon Córdoba', incidents_by_player, msg="incident without player id must be grouped by name")
+        self.assertNotIn(None, incidents_by_id, msg="incident without player id must not be grouped by id")
+
+
+class TestLineupsFromMatchIds(unittest.TestCase):
+
+    class LineupStub(BundesligaScore):
+
+        def lineup_from_match_id(self, match_id):
+            if match_id == 8272011:
+                raise KeyError('homeTeam')
+            return {'match_id': match_id}
+
+    def test_lineups_from_match_ids(self):
+
+        lineups = self.LineupStub().lineups_from_match_ids(match_ids=[8272345, 8272011], max_workers=2)
+        self.assertEqual(lineups[8272345], ({'match_id': 8272345}, None), msg="lineup must be keyed by match id")
+        self.assertIsNone(lineups[8272011][0], msg="failed lineup must be None")
+        self.assertIsInstance(lineups[8272011][1], KeyError, msg="error of the failed lineup must be returned")
+        self.assertEqual(self.LineupStub().lineups_from_match_ids(match_ids=[]), dict())
+
+
+class TestHasLineup(unittest.TestCase):
+
+    def test_has_lineup(self):
+
+        self.assertTrue(BundesligaScore.has_lineup(lineup={'homeTeam': {'lineupsSorted': []}, 'awayTeam': {'lineupsSorted': []}}))
+        self.assertFalse(BundesligaScore.has_lineup(lineup={}), msg="failed request must have no lineup")
+        self.assertFalse(BundesligaScore.has_lineup(lineup={'homeTeam': {'lineupsSorted': []}, 'awayTeam': None}),
+                         msg="lineup of both teams is required")
+
+
+class TestNotifyLineup(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.lineups = list()
+        BundesligaScore.register_lineup_event_handler(func=lambda match_id, lineup: self.lineups.append((match_id, lineup)))
+
+    def tearDown(self) -> None:
+
+        BundesligaScore.lineup_event_handler = None
+
+    def test_notify_lineup(self):
+
+        BundesligaScore.notify_lineup(match_id=8272345, lineup={'homeTeam': {}, 'awayTeam': {}})
+        BundesligaScore.notify_lineup(match_id=8272345, lineup={})
+        self.assertEqual(len(self.lineups), 1, msg="only non empty lineups must be passed to the handler")
+        self.assertEqual(self.lineups[0][0], 8272345, msg="match id must be passed to the handler")
+
+    def test_failing_handler(self):
+
+        def handler(match_id, lineup):
+            raise ValueError("database not available")
+
+        BundesligaScore.register_lineup_event_handler(func=handler)
+        BundesligaScore.notify_lineup(match_id=8272345, lineup={'homeTeam': {}, 'awayTeam': {}})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,126 @@
+import datetime
+import unittest
+
+from ComunioScore.score import MatchdayStatus, BundesligaScore, SofaScore
+
+
+class BundesligaStub:
+
+    def __init__(self):
+        self.date_requests = 0
+        self.match_requests = 0
+
+    def events_for_date(self, date):
+        self.date_requests += 1
+        return [{'id': 8272345, 'status': {'code': 100, 'type': 'finished'}},
+                {'id': 8272011, 'status': {'code': 7, 'type': 'inprogress'}, 'statusDescription': '2nd half'}]
+
+    def match_status(self, matchid):
+        self.match_requests += 1
+        return {'type': 'notstarted'}
+
+
+class TestMatchdayStatus(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.bundesliga = BundesligaStub()
+        self.matchdaystatus = MatchdayStatus(bundesliga=self.bundesliga)
+        self.matchdaystatus.refresh(dates=['2019-10-05', '2019-10-05'])
+
+    def test_refresh(self):
+
+        self.assertEqual(self.bundesliga.date_requests, 1, msg="date feed must be requested once per date")
+
+    def test_status(self):
+
+        status = self.matchdaystatus.status(match_id=8272011)
+        self.assertEqual(status['type'], 'inprogress', msg="status type must be inprogress")
+        self.assertEqual(status['description'], '2nd half', msg="status description must be 2nd half")
+        self.assertEqual(self.bundesliga.match_requests, 0, msg="match data must not be requested")
+
+    def test_is_finished(self):
+
+        self.assertTrue(self.matchdaystatus.is_finished(match_id=8272345), msg="match 8272345 must be finished")
+        self.assertFalse(self.matchdaystatus.is_finished(match_id=1), msg="match 1 must not be finished")
+        self.assertEqual(self.bundesliga.match_requests, 1, msg="unknown match must be requested")
+
+    def tearDown(self) -> None:
+        pass
+
+
+class TestMatchdayStatusRefresh(unittest.TestCase):
+
+    class Response:
+
+        status_code = 200
+        headers = dict()
+
+        def __init__(self, data):
+            self.data = data
+
+        def json(self):
+            return self.data
+
+    class ScraperStub:
+
+        def __init__(self):
+            self.status = {'code': 6, 'type': 'inprogress'}
+            self.requests = 0
+            self.evict = False
+
+        def get(self, url, headers={}, retry=3, timeout=60):
+            self.requests += 1
+            if 'If-None-Match' in headers:
+                if self.evict:
+                    SofaScore.cache.clear()
+                response = TestMatchdayStatusRefresh.Response(data=None)
+                response.status_code = 304
+                return response
+            event = {'id': 8272345, 'status': dict(self.status)}
+            return TestMatchdayStatusRefresh.Response(data={'sportItem': {'tournaments': [
+                {'tournament': {'name': 'Bundesliga'}, 'category': {'name': 'Germany'}, 'events': [event]}]}})
+
+    def setUp(self) -> None:
+
+        self.scraper = self.ScraperStub()
+        self.last_scraper = SofaScore.scraper
+        SofaScore.scraper = self.scraper
+        SofaScore.cache.clear()
+        self.matchdaystatus = MatchdayStatus(bundesliga=BundesligaScore())
+        self.today = datetime.date.today().strftime('%Y-%m-%d')
+
+    def tearDown(self) -> None:
+
+        SofaScore.scraper = self.last_scraper
+        SofaScore.cache.clear()
+
+    def test_refresh_live_status(self):
+
+        self.matchdaystatus.refresh(dates=[self.today])
+        self.assertFalse(self.matchdaystatus.is_finished(match_id=8272345))
+
+        self.scraper.status = {'code': 100, 'type': 'finished'}
+        self.matchdaystatus.refresh(dates=[self.today])
+        self.assertEqual(self.scraper.requests, 2, msg="date feed must be requested on every refresh")
+        self.assertTrue(self.matchdaystatus.is_finished(match_id=8272345), msg="refresh must see the new status")
+
+    def test_refresh_past_date(self):
+
+        self.matchdaystatus.refresh(dates=['2019-10-05'])
+        self.matchdaystatus.refresh(dates=['2019-10-05'])
+        self.assertEqual(self.scraper.requests, 1, msg="date feed of a past date must be cached")
+
+    def test_revalidate_evicted(self):
+
+        url = BundesligaScore().date_url.format(date='2019-10-05')
+        data = {'sportItem': {'tournaments': []}}
+        SofaScore.cache.store(endpoint='past_date', url=url, data=data, etag='"5d8f"', now=0)
+
+        self.scraper.evict = True
+        self.assertEqual(BundesligaScore().get_date_data(date='2019-10-05'), data,
+                         msg="not modified response must return the expired response if the entry was evicted")
+
+
+if __name__ == '__main__':
+    unittest.main()
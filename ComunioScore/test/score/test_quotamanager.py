@@ -0,0 +1,79 @@
+import unittest
+import datetime
+from ComunioScore.score.quotamanager import QuotaManager
+
+
+class TestQuotaManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.quota = QuotaManager(requests_per_match=40, background_per_day=10)
+        self.now = datetime.datetime(2020, 2, 1, 12, 0, tzinfo=datetime.timezone.utc).timestamp()
+        self.account = {'requestCount': 500, 'requestLimit': 1000, 'subscriptionDate': '2020-01-10T09:49:26.000Z'}
+
+    def test_billing_period_end(self):
+
+        end = QuotaManager.billing_period_end(subscription_date='2020-01-10T09:49:26.000Z', now=self.now)
+        self.assertEqual(end, datetime.datetime(2020, 2, 10, 9, 49, 26, tzinfo=datetime.timezone.utc).timestamp())
+
+        end = QuotaManager.billing_period_end(subscription_date='2020-01-31T00:00:00.000Z', now=self.now)
+        self.assertEqual(end, datetime.datetime(2020, 2, 28, tzinfo=datetime.timezone.utc).timestamp(),
+                         msg="days after the 28th must renew on the 28th")
+
+        now = datetime.datetime(2020, 12, 20, tzinfo=datetime.timezone.utc).timestamp()
+        end = QuotaManager.billing_period_end(subscription_date='2020-01-10T00:00:00.000Z', now=now)
+        self.assertEqual(end, datetime.datetime(2021, 1, 10, tzinfo=datetime.timezone.utc).timestamp())
+
+    def test_projection(self):
+
+        self.assertIsNone(self.quota.projection(now=self.now), msg="projection must be unknown before the reconcile")
+
+        self.quota.reconcile(account=self.account, now=self.now)
+        self.quota.set_schedule(timestamps=[self.now + 3600, self.now + 7200, self.now + 40 * 86400])
+        self.quota.record(priority='live')
+
+        # 501 requests, 2 matches until the 10th and 8.9 days of background requests
+        self.assertEqual(self.quota.projection(now=self.now), 501 + 2 * 40 + 89)
+        self.assertAlmostEqual(self.quota.projected_usage(now=self.now), 0.67)
+
+    def test_allow(self):
+
+        self.assertTrue(self.quota.allow(priority='background', now=self.now), msg="unknown quota must not refuse")
+
+        self.quota.reconcile(account=dict(self.account, requestCount=900), now=self.now)
+        self.assertTrue(self.quota.allow(priority='live', now=self.now), msg="live requests must never be refused")
+        self.assertFalse(self.quota.allow(priority='background', now=self.now), msg="background must be refused at 90%")
+
+        self.quota.reconcile(account=self.account, now=self.now)
+        self.quota.set_schedule(timestamps=[self.now + i * 3600 for i in range(20)])
+        self.assertFalse(self.quota.allow(priority='background', now=self.now),
+                         msg="background must be refused if the projection exceeds the limit")
+        self.assertEqual(self.quota.stats()['refused'], 2)
+
+    def test_season_refresh(self):
+
+        self.quota.reconcile(account=dict(self.account, requestCount=990), now=self.now)
+        self.quota.set_schedule(timestamps=[self.now + i * 3600 for i in range(20)])
+        self.assertTrue(self.quota.allow(priority=self.quota.priority(endpoint='season'), now=self.now),
+                        msg="season refresh must never be refused")
+        self.assertFalse(self.quota.allow(priority=self.quota.priority(endpoint='player_stats'), now=self.now),
+                         msg="player stats must be refused")
+
+        self.quota.record(priority=self.quota.priority(endpoint='season'))
+        self.assertEqual(self.quota.stats()['essential'], 1, msg="season refresh must be counted as essential")
+
+    def test_alert(self):
+
+        self.quota.reconcile(account=self.account, now=self.now)
+        self.assertIsNone(self.quota.alert(now=self.now), msg="no alert below the thresholds")
+
+        self.quota.reconcile(account=dict(self.account, requestCount=900), now=self.now)
+        self.assertIn("900 of 1000", self.quota.alert(now=self.now))
+        self.assertIsNone(self.quota.alert(now=self.now), msg="same threshold must alert only once")
+
+        self.quota.reconcile(account=dict(self.account, requestCount=960), now=self.now)
+        self.assertIsNotNone(self.quota.alert(now=self.now), msg="new threshold must alert again")
+
+
+if __name__ == '__main__':
+    unittest.main()
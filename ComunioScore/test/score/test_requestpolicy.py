@@ -0,0 +1,82 @@
+import unittest
+from ComunioScore.score.requestpolicy import RequestPolicy, CircuitBreaker
+from ComunioScore.exceptions import SofascoreRequestError, SofascoreCircuitOpenError
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    def test_open(self):
+
+        self.breaker.record_failure(now=0)
+        self.assertTrue(self.breaker.allow(now=1), msg="breaker must stay closed below the threshold")
+        self.breaker.record_failure(now=1)
+        self.assertFalse(self.breaker.allow(now=2), msg="breaker must open after consecutive failures")
+
+    def test_half_open(self):
+
+        self.breaker.record_failure(now=0)
+        self.breaker.record_failure(now=0)
+        self.assertTrue(self.breaker.allow(now=60), msg="probe request must be let through after reset_timeout")
+        self.assertFalse(self.breaker.allow(now=61), msg="only one probe request must be let through")
+
+        self.breaker.record_failure(now=61)
+        self.assertEqual(self.breaker.state, 'open', msg="failed probe must open the breaker again")
+
+        self.assertTrue(self.breaker.allow(now=121))
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.allow(now=122), msg="successful probe must close the breaker")
+
+
+class TestRequestPolicy(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.policy = RequestPolicy(retries=2, backoff_base=1, failure_threshold=3)
+        self.waits = list()
+        self.responses = list()
+
+    def request(self, timeout):
+
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def test_retry(self):
+
+        self.responses = [SofascoreRequestError("timeout"), SofascoreRequestError("502"), {'event': {}}]
+        self.assertEqual(self.policy.call(func=self.request, wait=self.waits.append), {'event': {}})
+        self.assertEqual(len(self.waits), 2, msg="failed attempts must be retried")
+        self.assertTrue(0 <= self.waits[0] <= 1 and 0 <= self.waits[1] <= 2, msg="backoff must grow exponentially")
+        self.assertEqual(self.policy.breaker.failures, 0, msg="success must reset the failures")
+
+    def test_circuit_open(self):
+
+        self.responses = [SofascoreRequestError("503")] * 3
+        with self.assertRaises(SofascoreRequestError):
+            self.policy.call(func=self.request, wait=self.waits.append)
+        self.assertEqual(len(self.waits), 2, msg="no backoff after the breaker has opened")
+
+        with self.assertRaises(SofascoreCircuitOpenError):
+            self.policy.call(func=self.request, wait=self.waits.append)
+        self.assertEqual(self.policy.stats(), {'retries': 2, 'failures': 3, 'rejected': 1, 'state': 'open'})
+
+    def test_other_errors(self):
+
+        self.responses = [ValueError("bug")]
+        with self.assertRaises(ValueError):
+            self.policy.call(func=self.request, wait=self.waits.append)
+        self.assertEqual(self.waits, [], msg="other errors must not be retried")
+
+    def test_configure(self):
+
+        self.policy.configure(options={'retries': '4', 'timeout': '10', 'reset_timeout': '120'})
+        self.assertEqual((self.policy.retries, self.policy.timeout, self.policy.breaker.reset_timeout), (4, 10.0, 120.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+import unittest
+from ComunioScore.score.responsecache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.cache = ResponseCache(max_entries=2, ttls={'season': 100})
+        self.url = "http://api.sofascore.com/mobile/v4/unique-tournament/35/season/23538/events"
+
+    def test_lookup(self):
+
+        self.assertIsNone(self.cache.lookup(endpoint='season', url=self.url, now=0), msg="empty cache must miss")
+        self.cache.store(endpoint='season', url=self.url, data={'tournaments': []}, etag='"5d8f"', now=0)
+        self.assertEqual(self.cache.lookup(endpoint='season', url=self.url, now=50), ({'tournaments': []}, '"5d8f"', True))
+        self.assertEqual(self.cache.lookup(endpoint='season', url=self.url, now=150), ({'tournaments': []}, '"5d8f"', False),
+                         msg="expired response must be returned for revalidation")
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'disk_hits': 0, 'misses': 2, 'revalidated': 0, 'entries': 1})
+
+    def test_revalidate(self):
+
+        self.cache.store(endpoint='season', url=self.url, data={'tournaments': []}, etag='"5d8f"', now=0)
+        self.assertEqual(self.cache.revalidate(url=self.url, now=150), {'tournaments': []})
+        self.assertTrue(self.cache.lookup(endpoint='season', url=self.url, now=200)[2], msg="revalidated response must be fresh")
+
+    def test_disabled_endpoint(self):
+
+        self.cache.store(endpoint='lineups', url='lineups', data={'homeTeam': {}}, now=0)
+        self.assertIsNone(self.cache.lookup(endpoint='lineups', url='lineups', now=0), msg="lineups must not be cached")
+        self.assertEqual(self.cache.stats()['misses'], 0, msg="disabled endpoints must not be counted")
+
+    def test_last_good(self):
+
+        self.cache.store(endpoint='lineups', url='lineups', data={'homeTeam': {}}, now=0)
+        self.assertEqual(self.cache.last_good(url='lineups'), {'homeTeam': {}}, msg="last lineup must be kept")
+        self.assertIsNone(self.cache.lookup(endpoint='lineups', url='lineups', now=0), msg="lineups must not be cached")
+        self.assertIsNone(self.cache.last_good(url='event'), msg="unknown url must have no last good response")
+
+    def test_lru(self):
+
+        for i in range(3):
+            self.cache.store(endpoint='season', url=str(i), data={'id': i}, now=0)
+        self.assertIsNone(self.cache.lookup(endpoint='season', url='0', now=0), msg="oldest entry must be evicted")
+        self.assertEqual(self.cache.stats()['entries'], 2, msg="cache must hold max_entries")
+
+    def test_disk(self):
+
+        cache_dir = tempfile.mkdtemp()
+        try:
+            self.cache.configure(options={'dir': cache_dir, 'size': '10'})
+            self.cache.store(endpoint='season', url=self.url, data={'tournaments': []}, now=0)
+
+            cache = ResponseCache(cache_dir=cache_dir, ttls={'season': 100})
+            self.assertEqual(cache.lookup(endpoint='season', url=self.url, now=10), ({'tournaments': []}, None, True))
+            self.assertEqual(cache.stats()['disk_hits'], 1, msg="response must be loaded from the cache directory")
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
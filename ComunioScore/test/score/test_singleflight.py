@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from time import sleep
+from threading import Thread, Event
+from ComunioScore.score.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.singleflight = SingleFlight()
+        self.release = Event()
+        self.calls = 0
+
+    def request(self):
+
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return {'event': {'id': 8272345}}
+
+    def test_do(self):
+
+        self.assertEqual(self.singleflight.do(key='url', func=lambda: 1), 1)
+        self.assertEqual(self.singleflight.do(key='url', func=lambda: 2), 2, msg="finished calls must not be reused")
+        self.assertEqual(self.singleflight.stats(), {'calls': 2, 'coalesced': 0})
+
+    def test_coalesce(self):
+
+        results = list()
+        threads = [Thread(target=lambda: results.append(self.singleflight.do(key='url', func=self.request)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+
+        # wait until all threads wait for the first call
+        while self.singleflight.stats()['coalesced'] < 3:
+            sleep(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1, msg="request must be sent once")
+        self.assertEqual(len(results), 4, msg="all threads must get the result")
+        self.assertTrue(all(result is results[0] for result in results), msg="all threads must get the same result")
+        self.assertEqual(self.singleflight.stats(), {'calls': 1, 'coalesced': 3})
+
+    def test_error(self):
+
+        def request():
+            raise ValueError("invalid json")
+
+        with self.assertRaises(ValueError):
+            self.singleflight.do(key='url', func=request)
+        self.assertEqual(self.singleflight.do(key='url', func=lambda: 1), 1, msg="failed calls must not be reused")
+
+    def test_coalesce_async(self):
+
+        async def coalesce():
+            release = asyncio.Event()
+
+            async def request():
+                self.calls += 1
+                await release.wait()
+                return {'event': {'id': 8272345}}
+
+            leader = asyncio.ensure_future(self.singleflight.do_async(key='url', func=request))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(self.singleflight.do_async(key='url', func=request))
+            await asyncio.sleep(0)
+            release.set()
+            return await asyncio.gather(leader, waiter)
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(coalesce())
+        finally:
+            loop.close()
+
+        self.assertEqual(self.calls, 1, msg="request must be sent once")
+        self.assertIs(results[0], results[1], msg="all coroutines must get the same result")
+        self.assertEqual(self.singleflight.stats(), {'calls': 1, 'coalesced': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
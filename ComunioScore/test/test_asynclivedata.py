@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+from threading import Event
+from ComunioScore.asynclivedata import AsyncLiveData
+from ComunioScore.asyncdbhandler import AsyncDBHandler
+from ComunioScore.pollingpolicy import PollingPolicy
+
+
+class AsyncBundesligaStub:
+
+    def __init__(self):
+        self.polls = 0
+
+    async def match_status(self, matchid):
+        self.polls += 1
+        return {'type': 'finished'} if self.polls > 2 else {'type': 'inprogress', 'code': 6}
+
+    async def lineup_from_match_id(self, match_id):
+        return {'homeTeam': [], 'awayTeam': []}
+
+    async def close(self):
+        pass
+
+
+class LiveDataStub:
+
+    def __init__(self):
+        self.pollingpolicy = PollingPolicy(intervals={'firsthalf': 0, 'settlement': 0, 'unknown': 0})
+        self.pollingpolicy.last_quota_ts = float('inf')
+        self.msg_rate = 600
+        self.calls = list()
+        self.finish_errors = list()
+        self.closed = Event()
+
+    def start_match(self, match_day, match_id, home_team, away_team):
+        self.calls.append(('start', match_id))
+
+    def update_match(self, match_day, match_id, home_team, away_team, send=False, match_lineup=None):
+        self.calls.append(('update', match_id, send, match_lineup is not None))
+
+    def finish_match(self, match_id, home_team, away_team):
+        if self.finish_errors:
+            raise self.finish_errors.pop(0)
+        self.calls.append(('finish', match_id))
+
+    def close_match(self, match_id):
+        self.calls.append(('close', match_id))
+        self.closed.set()
+
+
+class TestAsyncLiveData(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.livedata = LiveDataStub()
+        self.asynclivedata = AsyncLiveData(livedata=self.livedata)
+        self.asynclivedata.bundesliga = AsyncBundesligaStub()
+        self.asynclivedata.start()
+
+    def test_fetch(self):
+
+        future = self.asynclivedata.add_match(match_day=1, match_id=1, home_team='Hertha BSC', away_team='Freiburg')
+        future.result(timeout=5)
+
+        self.assertEqual(self.livedata.calls, [('start', 1), ('update', 1, False, True), ('update', 1, False, True),
+                                               ('finish', 1), ('update', 1, True, True), ('close', 1)])
+
+    def test_restart_failed_match(self):
+
+        self.livedata.finish_errors = [KeyError('status')]
+        future = self.asynclivedata.add_match(match_day=1, match_id=1, home_team='Hertha BSC', away_team='Freiburg')
+        with self.assertRaises(KeyError):
+            future.result(timeout=5)
+
+        self.assertTrue(self.livedata.closed.wait(timeout=5), msg="failed match must be restarted")
+        self.assertEqual(self.livedata.calls.count(('start', 1)), 1, msg="restarted match must not be started again")
+        self.assertEqual(self.livedata.calls[-3:], [('finish', 1), ('update', 1, True, True), ('close', 1)])
+
+    def test_db_proxy(self):
+
+        db = AsyncDBHandler(dbhandler=self.livedata)
+        self.assertEqual(db.msg_rate, 600, msg="attributes must be returned unchanged")
+
+        asyncio.run_coroutine_threadsafe(db.close_match(match_id=3), self.asynclivedata.loop).result(timeout=5)
+        self.assertEqual(self.livedata.calls, [('close', 3)], msg="methods must be called in the executor")
+
+    def tearDown(self) -> None:
+
+        self.asynclivedata.stop()
+        self.asynclivedata.join(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
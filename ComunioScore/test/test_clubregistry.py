@@ -0,0 +1,53 @@
+import unittest
+from ComunioScore.clubregistry import ClubRegistry
+
+
+class TestClubRegistry(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.teams = ['1. FC Köln', 'Bayern München', 'Borussia Dortmund', 'Freiburg']
+        self.clubs = ['1. FC Köln', 'FC Bayern München', 'Borussia Dortmund', 'SC Freiburg', 'Hamburger SV']
+
+        self.registry = ClubRegistry(aliases={'Hamburger SV': 'Freiburg'})
+        self.registry.build(teams=self.teams, clubs=self.clubs)
+
+    def test_resolve_exact(self):
+
+        self.assertEqual(self.registry.resolve(club='1. FC Köln'), '1. FC Köln', msg="1. FC Köln must resolve to itself")
+
+    def test_resolve_ratio(self):
+
+        self.assertEqual(self.registry.resolve(club='FC Bayern München'), 'Bayern München',
+                         msg="FC Bayern München must resolve to Bayern München")
+        self.assertEqual(self.registry.resolve(club='SC Freiburg'), 'Freiburg', msg="SC Freiburg must resolve to Freiburg")
+
+    def test_resolve_alias(self):
+
+        self.assertEqual(self.registry.resolve(club='Hamburger SV'), 'Freiburg', msg="alias must resolve to Freiburg")
+
+    def test_get_unresolved(self):
+
+        self.assertEqual(self.registry.get_unresolved(), [], msg="all clubs must be resolved")
+        self.assertIsNone(self.registry.resolve(club='VfL Osnabrück'), msg="VfL Osnabrück must not be resolved")
+        self.assertEqual(self.registry.get_unresolved(), ['VfL Osnabrück'], msg="VfL Osnabrück must be unresolved")
+
+    def test_resolve_without_teams(self):
+
+        registry = ClubRegistry(aliases={'Hamburger SV': 'Freiburg'})
+        registry.build(teams=[], clubs=self.clubs)
+        self.assertEqual(registry.resolve(club='FC Bayern München'), 'FC Bayern München',
+                         msg="without season teams the club must resolve to itself")
+        self.assertEqual(registry.resolve(club='Hamburger SV'), 'Freiburg', msg="alias must resolve without season teams")
+        self.assertEqual(registry.get_unresolved(), [], msg="clubs must not be unresolved without season teams")
+
+        registry.build(teams=self.teams, clubs=self.clubs)
+        self.assertEqual(registry.resolve(club='FC Bayern München'), 'Bayern München',
+                         msg="rebuilt registry must resolve to the season teams")
+
+    def tearDown(self) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ComunioScore.dbhandler import DBHandler
+from ComunioScore.db.connector import DBConnector
+from ComunioScore.exceptions import DBIntegrityError
+
+
+class TestDBHandler(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db_dir = tempfile.mkdtemp()
+        self.dbhandler = DBHandler(path=os.path.join(self.db_dir, 'comunioscore.db'))
+
+    def tearDown(self) -> None:
+
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+        shutil.rmtree(self.db_dir)
+
+
+class TestPlayerMapping(TestDBHandler):
+
+    def test_insert_player_mapping(self):
+
+        self.dbhandler.insert_player_mapping(playername='Jarstein', club='Hertha BSC', sofascore_playerid=35612,
+                                             sofascore_playername='Rune Jarstein')
+        self.dbhandler.insert_player_mapping(playername='Jarstein', club='Hertha BSC', sofascore_playerid=1,
+                                             sofascore_playername='Other Jarstein')
+        self.assertEqual(self.dbhandler.query_player_mapping(), {('Jarstein', 'Hertha BSC'): (35612, 'Rune Jarstein')},
+                         msg="player must be mapped once")
+
+
+class TestUpdatePoints(TestDBHandler):
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        points_sql = "insert into main.points (userid, username, match_id, match_day, homeTeam, awayTeam) values " \
+                     "(%s, %s, %s, %s, %s, %s)"
+        self.dbhandler.dbinserter.many_rows(sql=points_sql, datas=[(13, 'test', 8272345, 3, 'Hertha BSC', 'Fortuna Düsseldorf'),
+                                                                   (14, 'test2', 8272345, 3, 'Hertha BSC', 'Fortuna Düsseldorf')])
+
+    def test_update_points_in_database_batch(self):
+
+        self.assertTrue(self.dbhandler.update_points_in_database_batch(match_id=8272345, match_day=3,
+                                                                       points=[(13, 5, 4, 0), (14, -2, 0, 0)]))
+        self.assertEqual(self.dbhandler.query_rating_goal_off_points(userid=13, match_day=3, match_id=8272345), [(5, 4, 0)])
+        self.assertEqual(self.dbhandler.points_written[8272345], {(13, 3): (5, 4, 0), (14, 3): (-2, 0, 0)},
+                         msg="written points must be cached per match")
+
+    def test_failed_write(self):
+
+        self.dbhandler.dbinserter.sql(sql="drop table main.points")
+        self.assertFalse(self.dbhandler.update_points_in_database_batch(match_id=8272345, match_day=3, points=[(13, 5, 4, 0)]))
+        self.assertNotIn(8272345, self.dbhandler.points_written, msg="points of a failed write must not be cached")
+
+    def test_missing_points_row(self):
+
+        self.assertFalse(self.dbhandler.update_points_in_database_batch(match_id=8272345, match_day=3,
+                                                                        points=[(13, 5, 4, 0), (99, 1, 0, 0)]))
+        self.assertEqual(self.dbhandler.points_written[8272345], {(13, 3): (5, 4, 0)},
+                         msg="points without a row in the points table must not be cached")
+
+    def test_many_rows_rollback(self):
+
+        mapping_sql = "insert into main.playermapping (playername, club, sofascore_playerid, sofascore_playername) " \
+                      "values (%s, %s, %s, %s)"
+        with self.assertRaises(DBIntegrityError):
+            self.dbhandler.dbinserter.many_rows(sql=mapping_sql, datas=[('Jarstein', 'Hertha BSC', 35612, 'Rune Jarstein'),
+                                                                        ('Jarstein', 'Hertha BSC', 35612, 'Rune Jarstein')])
+        self.assertEqual(self.dbhandler.query_player_mapping(), dict(), msg="a failed row must roll back all rows")
+
+
+class TestLineupSnapshot(TestDBHandler):
+
+    def setUp(self) -> None:
+
+        super().setUp()
+        self.lineup = {'homeTeam': {'lineupsSorted': [{'player': {'name': 'Rune Jarstein', 'id': 35612}}]},
+                       'awayTeam': {'lineupsSorted': [{'player': {'name': 'Zack Steffen', 'id': 213492}}]}}
+        self.snapshot_sql = "select timestamp, hash from main.lineupsnapshot where match_id = %s order by timestamp"
+
+    def test_store_lineup_snapshot(self):
+
+        self.assertTrue(self.dbhandler.store_lineup_snapshot(match_id=8272345, lineup=self.lineup))
+        self.assertFalse(self.dbhandler.store_lineup_snapshot(match_id=8272345, lineup=dict(reversed(list(self.lineup.items())))),
+                         msg="unchanged lineup must not be stored again")
+
+        # the hash of the last snapshot is queried from the database after a restart
+        self.dbhandler.lineup_snapshot_hashes.clear()
+        self.assertFalse(self.dbhandler.store_lineup_snapshot(match_id=8272345, lineup=self.lineup),
+                         msg="lineup equal to the stored snapshot must not be stored again")
+
+        self.lineup['homeTeam']['lineupsSorted'][0]['statistics'] = {'rating': 6.5}
+        self.assertTrue(self.dbhandler.store_lineup_snapshot(match_id=8272345, lineup=self.lineup))
+        self.assertEqual(len(self.dbhandler.dbfetcher.all(sql=self.snapshot_sql, data=(8272345,))), 2,
+                         msg="changed lineup must be stored")
+
+    def test_query_last_lineup_snapshot(self):
+
+        self.assertIsNone(self.dbhandler.query_last_lineup_snapshot(match_id=8272345), msg="no snapshot must be stored")
+
+        changed_lineup = {'homeTeam': self.lineup['homeTeam'], 'awayTeam': {'lineupsSorted': []}}
+        for lineup in (self.lineup, changed_lineup, self.lineup):
+            self.assertTrue(self.dbhandler.store_lineup_snapshot(match_id=8272345, lineup=lineup))
+
+        timestamps = [timestamp for (timestamp, _) in self.dbhandler.dbfetcher.all(sql=self.snapshot_sql, data=(8272345,))]
+        self.assertEqual(len(set(timestamps)), 3, msg="snapshots within the same millisecond must get increasing timestamps")
+
+        timestamp, lineup = self.dbhandler.query_last_lineup_snapshot(match_id=8272345)
+        self.assertEqual((timestamp, lineup), (timestamps[-1], self.lineup), msg="snapshot with the latest timestamp must be returned")
+        self.assertEqual(self.dbhandler.query_last_lineup_snapshot(match_id=8272345, hash_only=True),
+                         self.dbhandler.lineup_snapshot_hashes[8272345], msg="hash of the last snapshot must be returned")
+
+    def test_query_last_lineup_snapshot_order(self):
+
+        snapshot_sql = "insert into main.lineupsnapshot (match_id, timestamp, hash, data) values (%s, %s, %s, %s)"
+        self.dbhandler.dbinserter.row(sql=snapshot_sql, data=(8272345, 2000, 'new', b''))
+        self.dbhandler.dbinserter.row(sql=snapshot_sql, data=(8272345, 1000, 'old', b''))
+        self.assertEqual(self.dbhandler.query_last_lineup_snapshot(match_id=8272345, hash_only=True), (2000, 'new'),
+                         msg="snapshots must be ordered by timestamp and not by insertion")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ComunioScore.livedata import LiveData
+from ComunioScore.db.connector import DBConnector
+from ComunioScore.records import ScoredPlayer, LineupPlayer
+
+
+class BundesligaStub:
+
+    def __init__(self):
+        self.lineup = None
+
+    def lineup_from_match_id(self, match_id):
+        if self.lineup is None:
+            raise KeyError('homeTeam')
+        return self.lineup
+
+    def parse_lineup(self, lineup):
+        return {'parsed': lineup}
+
+
+class TestLiveData(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.db_dir = tempfile.mkdtemp()
+        self.livedata = LiveData(path=os.path.join(self.db_dir, 'comunioscore.db'))
+        self.livedata.bundesliga = BundesligaStub()
+        self.snapshot = {'homeTeam': {'lineupsSorted': []}, 'awayTeam': {'lineupsSorted': []}}
+
+    def test_request_lineup(self):
+
+        self.livedata.bundesliga.lineup = {'homeTeam': [], 'awayTeam': []}
+        self.livedata.store_lineup_snapshot(match_id=8272345, lineup=self.snapshot)
+        self.assertEqual(self.livedata.request_lineup(match_id=8272345), {'homeTeam': [], 'awayTeam': []},
+                         msg="requested lineup must be used")
+
+    def test_request_lineup_fallback(self):
+
+        self.assertIsNone(self.livedata.request_lineup(match_id=8272345), msg="no lineup and no snapshot must be None")
+
+        self.livedata.store_lineup_snapshot(match_id=8272345, lineup=self.snapshot)
+        self.assertEqual(self.livedata.request_lineup(match_id=8272345), {'parsed': self.snapshot},
+                         msg="failed lineup request must fall back to the last snapshot")
+
+    def test_store_match_squads(self):
+
+        self.livedata.comunio_users = [(1, 'Shaggy', 'Bundesliga Kickers')]
+        self.livedata.squadcache.get(match_day=None, loader=lambda: {1: [('Rune Jarstein', 'keeper', 'Hertha BSC')]})
+        self.livedata.store_match_squads(match_id=8272345)
+        self.livedata.store_match_squads(match_id=8272345)
+
+        timestamp, squads = self.livedata.query_last_squad_snapshot(match_id=8272345)
+        self.assertEqual(squads, {'1': {'user': 'Shaggy', 'community': 'Bundesliga Kickers',
+                                        'squad': [['Rune Jarstein', 'keeper', 'Hertha BSC']]}},
+                         msg="squads of the match day must be stored in the replay record format")
+        self.assertEqual(self.livedata.squad_snapshot_versions[8272345], self.livedata.squadcache.version,
+                         msg="squads must be stored once per squad version")
+
+    def test_failed_points_write(self):
+
+        livedata = [{'user': 'Shaggy', 'userid': 13, 'community': None,
+                     'squad': [ScoredPlayer(name='Rune Jarstein', rating=6.5, points=1, position='keeper')]}]
+        self.livedata.match_snapshots[8272345] = (1, dict())
+        self.livedata.calculate_points_per_match(livedata=livedata, match_id=8272345, match_day=3)
+        self.assertNotIn(8272345, self.livedata.match_snapshots, msg="a failed write must force a full recalculation")
+
+    def test_same_player_name(self):
+
+        def lineup(home_rating, away_rating):
+            return {'homeTeam': [LineupPlayer(name='Mario Gomez', rating=home_rating)],
+                    'awayTeam': [LineupPlayer(name='Mario Gomez', rating=away_rating)],
+                    'homeTeamIncidentsByPlayer': dict(), 'awayTeamIncidentsByPlayer': dict()}
+
+        self.assertIsNone(self.livedata.diff_lineup_snapshot(match_id=8272345, match_lineup=lineup(6.5, 7.0)))
+        changed = self.livedata.diff_lineup_snapshot(match_id=8272345, match_lineup=lineup(6.5, 7.5))
+        self.assertEqual(changed, {('awayTeam', 'Mario Gomez')}, msg="players of both teams must not overwrite each other")
+
+        livedata = [{'userid': 1, 'squad': [ScoredPlayer(name='Mario Gomez', rating=6.5, points=1, position='striker',
+                                                         team='homeTeam')]},
+                    {'userid': 2, 'squad': [ScoredPlayer(name='Mario Gomez', rating=7.5, points=3, position='striker',
+                                                         team='awayTeam')]}]
+        self.assertEqual(LiveData.get_affected_users(livedata, livedata, changed), {2},
+                         msg="only the user with the changed player must be affected")
+
+    def tearDown(self) -> None:
+
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+        shutil.rmtree(self.db_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+from time import time, sleep
+from ComunioScore.matchdaypoller import MatchdayPoller
+from ComunioScore.pollingpolicy import PollingPolicy
+
+
+class BundesligaStub:
+
+    def __init__(self):
+        self.finished = False
+        self.failing = set()
+        self.missing = set()
+        self.requested = list()
+
+    def match_status(self, matchid):
+        return {'type': 'finished'} if self.finished else {'type': 'inprogress', 'code': 6}
+
+    def events_for_date(self, date):
+        return [{'id': 1, 'status': {'type': 'finished' if self.finished else 'inprogress', 'code': 6}}]
+
+    def get_scraper_requests(self):
+        return {'requestCount': 10, 'requestLimit': 1000}
+
+    def lineups_from_match_ids(self, match_ids, max_workers=6):
+        self.requested.append(sorted(match_ids))
+        lineups = dict()
+        for match_id in match_ids:
+            if match_id in self.failing:
+                lineups[match_id] = (None, KeyError('homeTeam'))
+            elif match_id in self.missing:
+                lineups[match_id] = (None, None)
+            else:
+                lineups[match_id] = ({'match_id': match_id}, None)
+        return lineups
+
+
+class LiveDataStub:
+
+    def __init__(self):
+        self.bundesliga = BundesligaStub()
+        self.pollingpolicy = PollingPolicy(intervals={'settlement': 0})
+        self.msg_rate = 600
+        self.calls = list()
+        self.snapshots = dict()
+        self.lineups = dict()
+
+    def start_match(self, match_day, match_id, home_team, away_team):
+        self.calls.append(('start', match_id))
+
+    def update_match(self, match_day, match_id, home_team, away_team, send=False, match_lineup=None):
+        self.calls.append(('update', match_id, send))
+        self.lineups[match_id] = match_lineup
+
+    def last_lineup(self, match_id):
+        return self.snapshots.get(match_id)
+
+    def finish_match(self, match_id, home_team, away_team):
+        self.calls.append(('finish', match_id))
+
+    def close_match(self, match_id):
+        self.calls.append(('close', match_id))
+
+
+class TestMatchdayPoller(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.livedata = LiveDataStub()
+        self.poller = MatchdayPoller(livedata=self.livedata)
+        self.poller.add_match(match_day=1, match_id=1, home_team='Hertha BSC', away_team='Freiburg')
+        self.poller.add_match(match_day=1, match_id=2, home_team='1. FC Köln', away_team='Bayern München')
+
+    def test_poll(self):
+
+        self.poller.poll()
+        self.assertEqual(self.livedata.calls, [('start', 1), ('start', 2), ('update', 1, False), ('update', 2, False)])
+        self.assertEqual(self.livedata.bundesliga.requested, [[1, 2]], msg="lineups must be requested in one batch")
+        self.assertEqual(self.livedata.lineups[2], {'match_id': 2}, msg="batch lineup must be passed to update_match")
+
+        # matches are not due before the next interval
+        self.poller.poll()
+        self.assertEqual(len(self.livedata.calls), 4, msg="matches must not be updated before the next interval")
+
+    def test_poll_handlers(self):
+
+        self.poller.register_poll_start_event_handler(func=lambda: self.livedata.calls.append(('poll_start',)))
+        self.poller.register_poll_end_event_handler(func=lambda: self.livedata.calls.append(('poll_end',)))
+        self.poller.poll()
+        self.assertEqual(self.livedata.calls[2:], [('poll_start',), ('update', 1, False), ('update', 2, False), ('poll_end',)],
+                         msg="all match updates of one poll must be enclosed by the poll handlers")
+
+    def test_lineup_error(self):
+
+        self.livedata.bundesliga.failing = {1, 2}
+        self.livedata.snapshots[1] = {'match_id': 1, 'snapshot': True}
+        self.poller.poll()
+        self.assertEqual(self.livedata.lineups, {1: {'match_id': 1, 'snapshot': True}},
+                         msg="failed lineup must be replaced by the last snapshot")
+        self.assertNotIn(('update', 2, False), self.livedata.calls, msg="match without lineup must not be updated")
+
+    def test_missing_lineup(self):
+
+        self.livedata.bundesliga.missing = {1, 2}
+        self.livedata.snapshots[1] = {'match_id': 1, 'snapshot': True}
+        self.poller.poll()
+        self.assertEqual(self.livedata.lineups, {1: {'match_id': 1, 'snapshot': True}},
+                         msg="missing lineup must be replaced by the last snapshot")
+        self.assertIn(('start', 2), self.livedata.calls, msg="match without lineup must keep running")
+
+    def test_poll_error(self):
+
+        def lineups_from_match_ids(match_ids, max_workers=6):
+            raise TypeError("unexpected error")
+
+        self.livedata.bundesliga.lineups_from_match_ids = lineups_from_match_ids
+        self.poller.start()
+        try:
+            # the failed poll postpones the due matches instead of killing the thread
+            deadline = time() + 5
+            while (time() < deadline) and any(match['next_poll_ts'] <= time() for match in self.poller.get_matches()):
+                sleep(0.01)
+            self.assertTrue(self.poller.is_alive(), msg="poller thread must survive an unexpected error")
+            self.assertTrue(all(match['next_poll_ts'] > time() + 60 for match in self.poller.get_matches()),
+                            msg="matches of a failed poll must be postponed")
+        finally:
+            self.poller.stop()
+            self.poller.join(timeout=5)
+
+    def test_finished(self):
+
+        self.livedata.bundesliga.finished = True
+        self.poller.poll()
+        self.assertIn(('finish', 1), self.livedata.calls, msg="match 1 must be finished")
+
+        self.poller.poll()
+        self.assertIn(('update', 1, True), self.livedata.calls, msg="match 1 must be updated the last time")
+        self.assertIn(('close', 1), self.livedata.calls, msg="match 1 must be closed")
+        self.assertEqual(self.poller.get_matches(), [], msg="no match must be running")
+
+    def tearDown(self) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
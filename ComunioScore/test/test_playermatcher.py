@@ -0,0 +1,62 @@
+import unittest
+from ComunioScore.playermatcher import PlayerMatcher
+from ComunioScore.records import LineupPlayer, NO_RATING
+
+
+class TestPlayerMatcher(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.lineup = {'homeTeam': [LineupPlayer(name='Timo Horn', player_id=17766, rating=6.5),
+                                    LineupPlayer(name='Jorge Meré', rating=7.6),
+                                    LineupPlayer(name='Sebastiaan Bornauw', rating=6.9)],
+                       'awayTeam': [LineupPlayer(name='Thomas Müller', player_id=12994, rating=8.1),
+                                    LineupPlayer(name='Robert Lewandowski', rating=7.3),
+                                    LineupPlayer(name='Javi Martínez', rating=6.7)]}
+
+        self.matcher = PlayerMatcher(lineup=self.lineup)
+
+    def test_match_exact(self):
+
+        self.assertEqual(self.matcher.match(playername='Horn'), ('homeTeam', 0), msg="Horn must match home player 0")
+        self.assertEqual(self.matcher.match(playername='Jorge Meré'), ('homeTeam', 1), msg="Jorge Meré must match home player 1")
+
+    def test_match_forename(self):
+
+        self.assertEqual(self.matcher.match(playername='T. Müller'), ('awayTeam', 0), msg="T. Müller must match away player 0")
+        self.assertIsNone(self.matcher.match(playername='K. Müller'), msg="K. Müller must not match any player")
+
+    def test_match_fuzzy(self):
+
+        self.assertEqual(self.matcher.match(playername='Lewandowsky'), ('awayTeam', 1), msg="Lewandowsky must match away player 1")
+        self.assertEqual(self.matcher.match(playername='Martinez'), ('awayTeam', 2), msg="Martinez must match away player 2")
+        self.assertIsNone(self.matcher.match(playername='Neuer'), msg="Neuer must not match any player")
+
+    def test_match_player_id(self):
+
+        self.assertEqual(self.matcher.match_player_id(player_id=17766), ('homeTeam', 0), msg="player id 17766 must be home player 0")
+        self.assertEqual(self.matcher.match_player_id(player_id=12994), ('awayTeam', 0), msg="player id 12994 must be away player 0")
+        self.assertIsNone(self.matcher.match_player_id(player_id=1), msg="player id 1 must not be in the lineup")
+
+    def test_ratios(self):
+
+        matcher = PlayerMatcher(lineup=self.lineup, home_ratio=0.99, away_ratio=0.99)
+        self.assertIsNone(matcher.match(playername='Lewandowsky'), msg="Lewandowsky must not match with ratio 0.99")
+
+    def test_is_valid_for(self):
+
+        self.assertTrue(self.matcher.is_valid_for(lineup=self.lineup), msg="matcher must be valid for the same lineup")
+        self.lineup['awayTeam'].append(LineupPlayer(name='Leon Goretzka', substitute=True, rating=NO_RATING))
+        self.assertFalse(self.matcher.is_valid_for(lineup=self.lineup), msg="matcher must be invalid for a changed lineup")
+
+    def test_seperate_playername(self):
+
+        self.assertEqual(PlayerMatcher.seperate_playername(playername='S. Bornauw'), ('S', 'Bornauw'))
+        self.assertEqual(PlayerMatcher.seperate_playername(playername='Javi Martínez'), ('Javi', 'Martinez'))
+
+    def tearDown(self) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 from ComunioScore import PointCalculator
+from ComunioScore import pointcalculator
+from ComunioScore.records import Incident, NO_RATING
 
 
 class TestPointCalculator(unittest.TestCase):
@@ -43,6 +45,80 @@ class TestPointCalculator(unittest.TestCase):
         points_penalty = self.pointcalculator.get_penalty()
         self.assertEqual(points_penalty, 3, msg="Points for penalty must be 3")
 
+    def test_get_points_from_rating_bands(self):
+
+        self.assertEqual(self.pointcalculator.get_points_from_rating(rating=0.0), -8, msg="Rating 0.0 must be -8 points")
+        self.assertEqual(self.pointcalculator.get_points_from_rating(rating=4.7), -7, msg="Rating 4.7 must be -7 points")
+        self.assertEqual(self.pointcalculator.get_points_from_rating(rating=6.0), -2, msg="Rating 6.0 must be -2 points")
+        self.assertEqual(self.pointcalculator.get_points_from_rating(rating=10.0), 12, msg="Rating 10.0 must be 12 points")
+
+    def test_get_points_from_rating_gaps(self):
+
+        points_4_65 = self.pointcalculator.get_points_from_rating(rating=4.65)
+        self.assertEqual(points_4_65, -8, msg="Rating 4.65 must fall into the lower band with -8 points")
+
+        points_6_05 = self.pointcalculator.get_points_from_rating(rating=6.05)
+        self.assertEqual(points_6_05, -2, msg="Rating 6.05 must fall into the lower band with -2 points")
+
+    def test_get_points_from_rating_invalid(self):
+
+        self.assertIsNone(self.pointcalculator.get_points_from_rating(rating=10.5), msg="Rating 10.5 must be invalid")
+        self.assertIsNone(self.pointcalculator.get_points_from_rating(rating=-1), msg="Rating -1 must be invalid")
+
+    def test_calculate_batch(self):
+
+        ratings = [8.1, NO_RATING, 5.1, 12.0, None]
+        positions = ['striker', 'keeper', 'defender', 'midfielder', 'striker']
+        incidents = [[Incident(type='goal', incident_class='regulargoal', player='Kramaric'),
+                      Incident(type='goal', incident_class='penalty', player='Kramaric')],
+                     [Incident(type='goal', incident_class='regulargoal', player='Horn')],
+                     [Incident(type='card', incident_class='Red', player='Bornauw'),
+                      Incident(type='card', incident_class='Yellow', player='Bornauw')],
+                     [],
+                     []]
+
+        expected = [(9, 6, 0), (0, 6, 0), (-6, 0, -6), (0, 0, 0), (0, 0, 0)]
+        self.assertEqual(self.pointcalculator.calculate_batch(ratings=ratings, positions=positions, incidents=incidents),
+                         expected, msg="batch points must match the single player points")
+
+        if pointcalculator.is_numpy_importable:
+            pointcalculator.is_numpy_importable = False
+            try:
+                points = self.pointcalculator.calculate_batch(ratings=ratings, positions=positions, incidents=incidents)
+            finally:
+                pointcalculator.is_numpy_importable = True
+            self.assertEqual(points, expected, msg="batch points without numpy must be equal")
+
+    def test_calculate_batch_rating_points(self):
+
+        points = self.pointcalculator.calculate_batch(ratings=[8.1, 5.1, NO_RATING], positions=['striker'] * 3,
+                                                      incidents=[[], [], []], rating_points=[5, None, NO_RATING])
+        self.assertEqual(points, [(5, 0, 0), (0, 0, 0), (0, 0, 0)], msg="calculated rating points must not be recalculated")
+
+    def test_get_points_from_ratings(self):
+
+        ratings = [8.1, NO_RATING, 4.65, 12.0, None, 10.0]
+        expected = [9, NO_RATING, -8, None, NO_RATING, 12]
+        self.assertEqual(self.pointcalculator.get_points_from_ratings(ratings=ratings), expected,
+                         msg="points of many ratings must match the single rating points")
+
+        if pointcalculator.is_numpy_importable:
+            pointcalculator.is_numpy_importable = False
+            try:
+                points = self.pointcalculator.get_points_from_ratings(ratings=ratings)
+            finally:
+                pointcalculator.is_numpy_importable = True
+            self.assertEqual(points, expected, msg="points of many ratings without numpy must be equal")
+
+    @unittest.skipUnless(pointcalculator.is_numpy_importable, "numpy is not installed")
+    def test_get_points_from_ratings_numpy(self):
+
+        ratings = [round(0.05 * i, 2) for i in range(211)] + [NO_RATING, None, -1.0, 10.5]
+        expected = [NO_RATING if (rating is None) or (rating is NO_RATING) else
+                    self.pointcalculator.get_points_from_rating(rating=rating) for rating in ratings]
+        self.assertEqual(self.pointcalculator.get_points_from_ratings(ratings=ratings), expected,
+                         msg="numpy searchsorted must match the bisect lookup")
+
     def tearDown(self) -> None:
         pass
 
@@ -0,0 +1,74 @@
+import unittest
+from threading import Thread, Event
+from ComunioScore.pollingpolicy import PollingPolicy
+
+
+class TestPollingPolicy(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.policy = PollingPolicy(intervals={'firsthalf': 240})
+
+    def test_phase(self):
+
+        self.assertEqual(self.policy.phase(status={'type': 'notstarted'}), 'prematch')
+        self.assertEqual(self.policy.phase(status={'type': 'inprogress', 'code': 6}), 'firsthalf')
+        self.assertEqual(self.policy.phase(status={'type': 'inprogress', 'description': 'Halftime'}), 'halftime')
+        self.assertEqual(self.policy.phase(status={'type': 'inprogress', 'code': 7}), 'secondhalf')
+        self.assertEqual(self.policy.phase(status={'type': 'finished'}), 'settlement')
+        self.assertEqual(self.policy.phase(status={}), 'unknown')
+
+    def test_phase_stoppage(self):
+
+        status = {'type': 'inprogress', 'code': 7, 'period_start': 1000}
+        self.assertEqual(self.policy.phase(status=status, now=1000 + 40 * 60), 'secondhalf')
+        self.assertEqual(self.policy.phase(status=status, now=1000 + 47 * 60), 'stoppage')
+
+    def test_interval(self):
+
+        self.assertEqual(self.policy.interval(status={'type': 'inprogress', 'code': 6}), 240, msg="first half interval must be 240")
+        self.assertEqual(self.policy.interval(phase='settlement'), 600, msg="settlement interval must be 600")
+
+    def test_quota(self):
+
+        self.policy.update_quota(scraper_requests={'requestCount': 900, 'requestLimit': 1000})
+        self.assertEqual(self.policy.interval(phase='firsthalf'), 480, msg="interval must be doubled at 90% quota usage")
+
+        self.policy.update_quota(scraper_requests={'requestCount': 990, 'requestLimit': 1000})
+        self.assertEqual(self.policy.interval(phase='firsthalf'), 960, msg="interval must be quadrupled at 99% quota usage")
+
+    def test_projected_quota(self):
+
+        self.policy.update_quota(scraper_requests={'requestCount': 500, 'requestLimit': 1000, 'projectedCount': 1500})
+        self.assertEqual(self.policy.interval(phase='firsthalf'), 360, msg="interval must be stretched to the projected usage")
+
+        self.policy.update_quota(scraper_requests={'requestCount': 500, 'requestLimit': 1000, 'projectedCount': 9000})
+        self.assertEqual(self.policy.interval(phase='firsthalf'), 960, msg="interval must be stretched at most 4 times")
+
+    def test_refresh_quota_once(self):
+
+        requested, release, calls = Event(), Event(), list()
+
+        def account():
+            calls.append(1)
+            if len(calls) == 1:
+                requested.set()
+                release.wait()
+            return {'requestCount': 900, 'requestLimit': 1000}
+
+        thread = Thread(target=self.policy.refresh_quota, args=(account,))
+        thread.start()
+        requested.wait()
+        self.policy.refresh_quota(func=account)
+        release.set()
+        thread.join()
+
+        self.assertEqual(len(calls), 1, msg="account info must be requested by one thread only")
+        self.assertEqual(self.policy.interval(phase='firsthalf'), 480, msg="quota usage must be updated")
+
+    def tearDown(self) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
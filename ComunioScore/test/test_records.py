@@ -0,0 +1,78 @@
+import unittest
+from ComunioScore.records import UserMatchScore, LineupPlayer, Incident, NO_RATING
+
+
+class TestUserMatchScore(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.score = UserMatchScore(userid=13065521, username='Shaggy', rating=6, goal=5, off=-3)
+
+    def test_total(self):
+
+        self.assertEqual(self.score.total, 8, msg="total must be the sum of rating, goal and off")
+
+    def test_points(self):
+
+        self.assertEqual(self.score.points(), (6, 5, -3), msg="points must be a tuple of rating, goal and off")
+
+    def test_default(self):
+
+        score = UserMatchScore(userid=13065521, username='Shaggy')
+        self.assertEqual(score.total, 0, msg="default score must be zero")
+
+    def test_eq(self):
+
+        self.assertEqual(self.score, UserMatchScore(userid=13065521, username='Shaggy', rating=6, goal=5, off=-3))
+        self.assertNotEqual(self.score, UserMatchScore(userid=13065521, username='Shaggy', rating=6))
+
+    def test_hash(self):
+
+        scores = {self.score, UserMatchScore(userid=13065521, username='Shaggy', rating=6, goal=5, off=-3)}
+        self.assertEqual(len(scores), 1, msg="equal scores must have the same hash")
+
+
+class TestLineupPlayer(unittest.TestCase):
+
+    def test_parse_rating(self):
+
+        self.assertEqual(LineupPlayer.parse_rating(value='6.5'), 6.5, msg="rating string must be parsed to float")
+        self.assertEqual(LineupPlayer.parse_rating(value=7), 7.0, msg="rating number must be parsed to float")
+        self.assertIs(LineupPlayer.parse_rating(value='–'), NO_RATING, msg="'–' must be NO_RATING")
+        self.assertIs(LineupPlayer.parse_rating(value=None), NO_RATING, msg="missing rating must be NO_RATING")
+
+    def test_no_rating(self):
+
+        self.assertEqual(str(NO_RATING), '–', msg="NO_RATING must be displayed as '–'")
+        self.assertEqual("{}".format(LineupPlayer(name='Leon Goretzka').rating), '–', msg="default rating must be NO_RATING")
+
+    def test_slots(self):
+
+        player = LineupPlayer(name='Rune Jarstein', player_id=35612, rating=6.5)
+        with self.assertRaises(AttributeError):
+            player.player_rating = 6.5
+
+    def test_hash(self):
+
+        players = {LineupPlayer(name='Rune Jarstein', rating=6.5), LineupPlayer(name='Rune Jarstein', rating=6.5),
+                   LineupPlayer(name='Leon Goretzka')}
+        self.assertEqual(len(players), 2, msg="equal lineup players must have the same hash")
+
+
+class TestIncident(unittest.TestCase):
+
+    def test_key(self):
+
+        incident = Incident(type='card', incident_class='Red', player='Jhon Córdoba')
+        self.assertEqual(incident.key(), ('card', 'Red'), msg="key must be a tuple of type and class")
+        self.assertEqual(incident, Incident(type='card', incident_class='Red', player='Jhon Córdoba'))
+
+    def test_hash(self):
+
+        incidents = {Incident(type='card', incident_class='Red', player='Jhon Córdoba'): 1}
+        self.assertIn(Incident(type='card', incident_class='Red', player='Jhon Córdoba'), incidents,
+                      msg="equal incidents must be usable as the same dict key")
+
+
+if __name__ == '__main__':
+    unittest.main()
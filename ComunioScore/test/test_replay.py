@@ -0,0 +1,113 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from ComunioScore.replay import Replay
+from ComunioScore.records import LineupPlayer, NO_RATING
+from ComunioScore.db.connector import DBConnector
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.record = {'match_day': 3, 'match_id': 8272345, 'home_team': 'Hertha BSC', 'away_team': 'Fortuna Düsseldorf',
+                       'lineup': {'homeTeam': [{'player_name': 'Rune Jarstein', 'player_id': 35612, 'player_rating': '6.5'},
+                                               {'player_name': 'Maximilian Mittelstädt', 'player_rating': '–'}],
+                                  'awayTeam': [{'player_name': 'Zack Steffen', 'player_id': 213492, 'player_rating': '5.6'}],
+                                  'homeTeamIncidents': [{'type': 'card', 'class': 'Red', 'player': 'Rune Jarstein'}],
+                                  'awayTeamIncidents': []}}
+
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'matchday3.jsonl'), 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.record) + '\n\n')
+            f.write(json.dumps(self.record) + '\n')
+
+    def test_load_snapshots(self):
+
+        records = list(Replay.load_snapshots(path=self.directory))
+        self.assertEqual(len(records), 2, msg="empty lines must be skipped")
+        self.assertEqual(records[0]['match_id'], 8272345, msg="match id must be 8272345")
+
+    def test_prepare_lineup(self):
+
+        lineup = Replay.prepare_lineup(lineup=self.record['lineup'])
+        self.assertEqual(lineup['homeTeam'][0], LineupPlayer(name='Rune Jarstein', player_id=35612, rating=6.5),
+                         msg="players must be converted to LineupPlayer with float rating")
+        self.assertIs(lineup['homeTeam'][1].rating, NO_RATING, msg="missing rating must be NO_RATING")
+        self.assertEqual(lineup['homeTeamIncidentsByPlayer']['Rune Jarstein'][0].incident_class, 'Red',
+                         msg="incidents must be grouped by player")
+        self.assertEqual(lineup['homeTeamIncidentCount'], 1, msg="home team must have one incident")
+        self.assertEqual(lineup['awayTeamIncidentsById'], dict(), msg="away team must have no incidents")
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.directory)
+
+
+class TestReplayMatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.record = {'match_day': 3, 'match_id': 8272345, 'home_team': 'Hertha BSC', 'away_team': 'Fortuna Düsseldorf',
+                       'lineup': {'homeTeam': [{'player_name': 'Rune Jarstein', 'player_id': 35612, 'player_rating': '6.5'}],
+                                  'awayTeam': [{'player_name': 'Zack Steffen', 'player_id': 213492, 'player_rating': '5.6'}],
+                                  'homeTeamIncidents': [{'type': 'card', 'class': 'Red', 'player': 'Rune Jarstein'}],
+                                  'awayTeamIncidents': []},
+                       'squads': {'1': {'user': 'Shaggy', 'squad': [['Rune Jarstein', 'keeper', 'Hertha BSC']]},
+                                  '2': {'user': 'Scooby', 'squad': [['Zack Steffen', 'keeper', 'Fortuna Düsseldorf']]}}}
+        self.expected = {1: (1, 0, -6), 2: (-4, 0, 0)}
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'matchday3.jsonl')
+        self.write_records(records=[self.record])
+
+        self.replay = Replay(path=os.path.join(self.directory, 'comunioscore.db'))
+        points_sql = "insert into main.points (userid, username, match_id, match_day, homeTeam, awayTeam, points_rating, " \
+                     "points_goal, points_off) values (%s, %s, %s, %s, %s, %s, %s, %s, %s)"
+        self.replay.dbinserter.many_rows(sql=points_sql, datas=[(1, 'Shaggy', 8272345, 3, 'Hertha BSC', 'Fortuna Düsseldorf', 1, 0, -6),
+                                                                (2, 'Scooby', 8272345, 3, 'Hertha BSC', 'Fortuna Düsseldorf', 0, 0, 0)])
+
+    def write_records(self, records):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+    def test_replay_match(self):
+
+        self.replay.clubregistry.build(teams={'Hertha BSC', 'Fortuna Düsseldorf'}, clubs={'Hertha BSC', 'Fortuna Düsseldorf'})
+        scores = self.replay.replay_match(record=json.loads(json.dumps(self.record)))
+        self.assertEqual({userid: score.points() for (userid, score) in scores.items()}, self.expected,
+                         msg="replayed points must be scored with the squads of the record")
+        self.assertEqual(self.replay.compare_points(match_id=8272345, scores=scores), [(8272345, 2, (0, 0, 0), (-4, 0, 0))],
+                         msg="only the points which differ from the points table must be reported")
+
+    def test_run_write(self):
+
+        self.replay.write = True
+        summary = self.replay.run(path=self.path)
+        self.assertEqual((summary['matches'], summary['users']), (1, 2), msg="one match with two users must be replayed")
+        self.assertEqual(self.replay.query_match_points(match_id=8272345), self.expected,
+                         msg="replayed points must be written to the points table")
+
+    def test_run_without_squads(self):
+
+        del self.record['squads']
+        self.write_records(records=[self.record])
+        self.replay.write = True
+        summary = self.replay.run(path=self.path)
+        self.assertEqual((summary['matches'], summary['skipped']), (0, [8272345]), msg="match without squads must be skipped")
+        self.assertEqual(self.replay.query_match_points(match_id=8272345), {1: (1, 0, -6), 2: (0, 0, 0)},
+                         msg="points of a match without squads must not be written")
+
+    def tearDown(self) -> None:
+
+        DBConnector.connection.close()
+        DBConnector.connection = None
+        DBConnector.is_sqlite = False
+        shutil.rmtree(self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import json
+import tempfile
+import unittest
+from ComunioScore.scoringrules import ScoringRules
+from ComunioScore.exceptions import ScoringRulesError
+
+
+class TestScoringRules(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.scoringrules = ScoringRules()
+        self.scoringrules.load_config(sections={
+            'scoring': {'default': 'classic', 'bundesliga kickers': 'nopenalty'},
+            'scoring classic': {},
+            'scoring nopenalty': {'penalty': '0', 'red': '-8', 'rating': '0.0:-4, 6.0:0, 8.0:4'},
+        })
+
+    def test_get_default(self):
+
+        pointcalculator = self.scoringrules.get()
+        self.assertEqual(pointcalculator.get_penalty(), 3, msg="default rule set must have 3 points for penalty")
+        self.assertIs(self.scoringrules.get(community='Other Community'), pointcalculator,
+                      msg="community without rule set must use the default rule set")
+
+    def test_get_community(self):
+
+        pointcalculator = self.scoringrules.get(community='Bundesliga Kickers')
+        self.assertEqual(pointcalculator.get_penalty(), 0, msg="nopenalty rule set must have 0 points for penalty")
+        self.assertEqual(pointcalculator.get_points_for_offs(off_type='red'), -8, msg="red off must be -8 points")
+        self.assertEqual(pointcalculator.get_points_for_offs(off_type='yellow_red'), -3,
+                         msg="missing rules must be taken from the default rules")
+        self.assertEqual(pointcalculator.get_points_from_rating(rating=7.9), 0, msg="Rating 7.9 must be 0 points")
+
+    def test_load_json(self):
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'goalfest': {'goal': {'striker': 8}}}, f)
+        try:
+            self.scoringrules.load_json(path=f.name)
+        finally:
+            os.remove(f.name)
+
+        self.scoringrules.set_community(community='Goalfest', name='goalfest')
+        pointcalculator = self.scoringrules.get(community='goalfest')
+        self.assertEqual(pointcalculator.get_points_for_goal(position='striker'), 8, msg="striker goal must be 8 points")
+        self.assertEqual(pointcalculator.get_points_for_goal(position='Forward'), 8, msg="Forward goal must be 8 points")
+
+    def test_invalid_rules(self):
+
+        with self.assertRaises(ScoringRulesError):
+            self.scoringrules.add_rule_set(name='unsorted', rules={'rating': [(5.0, 0), (0.0, -8)]})
+        with self.assertRaises(ScoringRulesError):
+            self.scoringrules.set_community(community='Bundesliga Kickers', name='unknown')
+        with self.assertRaises(ScoringRulesError):
+            ScoringRules.parse_options(options={'corner': '1'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,6 +24,9 @@ setup(
     packages=find_packages(),
     package_data={'ComunioScore': ['config/comunioscore.ini']},
     install_requires=required,
+    extras_require={
+        'asyncio': ['aiohttp>=3.6.2'],
+    },
     keywords=["Comunio", "Sofascore", "Rating", "Score"],
     python_requires=">=3",
     classifiers=[
@@ -42,7 +45,8 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            'ComunioScore = ComunioScore.app:main'
+            'ComunioScore = ComunioScore.app:main',
+            'ComunioScoreReplay = ComunioScore.replay:main'
         ],
     },
     zip_safe=False,